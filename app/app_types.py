@@ -1,26 +1,60 @@
-class DatasetEntry:
-    def __init__(
-        self,
-        uid: int,
-        pool: str,
-        prompt: str,
-        weight: int,
-        sensitivity: str,
-        flags: str,
-        approved: bool = True,
-        rejected: bool = False,
-        rejection_reason: str = "",
-    ):
-        self.uid = uid
-        self.pool = pool
-        self.prompt = prompt
-        self.weight = weight
-        self.sensitivity = sensitivity
-        self.flags = flags
-        self.approved = approved
-        self.rejected = rejected
-        self.rejection_reason = rejection_reason
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+
+class DatasetEntry(NamedTuple):
+    """
+    One row of the dataset table. A tuple subclass with named fields: no
+    per-instance `__dict__`, built straight from the DB rows selected with
+    `select_entries` (see `db/base.py`). Flags come pre-split, in their original order.
+    """
+    uid: int
+    pool: str
+    prompt: str
+    weight: int
+    sensitivity: str
+    flags: Tuple[str, ...]
+    approved: bool = True
+    rejected: bool = False
+    rejection_reason: str = ""
+
+
+def split_flags(flags: str) -> Tuple[str, ...]:
+    """Parse a comma-separated flag list as typed by users, dropping blanks and duplicates."""
+    return tuple(dict.fromkeys(flag.strip() for flag in flags.split(",") if flag.strip()))
+
+
+def join_flags(flags: Iterable[str]) -> str:
+    """Display form of a flag list."""
+    return ", ".join(flags)
 
 
 ERROR_MARIA_DB = -1
 ERROR_ENTRY_EXISTS = -2
+
+
+# Per-ID outcomes of the bulk moderation commands.
+BULK_DONE = "done"
+BULK_NOT_FOUND = "not found"
+BULK_ALREADY_APPROVED = "already approved"
+BULK_ALREADY_REJECTED = "already rejected"
+BULK_NOT_ALLOWED = "not allowed"
+
+
+class BulkResult:
+    """
+    Outcome of a bulk approve/reject/delete, applied in a single transaction.
+    """
+    def __init__(self, uids: List[int]):
+        """
+        :param uids: Requested IDs, every one starts out as `BULK_NOT_FOUND`
+        """
+        self.outcomes: Dict[int, str] = dict.fromkeys(uids, BULK_NOT_FOUND)
+        # Pools whose approved entries changed, i.e. whose exported file changes.
+        self.pools: Set[str] = set()
+
+    def by_outcome(self) -> Dict[str, List[int]]:
+        """Group the requested IDs by outcome, keeping request order."""
+        grouped: Dict[str, List[int]] = {}
+        for uid, outcome in self.outcomes.items():
+            grouped.setdefault(outcome, []).append(uid)
+        return grouped
@@ -0,0 +1,223 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .app_types import BulkResult, DatasetEntry
+from .cache import CachedDb
+from .db import Db
+from .metrics import DB_QUERY_SECONDS, DB_ROWS, DB_WAIT_SECONDS
+from .sampling import SENSITIVITY_LEVELS, PoolSampler
+
+def _row_count(result: Any) -> Optional[int]:
+    """Entries returned (or IDs handled) by a Db method, None if it returns no rows."""
+    if isinstance(result, DatasetEntry):
+        return 1
+    if isinstance(result, BulkResult):
+        return len(result.outcomes)
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return None
+
+
+def _timed(name: str, fn: Callable[..., Any], queued_at: float, *args: Any) -> Any:
+    """Runs on the DB executor: call `fn`, recording its wait, duration and row count."""
+    started_at = time.perf_counter()
+    DB_WAIT_SECONDS.observe(started_at - queued_at, method=name)
+    try:
+        result = fn(*args)
+    finally:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - started_at, method=name)
+    rows = _row_count(result)
+    if rows is not None:
+        DB_ROWS.inc(rows, method=name)
+    return result
+
+
+class AsyncDbBase:
+    """
+    Executor shared by the async mirrors of the `Db` query classes.
+
+    Every call runs on a dedicated executor with one worker per pooled
+    connection, so the event loop never waits on MariaDB and N concurrent
+    interactions run up to `Db.pool_size` queries in parallel. Every call is
+    timed per method (see `metrics.py`).
+    """
+    def __init__(self, db: Db | CachedDb):
+        """
+        :param db: Pooled (optionally cached) DB wrapper to run queries against
+        """
+        self.db = db
+        self._executor = ThreadPoolExecutor(
+            max_workers=db.pool_size,
+            thread_name_prefix="firestorm-db"
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.db.close()
+
+    def stats(self) -> Dict[str, Optional[dict]]:
+        """Connection pool and cache counters, read from memory."""
+        cache_stats = self.db.cache_stats() if isinstance(self.db, CachedDb) else None
+        return {"pool": self.db.stats.snapshot(), "cache": cache_stats}
+
+    async def _run(self, method: str, *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(_timed, method, getattr(self.db, method), time.perf_counter(), *args)
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run `fn(db, *args)` on the DB executor, for work that has to stay next to
+        the connection (e.g. consuming a streaming cursor).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(_timed, fn.__name__, fn, time.perf_counter(), self.db, *args)
+        )
+
+
+class AsyncBulkQueries(AsyncDbBase):
+    """Async mirror of `BulkQueries`."""
+    async def approve_prompts(self, uids: List[int]) -> Optional[BulkResult]:
+        return await self._run("approve_prompts", uids)
+
+    async def reject_prompts(self, uids: List[int], reason: str) -> Optional[BulkResult]:
+        return await self._run("reject_prompts", uids, reason)
+
+    async def delete_prompts(
+        self,
+        uids: List[int],
+        is_privileged_role: bool
+    ) -> Optional[BulkResult]:
+        return await self._run("delete_prompts", uids, is_privileged_role)
+
+    async def get_pending_ids(self, pool: str, limit: int) -> List[int]:
+        return await self._run("get_pending_ids", pool, limit)
+
+
+class AsyncBrowseQueries(AsyncDbBase):
+    """Async mirror of `BrowseQueries`."""
+    async def get_queue_page(
+        self,
+        rejected: bool,
+        after_uid: int,
+        limit: int,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        return await self._run("get_queue_page", rejected, after_uid, limit, pool, sensitivity)
+
+    async def search_prompts(
+        self,
+        query: Optional[str],
+        status: str,
+        offset: int,
+        limit: int,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None,
+        flag: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        return await self._run(
+            "search_prompts", query, status, offset, limit, pool, sensitivity, flag
+        )
+
+    async def get_flag_counts(self, pool: Optional[str] = None) -> List[Tuple[str, int]]:
+        return await self._run("get_flag_counts", pool)
+
+
+class AsyncSyncStateQueries(AsyncDbBase):
+    """Async mirror of `SyncStateQueries`."""
+    async def db_now(self) -> datetime:
+        return await self._run("db_now")
+
+    async def get_sync_state(self) -> Tuple[Optional[datetime], Dict[str, str]]:
+        return await self._run("get_sync_state")
+
+    async def get_changed_pools(self, since: Optional[datetime]) -> List[str]:
+        return await self._run("get_changed_pools", since)
+
+    async def record_sync(
+        self,
+        synced_at: datetime,
+        blob_oids: Dict[str, Optional[str]]
+    ) -> None:
+        return await self._run("record_sync", synced_at, blob_oids)
+
+    async def get_command_hashes(self) -> Dict[int, str]:
+        return await self._run("get_command_hashes")
+
+    async def record_command_hash(self, guild_id: int, tree_hash: str) -> None:
+        return await self._run("record_command_hash", guild_id, tree_hash)
+
+
+class AsyncDb(AsyncBulkQueries, AsyncBrowseQueries, AsyncSyncStateQueries):
+    """
+    Async facade over the blocking `Db` wrapper, mirroring its query classes.
+    """
+    async def add_prompt(
+        self,
+        pool: str,
+        prompt: str,
+        weight: int,
+        sensitivity: str,
+        flags: Tuple[str, ...]
+    ) -> int:
+        return await self._run("add_prompt", pool, prompt, weight, sensitivity, flags)
+
+    async def approve_prompt(self, uid: int) -> bool:
+        return await self._run("approve_prompt", uid)
+
+    async def reject_prompt(self, uid: int, reason: str) -> bool:
+        return await self._run("reject_prompt", uid, reason)
+
+    async def modify_prompt(
+        self,
+        uid: int,
+        is_privileged_role: bool,
+        prompt: Optional[str],
+        weight: Optional[int],
+        sensitivity: Optional[str],
+        flags: Optional[Tuple[str, ...]]
+    ) -> Optional[DatasetEntry]:
+        return await self._run(
+            "modify_prompt", uid, is_privileged_role, prompt, weight, sensitivity, flags
+        )
+
+    async def delete_prompt(self, uid: int, is_privileged_role: bool) -> bool:
+        return await self._run("delete_prompt", uid, is_privileged_role)
+
+    async def get_prompt(self, uid: int) -> Optional[DatasetEntry]:
+        return await self._run("get_prompt", uid)
+
+    async def get_pending_prompts(self) -> List[DatasetEntry]:
+        return await self._run("get_pending_prompts")
+
+    async def get_rejected_prompts(self) -> List[DatasetEntry]:
+        return await self._run("get_rejected_prompts")
+
+    async def get_pools(self) -> List[str]:
+        return await self._run("get_pools")
+
+    async def show_pool(self, pool: str) -> List[DatasetEntry]:
+        return await self._run("show_pool", pool)
+
+    async def get_sampler(self, pool: str) -> PoolSampler:
+        return await self._run("get_sampler", pool)
+
+    async def draw_card(
+        self,
+        pool: str,
+        size: int,
+        sensitivities: Iterable[str] = SENSITIVITY_LEVELS
+    ) -> List[DatasetEntry]:
+        return await self._run("draw_card", pool, size, tuple(sensitivities))
+
+    async def show_pool_page(self, pool: str, after_uid: int, limit: int) -> List[DatasetEntry]:
+        return await self._run("show_pool_page", pool, after_uid, limit)
@@ -1,20 +1,48 @@
-import asyncio
 import logging
-from typing import List
+from typing import List, Optional
 
 import discord
-from discord.errors import Forbidden, RateLimited
+from discord import app_commands
 from discord.ext import commands
 
-from .db import Db
+from .async_db import AsyncDb
+from .command_sync import DEFAULT_SYNC_CONCURRENCY, CommandSyncer
 from .git import GitWrapper
-from .slash_commands import SlashCommands
+from .metrics import COMMAND_SECONDS, MetricsServer
+from .slash_commands import CommandContext, make_cogs
 
 logger = logging.getLogger("firestorm_bot")
 
 def convert_to_snowflake(item: int) -> discord.Object:
     return discord.Object(item)
 
+
+def _observe_command(interaction: discord.Interaction, status: str) -> None:
+    if interaction.command is not None:
+        # Clamped: the host clock may lag behind Discord's.
+        elapsed = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+        COMMAND_SECONDS.observe(
+            max(elapsed, 0.0),
+            command=interaction.command.qualified_name,
+            status=status
+        )
+
+
+class InstrumentedCommandTree(app_commands.CommandTree):
+    """
+    Command tree timing every app command, from the moment Discord created the
+    interaction until its handler returns or fails (see `COMMAND_SECONDS`).
+    """
+    async def on_error(
+        self,
+        interaction: discord.Interaction,
+        error: app_commands.AppCommandError,
+        /
+    ) -> None:
+        _observe_command(interaction, "error")
+        await super().on_error(interaction, error)
+
+
 class FireStormBot(commands.Bot):
     """
     Main Entrypoint for the Discord Bot
@@ -24,52 +52,66 @@ class FireStormBot(commands.Bot):
         self,
         guilds: List[int],
         approved_roles: List[str],
-        db: Db,
-        git_wrapper: GitWrapper
+        db: AsyncDb,
+        git_wrapper: GitWrapper,
+        metrics_server: Optional[MetricsServer] = None,
+        sync_concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+        force_sync: bool = False
     ):
         """
         :param guilds: List of guild ids to sync commands to
         :param approved_roles: Roles that are allowed to approve prompts
         :param db: DB to use for the dataset storage
         :param git_wrapper: Git wrapper for git operations
+        :param metrics_server: Prometheus endpoint to serve while the bot runs
+        :param sync_concurrency: Guilds the command tree is synced to at the same time
+        :param force_sync: Sync the command tree at startup even to guilds it did
+            not change for
         """
         intents = discord.Intents.default()
         intents.message_content = True
-        super().__init__(command_prefix="!", intents=intents)
+        super().__init__(command_prefix="!", intents=intents, tree_cls=InstrumentedCommandTree)
         self._guilds = guilds
-        self._approved_roles = approved_roles
-        self._db = db
-        self._git_wrapper = git_wrapper
+        self._commands = CommandContext(approved_roles, db, git_wrapper)
+        self._metrics_server = metrics_server
+        self._force_sync = force_sync
+        self._command_syncer = CommandSyncer(self.tree, db, sync_concurrency)
 
     async def setup_hook(self):
+        if self._metrics_server is not None:
+            await self._metrics_server.start()
         guild_list = list(map(convert_to_snowflake, self._guilds))
         # Add commands only for specific guilds.
-        await self.add_cog(
-            SlashCommands(self, self._approved_roles, self._db, self._git_wrapper),
-            guilds=guild_list
-        )
-        # Sync commands to guild immediately (if not it will take an hour)
-        for guild in guild_list:
-            try:
-                await self.tree.sync(guild=guild)
-            except Forbidden:
-                logger.warning(f"[Forbidden] Skipping sync to guild {guild}")
-            except RateLimited as e:
-                logger.info("Rate limit reached, trying again after sleeping...")
-                await asyncio.sleep(e.retry_after)
-                await self.tree.sync(guild=guild)
-            except Exception as e: # pylint: disable=broad-exception-caught
-                logger.warning(f"[Unknown Error] Skipping sync to guild {guild}: {e}")
+        await self._commands.load()
+        for cog in make_cogs(self._commands):
+            await self.add_cog(cog, guilds=guild_list)
+        # Sync commands to guild immediately (if not it will take an hour), unless
+        # they are the same as last time.
+        await self._command_syncer.sync_guilds(self._guilds, force=self._force_sync)
         logger.info("App commands loaded and synced!")
 
     async def on_guild_join(self, guild: discord.Guild):
         logger.info(f"[on_guild_joined] Bot joined {guild.name} ({guild.id})")
 
         if guild.id in self._guilds:
-            await self.tree.sync(guild=convert_to_snowflake(guild.id))
-            logger.info(f"[on_guild_joined] App commands synced to {guild.id}")
+            # A guild that removed the bot lost its commands, whatever the stored hash says.
+            outcome = await self._command_syncer.sync_guild(guild.id, force=True)
+            logger.info(f"[on_guild_joined] App commands of {guild.id}: {outcome}")
         else:
             logger.info(f"[on_guild_joined] {guild.id} rejected!")
 
+    async def on_app_command_completion(
+        self,
+        interaction: discord.Interaction,
+        _command: app_commands.Command
+    ):
+        _observe_command(interaction, "ok")
+
+    async def close(self):
+        await self._commands.close()
+        if self._metrics_server is not None:
+            await self._metrics_server.stop()
+        await super().close()
+
     async def on_ready(self):
         logger.info(f"{self.user} is now running!")
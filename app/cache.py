@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, List, Optional, Tuple
+
+from .app_types import BulkResult, DatasetEntry
+from .sampling import SENSITIVITY_LEVELS, PoolSampler
+
+if TYPE_CHECKING:
+    from .db import Db
+
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_CACHE_TTL = 300.0
+
+POOLS_KEY = ("pools",)
+
+def pool_key(pool: str) -> Tuple[str, str]:
+    return ("pool", pool)
+
+def sampler_key(pool: str) -> Tuple[str, str]:
+    return ("sampler", pool)
+
+
+class TTLCache:
+    """
+    Thread-safe, bounded LRU cache whose entries also expire after `ttl` seconds.
+    """
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        :param maxsize: Maximum number of keys kept, least recently used are evicted first
+        :param ttl: Seconds before an entry is considered stale
+        :param clock: Monotonic time source (overridable for tests)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        """
+        :return: `(True, value)` on a hit, `(False, None)` on a miss or expired entry.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._data[key]
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+class CachedDb:
+    """
+    Read-through cache in front of `Db` for approved pool data.
+
+    `get_pools`, `show_pool` and the card samplers built from pools are served
+    from memory; writes that can change approved data invalidate exactly the
+    affected pool. Every other method is
+    passed straight through to the wrapped `Db`.
+    """
+    def __init__(self, db: "Db", cache: Optional[TTLCache] = None):
+        """
+        :param db: DB wrapper to cache
+        :param cache: Cache instance, defaults to a `TTLCache` with default settings
+        """
+        self.db = db
+        self.cache = cache if cache is not None else TTLCache()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.db, name)
+
+    def invalidate_pool(self, pool: str, pools_changed: bool = False) -> None:
+        self.cache.invalidate(pool_key(pool))
+        self.cache.invalidate(sampler_key(pool))
+        if pools_changed:
+            self.cache.invalidate(POOLS_KEY)
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
+
+    def get_pools(self) -> List[str]:
+        hit, pools = self.cache.get(POOLS_KEY)
+        if not hit:
+            pools = self.db.get_pools()
+            self.cache.set(POOLS_KEY, pools)
+        return list(pools)
+
+    def show_pool(self, pool: str) -> List[DatasetEntry]:
+        hit, entries = self.cache.get(pool_key(pool))
+        if not hit:
+            entries = self.db.show_pool(pool)
+            self.cache.set(pool_key(pool), entries)
+        return list(entries)
+
+    def get_sampler(self, pool: str) -> PoolSampler:
+        # Alias tables are rebuilt from the cached pool only once it changed.
+        hit, sampler = self.cache.get(sampler_key(pool))
+        if not hit:
+            sampler = PoolSampler(self.show_pool(pool))
+            self.cache.set(sampler_key(pool), sampler)
+        return sampler
+
+    def draw_card(
+        self,
+        pool: str,
+        size: int,
+        sensitivities: Iterable[str] = SENSITIVITY_LEVELS
+    ) -> List[DatasetEntry]:
+        return self.get_sampler(pool).draw(size, sensitivities)
+
+    def approve_prompt(self, uid: int) -> bool:
+        entry = self.db.get_prompt(uid)
+        approved = self.db.approve_prompt(uid)
+        if approved and entry is not None:
+            self.invalidate_pool(entry.pool, pools_changed=True)
+        return approved
+
+    def modify_prompt(
+        self,
+        uid: int,
+        is_privileged_role: bool,
+        prompt: Optional[str],
+        weight: Optional[int],
+        sensitivity: Optional[str],
+        flags: Optional[Tuple[str, ...]]
+    ) -> Optional[DatasetEntry]:
+        entry = self.db.modify_prompt(uid, is_privileged_role, prompt, weight, sensitivity, flags)
+        if entry is not None:
+            self.invalidate_pool(entry.pool)
+        return entry
+
+    def delete_prompt(self, uid: int, is_privileged_role: bool) -> bool:
+        entry = self.db.get_prompt(uid)
+        deleted = self.db.delete_prompt(uid, is_privileged_role)
+        if deleted and entry is not None:
+            self.invalidate_pool(entry.pool, pools_changed=True)
+        return deleted
+
+    def approve_prompts(self, uids: List[int]) -> Optional[BulkResult]:
+        result = self.db.approve_prompts(uids)
+        if result is not None:
+            for pool in result.pools:
+                self.invalidate_pool(pool, pools_changed=True)
+        return result
+
+    def delete_prompts(self, uids: List[int], is_privileged_role: bool) -> Optional[BulkResult]:
+        result = self.db.delete_prompts(uids, is_privileged_role)
+        if result is not None:
+            for pool in result.pools:
+                self.invalidate_pool(pool, pools_changed=True)
+        return result
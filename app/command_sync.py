@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+import discord
+from discord import app_commands
+from discord.errors import Forbidden, HTTPException, RateLimited
+
+from .retry import DEFAULT_BACKOFF_BASE, DEFAULT_MAX_RETRIES, MAX_BACKOFF, RetryPolicy
+
+if TYPE_CHECKING:
+    from .async_db import AsyncDb
+
+logger = logging.getLogger("firestorm_bot")
+
+DEFAULT_SYNC_CONCURRENCY = 4
+
+SYNC_SYNCED = "synced"
+SYNC_UNCHANGED = "unchanged"
+SYNC_FORBIDDEN = "forbidden"
+SYNC_FAILED = "failed"
+
+
+def tree_hash(tree: app_commands.CommandTree, guild: discord.abc.Snowflake) -> str:
+    """
+    SHA-256 of the commands `tree.sync` would upload to `guild`, and of the
+    application they belong to. Commands are hashed in name order, so only a
+    change Discord would see changes the hash.
+    """
+    commands = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 0), command["name"])
+    )
+    document = {"application_id": tree.client.application_id, "commands": commands}
+    data = json.dumps(document, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class CommandSyncer:
+    """
+    Syncs the command tree to guilds, skipping guilds whose commands did not
+    change since their last successful sync (tree hashes are kept in the DB).
+
+    Guilds that need it are synced concurrently, at most `concurrency` at a
+    time. Rate limits are retried after the delay Discord asks for, server
+    errors with exponential backoff.
+    """
+    def __init__(
+        self,
+        tree: app_commands.CommandTree,
+        db: "AsyncDb",
+        concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE
+    ):
+        """
+        :param tree: Command tree to sync
+        :param db: DB the tree hash of every guild is persisted to
+        :param concurrency: Guilds synced at the same time
+        :param max_retries: Retries after the first attempt for retryable failures
+        :param backoff_base: First backoff delay in seconds, doubled on every retry
+        """
+        self.tree = tree
+        self.db = db
+        self.retry = RetryPolicy(max_retries, backoff_base)
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._hashes: Optional[Dict[int, str]] = None
+        self._hashes_lock = asyncio.Lock()
+
+    async def sync_guilds(self, guild_ids: Iterable[int], force: bool = False) -> Dict[int, str]:
+        """
+        Sync every guild that needs it.
+
+        :param force: Sync even guilds whose commands did not change
+        :return: Outcome of every guild: `SYNC_SYNCED`, `SYNC_UNCHANGED`,
+            `SYNC_FORBIDDEN` or `SYNC_FAILED`.
+        """
+        started_at = time.perf_counter()
+        guild_ids = list(dict.fromkeys(guild_ids))
+        outcomes = await asyncio.gather(
+            *(self.sync_guild(guild_id, force) for guild_id in guild_ids)
+        )
+        counts = ", ".join(f"{n} {outcome}" for outcome, n in sorted(Counter(outcomes).items()))
+        logger.info(
+            f"[CommandSync] {len(guild_ids)} guilds in {time.perf_counter() - started_at:.2f}s: "
+            f"{counts}"
+        )
+        return dict(zip(guild_ids, outcomes))
+
+    async def sync_guild(self, guild_id: int, force: bool = False) -> str:
+        """Sync one guild if its commands changed, see `sync_guilds`."""
+        guild = discord.Object(guild_id)
+        digest = tree_hash(self.tree, guild)
+        hashes = await self._load_hashes()
+        if not force and hashes.get(guild_id) == digest:
+            return SYNC_UNCHANGED
+        async with self._semaphore:
+            try:
+                await self.retry.call(
+                    partial(self.tree.sync, guild=guild),
+                    self._retry_delay,
+                    f"[CommandSync] Sync to guild {guild_id}"
+                )
+            except Forbidden:
+                logger.warning(f"[CommandSync] Forbidden, skipping guild {guild_id}")
+                return SYNC_FORBIDDEN
+            except Exception as e: # pylint: disable=broad-exception-caught
+                logger.warning(f"[CommandSync] Skipping guild {guild_id}: {e!r}")
+                return SYNC_FAILED
+        hashes[guild_id] = digest
+        try:
+            await self.db.record_command_hash(guild_id, digest)
+        except Exception as e: # pylint: disable=broad-exception-caught
+            # Synced all the same: the guild is only synced again at the next start.
+            logger.warning(f"[CommandSync] Failed to record the tree hash of {guild_id}: {e}")
+        return SYNC_SYNCED
+
+    async def _load_hashes(self) -> Dict[int, str]:
+        async with self._hashes_lock:
+            if self._hashes is None:
+                try:
+                    self._hashes = await self.db.get_command_hashes()
+                except Exception as e: # pylint: disable=broad-exception-caught
+                    logger.warning(f"[CommandSync] Failed to load tree hashes, syncing all: {e}")
+                    self._hashes = {}
+            return self._hashes
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Rate limits wait as long as Discord asks, server errors back off."""
+        if isinstance(error, RateLimited):
+            return min(MAX_BACKOFF, error.retry_after)
+        # Forbidden and invalid commands will not get better by retrying.
+        if isinstance(error, HTTPException) and error.status >= 500:
+            return self.retry.backoff(attempt)
+        return None
@@ -1,7 +1,18 @@
+import io
+import json
 from abc import ABC
-from typing import Any
+from itertools import islice
+from json.decoder import WHITESPACE
+from json.encoder import encode_basestring_ascii
+from typing import Any, BinaryIO, Iterable, Iterator, List, TextIO
 
-from .app_types import DatasetEntry
+from .app_types import DatasetEntry, join_flags, split_flags
+
+# Entries rendered per write when streaming a pool.
+JSON_CHUNK_SIZE = 1000
+# Characters read at a time when streaming a pool file in.
+JSON_READ_SIZE = 1 << 16
+SENSITIVITIES = ("S", "E", "Q")
 
 
 class Encoder(ABC):
@@ -23,7 +34,7 @@ class TableEncoder(Encoder):
             return self._as_row_pretty(obj)
         raise TypeError(f"Unsupported object type: {type(object)}")
 
-    def get_header_pretty(self) -> str:
+    def get_header_pretty(self, include_reason: bool = False) -> str:
         row = (
             "| "
             "UID | "
@@ -31,11 +42,33 @@ class TableEncoder(Encoder):
             "Prompt | "
             "Weight | "
             "Sensitivity | "
-            "Flags |\n"
+            "Flags |"
         )
-        return row
+        if include_reason:
+            row += " Rejection Reason |"
+        return row + "\n"
+
+    def write_table(
+        self,
+        entries: Iterable[DatasetEntry],
+        sink: BinaryIO,
+        include_reason: bool = False
+    ) -> int:
+        """
+        Write the header and one row per entry to a binary sink as UTF-8,
+        consuming `entries` lazily.
+
+        :param include_reason: Add a column with the rejection reason
+        :return: Number of rows written.
+        """
+        count = 0
+        sink.write(self.get_header_pretty(include_reason).encode("utf-8"))
+        for entry in entries:
+            sink.write(self._as_row_pretty(entry, include_reason).encode("utf-8"))
+            count += 1
+        return count
 
-    def _as_row_pretty(self, obj: DatasetEntry) -> str:
+    def _as_row_pretty(self, obj: DatasetEntry, include_reason: bool = False) -> str:
         row = (
             "| "
             f"{obj.uid} | "
@@ -43,9 +76,11 @@ class TableEncoder(Encoder):
             f"{obj.prompt} | "
             f"{obj.weight} | "
             f"{obj.sensitivity} | "
-            f"{obj.flags} |\n"
+            f"{join_flags(obj.flags)} |"
         )
-        return row
+        if include_reason:
+            row += f" {obj.rejection_reason} |"
+        return row + "\n"
 
 
 class JsonEncoder(Encoder):
@@ -67,6 +102,190 @@ class JsonEncoder(Encoder):
             data["weight"] = obj.weight
         if obj.sensitivity != 'S':
             data["sensitivity"] = obj.sensitivity
-        if obj.flags != "":
-            data["flags"] = [flag.strip() for flag in obj.flags.split(",")]
+        if obj.flags:
+            # Already split (and stripped) when read from the DB.
+            data["flags"] = list(obj.flags)
         return data
+
+    def _from_json_entry(self, data: Any, pool: str) -> DatasetEntry:
+        """
+        Entry of an upstream pool file, not stored yet (UID 0) hence approved.
+        Flags are normalized like user input, dropping blanks and duplicates.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("text"), str):
+            raise ValueError(f"Invalid entry in pool {pool}: {data!r}")
+        weight = data.get("weight", 1)
+        sensitivity = data.get("sensitivity", "S")
+        flags = data.get("flags")
+        if isinstance(weight, bool) or not isinstance(weight, int):
+            raise ValueError(f"Invalid weight in pool {pool}: {weight!r}")
+        if sensitivity not in SENSITIVITIES:
+            raise ValueError(f"Invalid sensitivity in pool {pool}: {sensitivity!r}")
+        if flags:
+            if not isinstance(flags, list) or not all(isinstance(flag, str) for flag in flags):
+                raise ValueError(f"Invalid flags in pool {pool}: {flags!r}")
+            flags = split_flags(",".join(flags))
+        return DatasetEntry(0, pool, data["text"], weight, sensitivity, flags or ())
+
+    def decode(
+        self,
+        string: str,
+        to_type: str = DatasetEntry.__name__,
+        pool: str = ""
+    ) -> List[DatasetEntry]:
+        """
+        Decode a pool file (`{"entries": [...]}`) into its entries.
+
+        :param pool: Pool the entries belong to, i.e. the name of the file
+        :raises ValueError: if the document is not a valid pool file.
+        """
+        if to_type != DatasetEntry.__name__:
+            raise TypeError(f"Unsupported type: {to_type}")
+        return list(self.iter_decode(io.StringIO(string), pool))
+
+    def iter_decode(
+        self,
+        source: TextIO,
+        pool: str,
+        read_size: int = JSON_READ_SIZE
+    ) -> Iterator[DatasetEntry]:
+        """
+        Stream the entries of a pool file, reading `source` `read_size` characters
+        at a time: only one entry is decoded and held in memory at a time. Keys
+        other than `entries` are skipped.
+
+        :raises ValueError: if the document is not a valid pool file.
+        """
+        reader = _JsonReader(source, read_size)
+        reader.expect("{")
+        for _ in reader.members("}"):
+            key = reader.value()
+            reader.expect(":")
+            if key != "entries":
+                reader.value()
+                continue
+            reader.expect("[")
+            for _ in reader.members("]"):
+                yield self._from_json_entry(reader.value(), pool)
+        if reader.peek():
+            raise ValueError("Extra data after the pool document")
+
+    def write_pool(
+        self,
+        entries: Iterable[DatasetEntry],
+        sink: BinaryIO,
+        chunk_size: int = JSON_CHUNK_SIZE
+    ) -> int:
+        """
+        Stream a pool file (`{"entries": [...]}`) to a binary sink, `chunk_size`
+        entries at a time. The output is byte-identical to
+        `json.dumps({"entries": [...]}, indent=2)` encoded as UTF-8, without
+        building the list of entries or the whole document in memory.
+
+        :return: Number of entries written.
+        """
+        entries = iter(entries)
+        count = 0
+        while True:
+            chunk = list(islice(entries, chunk_size))
+            if not chunk:
+                break
+            sink.write(b"{\n  \"entries\": [\n" if count == 0 else b",\n")
+            sink.write(",\n".join(map(_render_entry, chunk)).encode("ascii"))
+            count += len(chunk)
+        sink.write(b"\n  ]\n}" if count else b"{\n  \"entries\": []\n}")
+        return count
+
+
+def _render_entry(obj: DatasetEntry) -> str:
+    """
+    One entry as rendered by `json.dumps(..., indent=2)` inside the pool file.
+    `indent` makes the stdlib fall back to its pure-Python encoder, so the layout
+    is written out here and only strings go through its C encoder (`ensure_ascii`
+    escaping, hence pure ASCII output). Must stay in sync with `JsonEncoder._to_json_entry`.
+    """
+    row = '    {\n      "text": ' + encode_basestring_ascii(obj.prompt)
+    if obj.weight != 1:
+        row += ',\n      "weight": ' + int.__repr__(obj.weight)
+    if obj.sensitivity != 'S':
+        row += ',\n      "sensitivity": ' + encode_basestring_ascii(obj.sensitivity)
+    if obj.flags:
+        row += ',\n      "flags": [\n        '
+        row += ',\n        '.join(map(encode_basestring_ascii, obj.flags))
+        row += '\n      ]'
+    return row + '\n    }'
+
+
+class _JsonReader:
+    """
+    Incremental tokenizer over a JSON text stream. Structural characters are
+    consumed one at a time and values are decoded whole by the stdlib C scanner;
+    a value cut off at the end of the buffer is retried after the next read.
+    """
+    def __init__(self, source: TextIO, read_size: int):
+        self._source = source
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next read to the unconsumed buffer, False at the end of the stream."""
+        data = "" if self._eof else self._source.read(self._read_size)
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, empty at the end of the stream."""
+        if self._pos < len(self._buffer) and self._buffer[self._pos] not in " \t\n\r":
+            return self._buffer[self._pos]
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def accept(self, char: str) -> bool:
+        """Consume `char` if it comes next."""
+        if self.peek() != char:
+            return False
+        self._pos += 1
+        return True
+
+    def expect(self, char: str) -> None:
+        if not self.accept(char):
+            found = self.peek() or "end of file"
+            raise ValueError(f"Expected {char!r} in pool file, found {found!r}")
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number ending the buffer may go on in the next read.
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def members(self, close: str) -> Iterator[None]:
+        """
+        Step through the comma-separated members of the object or array just
+        opened, until `close`. The caller reads each member as it is yielded.
+        """
+        first = True
+        while not self.accept(close):
+            if not first:
+                self.expect(",")
+            first = False
+            yield
@@ -0,0 +1,26 @@
+"""
+Blocking MariaDB access, one query class per feature, all combined into `Db`.
+"""
+from .base import DEFAULT_POOL_SIZE, STREAM_BATCH_SIZE, PoolStats
+from .browse import BrowseQueries
+from .bulk import BulkQueries
+from .prompts import PromptQueries
+from .sync_state import REMOVED_BLOB_OID, SyncStateQueries
+
+__all__ = [
+    "DEFAULT_POOL_SIZE",
+    "STREAM_BATCH_SIZE",
+    "Db",
+    "PoolStats",
+    "REMOVED_BLOB_OID",
+]
+
+
+class Db(PromptQueries, BulkQueries, BrowseQueries, SyncStateQueries):
+    """
+    Wrapper around Database Operations
+
+    Backed by a `mariadb.ConnectionPool`: every operation checks out its own
+    connection and cursor and returns them when done, so the wrapper is safe to
+    share between threads.
+    """
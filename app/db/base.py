@@ -0,0 +1,237 @@
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import mariadb
+
+from ..app_types import DatasetEntry
+from ..migrate import run_migrations
+
+logger = logging.getLogger("firestorm_bot")
+
+DEFAULT_POOL_SIZE = 4
+# Rows fetched per round trip when streaming a pool.
+STREAM_BATCH_SIZE = 500
+DEFAULT_CHECKOUT_TIMEOUT = 10.0
+CHECKOUT_RETRY_INTERVAL = 0.05
+# Columns in `DatasetEntry` field order, so rows map straight onto entries.
+# `f.flag` is one flag per row, joined from `prompt_flags` (see `select_entries`).
+ENTRY_COLUMNS = (
+    "d.id, d.pool, d.prompt, d.weight, d.sensitivity, f.flag, "
+    "d.approved, d.rejected, COALESCE(d.reject_reason, '')"
+)
+FLAGS_COLUMN = DatasetEntry._fields.index("flags")
+
+
+def placeholders(values: List) -> str:
+    """`?, ?, ...` for an `IN (...)` clause over `values`."""
+    return ", ".join("?" * len(values))
+
+
+def select_entries(where: str, page: str = "", rank: Optional[str] = None) -> str:
+    """
+    Query selecting the prompts matching `where` as `ENTRY_COLUMNS`, in id order
+    or best `rank` first. Flags come pre-split: a prompt has one row per flag,
+    in order, or a single row with a NULL flag (see `group_entries`).
+    `page` (e.g. `LIMIT ?`) counts prompts, it applies before flags are joined.
+    Parameters of `rank` come first, then those of `where` and `page`.
+    """
+    columns = "id, pool, prompt, weight, sensitivity, approved, rejected, reject_reason"
+    order = "id"
+    if rank is not None:
+        columns += f", {rank} AS entry_rank"
+        order = "entry_rank DESC, id"
+    return (
+        f"SELECT {ENTRY_COLUMNS} FROM "
+        f"(SELECT {columns} FROM dataset WHERE {where} ORDER BY {order} {page}) d "
+        "LEFT JOIN prompt_flags f ON f.prompt_id = d.id "
+        f"ORDER BY {'d.entry_rank DESC, ' if rank is not None else ''}d.id, f.position"
+    )
+
+
+def group_entries(rows: Iterable[tuple]) -> Iterator[DatasetEntry]:
+    """Fold the rows of a `select_entries` query, one per flag, into one entry per prompt."""
+    for _uid, prompt_rows in groupby(rows, key=itemgetter(0)):
+        first, *others = prompt_rows
+        # A prompt without flags has a single row, with a NULL flag.
+        flags = () if first[FLAGS_COLUMN] is None else (
+            first[FLAGS_COLUMN], *(row[FLAGS_COLUMN] for row in others)
+        )
+        yield DatasetEntry._make((*first[:FLAGS_COLUMN], flags, *first[FLAGS_COLUMN + 1:]))
+
+
+def iter_rows(cur: mariadb.Cursor, batch_size: int) -> Iterator[tuple]:
+    """Every remaining row of an unbuffered `cur`, fetched `batch_size` rows at a time."""
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def fetch_entries(cur: mariadb.Cursor) -> List[DatasetEntry]:
+    """Every entry left in the result of a `select_entries` query."""
+    return list(group_entries(cur.fetchall()))
+
+
+class PoolStats:
+    """
+    Counters describing how connections are checked out of the pool.
+    Used to size `DB_POOL_SIZE` for peak event traffic.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.exhaustions = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+
+    def record_checkout(self, wait: float, exhausted: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if exhausted:
+                self.exhaustions += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def record_release(self) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_wait = self.total_wait / self.checkouts if self.checkouts else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "exhaustions": self.exhaustions,
+                "avg_wait_ms": round(avg_wait * 1000, 3),
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+            }
+
+
+class DbBase:
+    """
+    Connection pool shared by the query classes making up `Db`.
+
+    Backed by a `mariadb.ConnectionPool`: every operation checks out its own
+    connection and cursor and returns them when done, so the wrapper is safe to
+    share between threads.
+    """
+    def __init__(self,
+        password: str,
+        host: str = "127.0.0.1",
+        user: str = "root",
+        port: int = 3306,
+        database: str = "bingo-dataset",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT
+    ):
+        """
+        :param pool_size: Number of pooled connections
+        :param checkout_timeout: Seconds to wait for a free connection before giving up
+        """
+        self.pool_size = pool_size
+        self.checkout_timeout = checkout_timeout
+        self.stats = PoolStats()
+        try:
+            self.pool = mariadb.ConnectionPool(
+                pool_name=f"firestorm-{database}",
+                pool_size=pool_size,
+                user=user,
+                password=password,
+                host=host,
+                port=port,
+                database=database,
+            )
+            logger.info(f"Successfully connected to {database} (pool size {pool_size})!")
+
+            # Run migrations/database initializations
+            conn = self._get_connection()
+            try:
+                applied = run_migrations(conn)
+            finally:
+                conn.close()
+                self.stats.record_release()
+            logger.info(f"Database successfully migrated ({applied} migrations applied).")
+        except mariadb.OperationalError as e:
+            logger.error(f"DB connection error: {e}")
+            sys.exit(1)
+        except mariadb.Error as e:
+            logger.error(f"DB error: {e}")
+            sys.exit(1)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        logger.info(f"[Db] Connection pool stats: {self.stats.snapshot()}")
+        self.pool.close()
+
+    def _get_connection(self) -> mariadb.Connection:
+        """
+        Check a connection out of the pool, waiting up to `checkout_timeout`
+        seconds if every connection is busy.
+        """
+        start = time.monotonic()
+        exhausted = False
+        while True:
+            try:
+                conn = self.pool.get_connection()
+                break
+            except mariadb.PoolError:
+                waited = time.monotonic() - start
+                if not exhausted:
+                    exhausted = True
+                    logger.warning(
+                        f"[Db] Connection pool exhausted ({self.pool_size} in use), waiting..."
+                    )
+                if waited >= self.checkout_timeout:
+                    self.stats.record_checkout(waited, exhausted)
+                    self.stats.record_release()
+                    logger.error(
+                        f"[Db] No connection available after {waited:.2f}s: "
+                        f"{self.stats.snapshot()}"
+                    )
+                    raise
+                time.sleep(CHECKOUT_RETRY_INTERVAL)
+        wait = time.monotonic() - start
+        self.stats.record_checkout(wait, exhausted)
+        if exhausted:
+            logger.warning(
+                f"[Db] Waited {wait * 1000:.1f}ms for a pooled connection: "
+                f"{self.stats.snapshot()}"
+            )
+        return conn
+
+    @contextmanager
+    def _cursor(self, **cursor_kwargs) -> Iterator[Tuple[mariadb.Connection, mariadb.Cursor]]:
+        """
+        Yields a `(connection, cursor)` pair checked out for a single operation.
+        Uncommitted work is rolled back before the connection goes back to the pool.
+        """
+        conn = self._get_connection()
+        try:
+            cur = conn.cursor(**cursor_kwargs)
+            try:
+                yield conn, cur
+            finally:
+                cur.close()
+        finally:
+            try:
+                conn.rollback()
+            except mariadb.Error:
+                pass
+            # Closing a pooled connection returns it to the pool.
+            conn.close()
+            self.stats.record_release()
@@ -0,0 +1,162 @@
+from typing import Iterator, List, Optional, Tuple
+
+import mariadb
+
+from ..app_types import DatasetEntry
+from ..search import STATUS_FILTERS
+from .base import (
+    STREAM_BATCH_SIZE,
+    DbBase,
+    fetch_entries,
+    group_entries,
+    iter_rows,
+    logger,
+    select_entries,
+)
+
+
+def _queue_filter(
+    rejected: bool,
+    pool: Optional[str],
+    sensitivity: Optional[str]
+) -> Tuple[str, list]:
+    """`WHERE` clause and parameters selecting the pending (or rejected) prompts."""
+    where = "approved = 0 AND rejected = ?"
+    params: list = [rejected]
+    if pool is not None:
+        where += " AND pool = ?"
+        params.append(pool)
+    if sensitivity is not None:
+        where += " AND sensitivity = ?"
+        params.append(sensitivity)
+    return where, params
+
+
+class BrowseQueries(DbBase):
+    """
+    Browsing the moderation queues, searching prompts and counting flags.
+    """
+    def get_queue_page(
+        self,
+        rejected: bool,
+        after_uid: int,
+        limit: int,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        """
+        Keyset-paginated view of the pending (or rejected) prompts: up to `limit`
+        entries with an id greater than `after_uid`, in id order.
+
+        :param rejected: List rejected prompts instead of the ones pending approval
+        :param pool: Only list prompts of this pool
+        :param sensitivity: Only list prompts with this sensitivity
+        """
+        where, params = _queue_filter(rejected, pool, sensitivity)
+        entries = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(
+                    select_entries(f"{where} AND id > ?", "LIMIT ?"), params + [after_uid, limit]
+                )
+                entries = fetch_entries(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error retrieving prompt queue: {e}")
+        return entries
+
+    def iter_queue(
+        self,
+        rejected: bool,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None,
+        batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[DatasetEntry]:
+        """
+        Stream the pending (or rejected) prompts from an unbuffered cursor,
+        with the same filters as `get_queue_page`. Used for bulk exports.
+        Raises `mariadb.Error` if the query fails, even partway through.
+        """
+        where, params = _queue_filter(rejected, pool, sensitivity)
+        try:
+            with self._cursor(buffered=False) as (_conn, cur):
+                cur.execute(select_entries(where), params)
+                yield from group_entries(iter_rows(cur, batch_size))
+        except mariadb.Error as e:
+            # Raised rather than ending the stream early, which would pass for a
+            # complete (if short) export.
+            logger.warning(f"Error streaming prompt queue: {e}")
+            raise
+
+    def search_prompts(
+        self,
+        query: Optional[str],
+        status: str,
+        offset: int,
+        limit: int,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None,
+        flag: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        """
+        Full-text search over prompts, best matches first.
+        Without a `query`, lists every prompt matching the filters in id order.
+        Raises `mariadb.Error` if the query fails, an empty result would read as no match.
+
+        :param query: Boolean-mode query, see `search.fulltext_query`
+        :param status: Key of `search.STATUS_FILTERS`
+        :param offset: Number of results to skip
+        :param flag: Only match prompts with this flag
+        """
+        where = STATUS_FILTERS[status]
+        params: list = []
+        rank = None
+        if query is not None:
+            rank = "MATCH (prompt) AGAINST (? IN BOOLEAN MODE)"
+            where += f" AND {rank}"
+            # Once for the rank, selected before the WHERE clause, once for the filter.
+            params += [query, query]
+        if pool is not None:
+            where += " AND pool = ?"
+            params.append(pool)
+        if sensitivity is not None:
+            where += " AND sensitivity = ?"
+            params.append(sensitivity)
+        if flag is not None:
+            where += (
+                " AND EXISTS (SELECT 1 FROM prompt_flags "
+                "WHERE prompt_id = dataset.id AND flag = ?)"
+            )
+            params.append(flag)
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(
+                    select_entries(where, "LIMIT ? OFFSET ?", rank), params + [limit, offset]
+                )
+                return fetch_entries(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error searching prompts: {e}")
+            raise
+
+    def get_flag_counts(self, pool: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        `(flag, number of prompts)` over approved prompts, most used first.
+        Counted by the DB from the `prompt_flags` index.
+        """
+        where = "d.approved = 1"
+        params = []
+        if pool is not None:
+            where += " AND d.pool = ?"
+            params.append(pool)
+        counts = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(
+                    "SELECT f.flag, COUNT(*) FROM prompt_flags f "
+                    f"JOIN dataset d ON d.id = f.prompt_id WHERE {where} "
+                    "GROUP BY f.flag ORDER BY COUNT(*) DESC, f.flag",
+                    params
+                )
+                counts = list(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error counting flags: {e}")
+        return counts
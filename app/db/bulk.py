@@ -0,0 +1,143 @@
+from typing import List, Optional
+
+import mariadb
+
+from ..app_types import (
+    BULK_ALREADY_APPROVED,
+    BULK_ALREADY_REJECTED,
+    BULK_DONE,
+    BULK_NOT_ALLOWED,
+    BulkResult,
+)
+from .base import DbBase, logger, placeholders
+
+
+class BulkQueries(DbBase):
+    """
+    Moderating many prompts at once, each call in a single transaction.
+    """
+    def approve_prompts(self, uids: List[int]) -> Optional[BulkResult]:
+        """
+        Approve every ID in `uids` in a single transaction.
+        Assumptions: user privilege has already been checked beforehand.
+        Returns None if the transaction failed (nothing is applied).
+        """
+        result = BulkResult(uids)
+        try:
+            with self._cursor() as (conn, cur):
+                rows = self._lock_rows(cur, uids, "pool, approved")
+                approve = []
+                for uid, pool, approved in rows:
+                    if approved == 1:
+                        result.outcomes[uid] = BULK_ALREADY_APPROVED
+                        continue
+                    result.outcomes[uid] = BULK_DONE
+                    result.pools.add(pool)
+                    approve.append(uid)
+                if approve:
+                    cur.execute(
+                        f"UPDATE dataset SET approved = 1 WHERE id IN ({placeholders(approve)})",
+                        approve
+                    )
+                conn.commit()
+            return result
+        except mariadb.Error as e:
+            logger.warning(f"Failed to bulk approve {len(uids)} prompts: {e}")
+            return None
+
+    def reject_prompts(self, uids: List[int], reason: str) -> Optional[BulkResult]:
+        """
+        Reject every pending ID in `uids` in a single transaction.
+        Approved entries are left alone, they need to be deleted instead.
+        Assumptions: user privilege has already been checked beforehand.
+        Returns None if the transaction failed (nothing is applied).
+        """
+        result = BulkResult(uids)
+        try:
+            with self._cursor() as (conn, cur):
+                rows = self._lock_rows(cur, uids, "approved, rejected")
+                reject = []
+                for uid, approved, rejected in rows:
+                    if approved == 1:
+                        result.outcomes[uid] = BULK_ALREADY_APPROVED
+                    elif rejected == 1:
+                        result.outcomes[uid] = BULK_ALREADY_REJECTED
+                    else:
+                        result.outcomes[uid] = BULK_DONE
+                        reject.append(uid)
+                if reject:
+                    cur.execute(
+                        "UPDATE dataset SET rejected = 1, reject_reason = ? "
+                        f"WHERE id IN ({placeholders(reject)})",
+                        [reason, *reject]
+                    )
+                conn.commit()
+            return result
+        except mariadb.Error as e:
+            logger.warning(f"Failed to bulk reject {len(uids)} prompts: {e}")
+            return None
+
+    def delete_prompts(self, uids: List[int], is_privileged_role: bool) -> Optional[BulkResult]:
+        """
+        Delete every ID in `uids` in a single transaction.
+        Non-privileged users can only delete unapproved entries, approved ones are skipped.
+        Returns None if the transaction failed (nothing is applied).
+        """
+        result = BulkResult(uids)
+        try:
+            with self._cursor() as (conn, cur):
+                rows = self._lock_rows(cur, uids, "pool, approved")
+                delete = []
+                tombstones = []
+                for uid, pool, approved in rows:
+                    if approved == 1:
+                        if not is_privileged_role:
+                            result.outcomes[uid] = BULK_NOT_ALLOWED
+                            continue
+                        # Deleting an approved prompt changes the exported pool.
+                        result.pools.add(pool)
+                        tombstones.append((pool,))
+                    result.outcomes[uid] = BULK_DONE
+                    delete.append(uid)
+                if delete:
+                    cur.execute(
+                        f"DELETE FROM dataset WHERE id IN ({placeholders(delete)})", delete
+                    )
+                if tombstones:
+                    cur.executemany(
+                        "INSERT INTO dataset_tombstones (pool) VALUES (?)", tombstones
+                    )
+                conn.commit()
+            return result
+        except mariadb.Error as e:
+            logger.warning(f"Failed to bulk delete {len(uids)} prompts: {e}")
+            return None
+
+    def get_pending_ids(self, pool: str, limit: int) -> List[int]:
+        """Up to `limit` IDs of prompts of `pool` still pending approval, in id order."""
+        uids = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(
+                    "SELECT id FROM dataset WHERE pool = ? AND approved = 0 AND rejected = 0 "
+                    "ORDER BY id LIMIT ?",
+                    (pool, limit)
+                )
+                uids = [row[0] for row in cur]
+        except mariadb.Error as e:
+            logger.warning(f"Error retrieving pending prompts of {pool}: {e}")
+        return uids
+
+    @staticmethod
+    def _lock_rows(cur: mariadb.Cursor, uids: List[int], columns: str) -> List[tuple]:
+        """
+        `SELECT id, <columns>` for every existing ID in `uids`, locking the rows
+        until the end of the transaction so they cannot change under a bulk update.
+        """
+        if not uids:
+            return []
+        cur.execute(
+            f"SELECT id, {columns} FROM dataset WHERE id IN ({placeholders(uids)}) FOR UPDATE",
+            uids
+        )
+        return cur.fetchall()
@@ -0,0 +1,294 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import mariadb
+
+from ..app_types import ERROR_ENTRY_EXISTS, ERROR_MARIA_DB, DatasetEntry
+from ..sampling import SENSITIVITY_LEVELS, PoolSampler
+from .base import (
+    STREAM_BATCH_SIZE,
+    DbBase,
+    fetch_entries,
+    group_entries,
+    iter_rows,
+    logger,
+    select_entries,
+)
+
+# MariaDB error code for a unique key violation.
+ER_DUP_ENTRY = 1062
+
+
+def _insert_flags(cur: mariadb.Cursor, uid: int, flags: Tuple[str, ...]) -> None:
+    """Batch insert the flags of a prompt, in order."""
+    if flags:
+        cur.executemany(
+            "INSERT INTO prompt_flags (prompt_id, flag, position) VALUES (?, ?, ?)",
+            [(uid, flag, position) for position, flag in enumerate(flags)]
+        )
+
+
+class PromptQueries(DbBase):
+    """
+    Adding and moderating single prompts, and reading approved pools.
+    """
+    def add_prompt(
+        self,
+        pool: str,
+        prompt: str,
+        weight: int,
+        sensitivity: str,
+        flags: Tuple[str, ...]
+    ) -> int:
+        """
+        Returns ID of the last row inserted.
+        """
+        try:
+            with self._cursor() as (conn, cur):
+                # The unique (pool, prompt) key makes the duplicate check and the
+                # insert a single atomic statement.
+                cur.execute(
+                    "INSERT INTO dataset (pool, prompt, weight, sensitivity, approved) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (pool, prompt, weight, sensitivity, False)
+                )
+                uid = cur.lastrowid
+                _insert_flags(cur, uid, flags)
+                conn.commit()
+                return uid
+        except mariadb.IntegrityError as e:
+            if e.errno == ER_DUP_ENTRY:
+                return ERROR_ENTRY_EXISTS
+            logger.warning(f"Error adding prompt: {e}")
+            return ERROR_MARIA_DB
+        except mariadb.Error as e:
+            logger.warning(f"Error adding prompt: {e}")
+            return ERROR_MARIA_DB
+
+    def approve_prompt(self, uid: int) -> bool:
+        """
+        Assumptions: user privilege has already been checked beforehand.
+        """
+        try:
+            with self._cursor() as (conn, cur):
+                cur.execute("UPDATE dataset SET approved = 1 WHERE id = ?", (uid,))
+                conn.commit()
+            return True
+        except mariadb.Error as e:
+            logger.warning(f"Failed to approve {uid}: {e}")
+            return False
+
+    def reject_prompt(self, uid: int, reason: str) -> bool:
+        """
+        Assumptions: user privilege has already been checked beforehand.
+        """
+        try:
+            with self._cursor() as (conn, cur):
+                cur.execute(
+                    "UPDATE dataset SET rejected = 1, reject_reason = ? WHERE id = ?",
+                    (reason, uid)
+                )
+                conn.commit()
+            return True
+        except mariadb.Error as e:
+            logger.warning(f"Failed to reject {uid}: {e}")
+            return False
+
+    def modify_prompt(
+        self,
+        uid: int,
+        is_privileged_role: bool,
+        prompt: Optional[str],
+        weight: Optional[int],
+        sensitivity: Optional[str],
+        flags: Optional[Tuple[str, ...]]
+    ) -> Optional[DatasetEntry]:
+        """
+        If privileged user, allow them to edit from dataset arbitrarily.
+        If non-privileged user, only allow editing of unapproved entries that have not been rejected.
+
+        A single `UPDATE` sets only the supplied columns, with the permission check
+        folded into its `WHERE` clause, followed by one read of the updated row.
+        New flags replace the old ones in the same transaction.
+        Returns None if the entry does not exist or the DB failed.
+        """
+        updates = {"prompt": prompt, "weight": weight, "sensitivity": sensitivity}
+        columns = [column for column, value in updates.items() if value]
+        try:
+            with self._cursor() as (conn, cur):
+                if columns or flags:
+                    # updated_at is set explicitly, a flags-only edit changes no other column.
+                    query = "UPDATE dataset SET " + ", ".join(
+                        [f"{c} = ?" for c in columns] + ["updated_at = CURRENT_TIMESTAMP"]
+                    )
+                    query += " WHERE id = ?"
+                    if not is_privileged_role:
+                        query += " AND approved = 0 AND rejected = 0"
+                    cur.execute(query, [updates[c] for c in columns] + [uid])
+                # MariaDB has no UPDATE ... RETURNING: read the row back in the same
+                # transaction, it stays locked by the UPDATE until the commit.
+                cur.execute(select_entries("id = ?"), (uid,))
+                entry = next(group_entries(cur.fetchall()), None)
+                if entry is None:
+                    return None
+                # A non-privileged UPDATE only matches pending entries.
+                if not is_privileged_role:
+                    if entry.approved:
+                        raise PermissionError(
+                            "User does not have permission to modify an approved entry."
+                        )
+                    if entry.rejected:
+                        raise PermissionError("Rejected entry cannot be modified!")
+                if flags:
+                    cur.execute("DELETE FROM prompt_flags WHERE prompt_id = ?", (uid,))
+                    _insert_flags(cur, uid, flags)
+                    entry = entry._replace(flags=flags)
+                conn.commit()
+            return entry
+        except mariadb.Error as e:
+            logger.warning(f"Failed to modify {uid}: {e}")
+            return None
+
+    def delete_prompt(self, uid: int, is_privileged_role: bool) -> bool:
+        """
+        If privileged user, allow them to delete from dataset arbitrarily.
+        If non-privileged user, only allow deleting of unapproved entries.
+        """
+        if not is_privileged_role:
+            try:
+                with self._cursor() as (_conn, cur):
+                    cur.execute("SELECT approved from dataset where id = ?", (uid,))
+                    approved = cur.fetchone()[0]
+                # If previously approved, reject.
+                if approved == 1:
+                    raise PermissionError("Not privileged enough")
+            except mariadb.Error as e:
+                logger.warning(f"Error retrieving {uid}: {e}")
+        try:
+            with self._cursor() as (conn, cur):
+                cur.execute("DELETE FROM dataset WHERE id = ? RETURNING pool, approved", (uid,))
+                row = cur.fetchone()
+                # Deleting an approved prompt changes the exported pool.
+                if row is not None and row[1] == 1:
+                    cur.execute("INSERT INTO dataset_tombstones (pool) VALUES (?)", (row[0],))
+                conn.commit()
+            return True
+        except mariadb.Error as e:
+            logger.warning(f"Failed to delete {uid}: {e}")
+            return False
+
+    def get_prompt(self, uid: int) -> Optional[DatasetEntry]:
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(select_entries("id = ?"), (uid,))
+                return next(group_entries(cur.fetchall()), None)
+        except mariadb.Error as e:
+            logger.warning(f"Error retrieving {uid}: {e}")
+            return None
+
+    def get_pending_prompts(self) -> List[DatasetEntry]:
+        entries = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(select_entries("approved = 0 AND rejected = 0"))
+                entries = fetch_entries(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error retrieving pools: {e}")
+        return entries
+
+    def get_rejected_prompts(self) -> List[DatasetEntry]:
+        entries = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(select_entries("approved = 0 AND rejected = 1"))
+                entries = fetch_entries(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error retrieving pools: {e}")
+        return entries
+
+    def get_pools(self) -> List[str]:
+        pools = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute("SELECT DISTINCT pool FROM dataset where approved = 1")
+                for row in cur:
+                    pools.append(row[0])
+        except mariadb.Error as e:
+            logger.warning(f"Error retrieving pools: {e}")
+        return pools
+
+    def show_pool(self, pool: str) -> List[DatasetEntry]:
+        entries = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(select_entries("pool = ? AND approved = 1"), (pool,))
+                entries = fetch_entries(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error showing pool {pool}: {e}")
+        return entries
+
+    def get_sampler(self, pool: str) -> PoolSampler:
+        """Weighted sampler of bingo cards over the approved entries of a pool."""
+        return PoolSampler(self.show_pool(pool))
+
+    def draw_card(
+        self,
+        pool: str,
+        size: int,
+        sensitivities: Iterable[str] = SENSITIVITY_LEVELS
+    ) -> List[DatasetEntry]:
+        """
+        Up to `size` distinct approved prompts of a pool with one of the given
+        sensitivities, drawn by weight.
+        """
+        return self.get_sampler(pool).draw(size, sensitivities)
+
+    def iter_pool(self, pool: str, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[DatasetEntry]:
+        """
+        Stream approved entries of a pool from an unbuffered (server-side) cursor,
+        `batch_size` rows at a time, instead of materializing the whole pool.
+        The pooled connection is held until the iterator is exhausted or closed.
+        Raises `mariadb.Error` if the query fails, even partway through.
+        """
+        try:
+            with self._cursor(buffered=False) as (_conn, cur):
+                cur.execute(select_entries("pool = ? AND approved = 1"), (pool,))
+                yield from group_entries(iter_rows(cur, batch_size))
+        except mariadb.Error as e:
+            # Raised rather than ending the stream early, see `iter_queue`.
+            logger.warning(f"Error streaming pool {pool}: {e}")
+            raise
+
+    def iter_prompt_texts(
+        self,
+        batch_size: int = STREAM_BATCH_SIZE
+    ) -> Iterator[Tuple[int, str, str]]:
+        """
+        Stream `(id, pool, prompt)` of every prompt from an unbuffered cursor,
+        used to build the in-memory similarity index.
+        Raises `mariadb.Error` if the query fails, even partway through.
+        """
+        try:
+            with self._cursor(buffered=False) as (_conn, cur):
+                cur.execute("SELECT id, pool, prompt FROM dataset ORDER BY id")
+                yield from iter_rows(cur, batch_size)
+        except mariadb.Error as e:
+            # Raised rather than ending the stream early, see `iter_queue`.
+            logger.warning(f"Error streaming prompts: {e}")
+            raise
+
+    def show_pool_page(self, pool: str, after_uid: int, limit: int) -> List[DatasetEntry]:
+        """
+        Keyset-paginated view of a pool: up to `limit` approved entries with an id
+        greater than `after_uid`, in id order.
+        """
+        entries = []
+        try:
+            with self._cursor() as (_conn, cur):
+                cur.execute(
+                    select_entries("pool = ? AND approved = 1 AND id > ?", "LIMIT ?"),
+                    (pool, after_uid, limit)
+                )
+                entries = fetch_entries(cur)
+        except mariadb.Error as e:
+            logger.warning(f"Error showing pool {pool}: {e}")
+        return entries
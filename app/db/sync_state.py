@@ -0,0 +1,91 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .base import DbBase
+
+# Blob id recorded for a pool whose file the sync removed, kept until the file is
+# gone upstream too. The null object id never names a real blob.
+REMOVED_BLOB_OID = "0" * 40
+
+
+class SyncStateQueries(DbBase):
+    """
+    Watermarks of the dataset sync to Github and of the command tree sync to
+    Discord. Errors are raised, a sync must not record state it did not reach.
+    """
+    def db_now(self) -> datetime:
+        """Current time according to the DB server, used for sync watermarks."""
+        with self._cursor() as (_conn, cur):
+            cur.execute("SELECT NOW()")
+            return cur.fetchone()[0]
+
+    def get_sync_state(self) -> Tuple[Optional[datetime], Dict[str, str]]:
+        """
+        :return: Watermark of the last successful sync (None if never synced),
+            and the git blob id last synced for each pool (`REMOVED_BLOB_OID`
+            if its file was removed).
+        """
+        with self._cursor() as (_conn, cur):
+            cur.execute("SELECT last_synced_at FROM sync_state WHERE id = 1")
+            row = cur.fetchone()
+            watermark = row[0] if row is not None else None
+            cur.execute("SELECT pool, blob_oid FROM pool_sync_state")
+            blob_oids = dict(cur)
+        return watermark, blob_oids
+
+    def get_changed_pools(self, since: Optional[datetime]) -> List[str]:
+        """
+        Pools with any entry added, modified or deleted since `since`.
+        If `since` is None, every pool with approved entries is returned.
+        """
+        with self._cursor() as (_conn, cur):
+            if since is None:
+                cur.execute("SELECT DISTINCT pool FROM dataset WHERE approved = 1")
+            else:
+                # >= since updated_at only has a resolution of one second.
+                cur.execute(
+                    "SELECT pool FROM dataset WHERE updated_at >= ? "
+                    "UNION SELECT pool FROM dataset_tombstones WHERE deleted_at >= ?",
+                    (since, since)
+                )
+            return [row[0] for row in cur]
+
+    def record_sync(self, synced_at: datetime, blob_oids: Dict[str, Optional[str]]) -> None:
+        """
+        Store the watermark and per-pool blob ids of a successful sync in one
+        transaction, and prune tombstones the watermark has moved past.
+        A blob id of None forgets the pool, once its removal has landed upstream.
+        """
+        synced = [(pool, oid) for pool, oid in blob_oids.items() if oid is not None]
+        forgotten = [(pool,) for pool, oid in blob_oids.items() if oid is None]
+        with self._cursor() as (conn, cur):
+            if synced:
+                cur.executemany(
+                    "INSERT INTO pool_sync_state (pool, blob_oid) VALUES (?, ?) "
+                    "ON DUPLICATE KEY UPDATE blob_oid = VALUES(blob_oid)",
+                    synced
+                )
+            if forgotten:
+                cur.executemany("DELETE FROM pool_sync_state WHERE pool = ?", forgotten)
+            cur.execute(
+                "INSERT INTO sync_state (id, last_synced_at) VALUES (1, ?) "
+                "ON DUPLICATE KEY UPDATE last_synced_at = VALUES(last_synced_at)",
+                (synced_at,)
+            )
+            cur.execute("DELETE FROM dataset_tombstones WHERE deleted_at < ?", (synced_at,))
+            conn.commit()
+
+    def get_command_hashes(self) -> Dict[int, str]:
+        """Hash of the command tree last synced to each guild."""
+        with self._cursor() as (_conn, cur):
+            cur.execute("SELECT guild_id, tree_hash FROM command_sync_state")
+            return dict(cur)
+
+    def record_command_hash(self, guild_id: int, tree_hash: str) -> None:
+        with self._cursor() as (conn, cur):
+            cur.execute(
+                "INSERT INTO command_sync_state (guild_id, tree_hash) VALUES (?, ?) "
+                "ON DUPLICATE KEY UPDATE tree_hash = VALUES(tree_hash)",
+                (guild_id, tree_hash)
+            )
+            conn.commit()
@@ -1,13 +1,23 @@
 import logging
 import shutil
 from pathlib import Path
+from typing import Dict, Optional
 
 import pygit2
-import requests
+from pygit2.enums import CheckoutStrategy, ResetMode
+
+from .github import GithubClient
 
 logger = logging.getLogger("firestorm_bot")
 
 DATASET_BRANCH = "dataset-updates"
+# Where the pool JSON files live inside the bingo repo.
+DATASETS_DIR = "app/datasets"
+
+def dataset_path(pool: str) -> str:
+    """Repo-relative path of the JSON file for a pool."""
+    pool_filename = pool.replace(" ", "_") + ".json"
+    return f"{DATASETS_DIR}/{pool_filename}"
 
 class GitCallbacks(pygit2.RemoteCallbacks):
     def __init__(self, user=None, token=None, pub_key=None, priv_key=None, passphrase=None):
@@ -32,8 +42,19 @@ class GitWrapper:
         git_token: str,
         upstream_repo: str,
         forked_repo: str,
-        local_path: str
+        local_path: str,
+        persistent: bool = True,
+        remote_url: Optional[str] = None,
+        depth: int = 1,
+        github: Optional[GithubClient] = None
     ):
+        """
+        :param persistent: Keep the local repo between syncs and fast-forward it,
+            instead of deleting and recloning it every time.
+        :param remote_url: URL to clone/fetch the fork from, defaults to the fork on Github.
+        :param depth: How many commits to clone/fetch, 0 for the full history.
+        :param github: Github API client, defaults to one authenticated with `git_token`.
+        """
         self.git_user = git_user
         self.git_token = git_token
         # Format: <username>/<repo_name>
@@ -42,6 +63,10 @@ class GitWrapper:
         self.forked_repo = forked_repo
         # Local path to the forked git repo.
         self.local_path = Path(local_path)
+        self.persistent = persistent
+        self.remote_url = remote_url or f"https://github.com/{forked_repo}.git"
+        self.depth = depth
+        self.github = github if github is not None else GithubClient(git_token)
 
     def get_local_path(self) -> str:
         return str(self.local_path)
@@ -57,38 +82,80 @@ class GitWrapper:
             callbacks=GitCallbacks(user=self.git_user, token=self.git_token)
         )
 
-    def sync_forked_repo_with_upstream(self) -> str | Exception:
+    async def sync_forked_repo_with_upstream(self) -> str | Exception:
         """
         Sync the main branch of the forked repo with the upstream,
         to ensure it has the latest changes.
         """
-
-        headers = {
-            "Authorization": f"Bearer {self.git_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2026-03-10"
-        }
-
         data = {
             "branch": "main",
         }
 
-        response = requests.post(
-            f"https://api.github.com/repos/{self.forked_repo}/merge-upstream",
-            headers=headers,
+        response = await self.github.request(
+            "POST",
+            f"/repos/{self.forked_repo}/merge-upstream",
             json=data,
-            timeout=5
+            headers={"X-GitHub-Api-Version": "2026-03-10"}
         )
 
-        if response.status_code != 200:
-            return RuntimeError(str(response.json()))
-        resp = response.json()
-        return resp["message"]
+        if response.status != 200:
+            return RuntimeError(str(response.body))
+        return response.body["message"]
+
+    def prepare_repo(self, branch: str = "main") -> pygit2.Repository:
+        """
+        Get a local checkout matching the remote `branch`, reusing the repo on
+        disk in persistent mode.
+        """
+        if self.persistent:
+            return self.update_local_repo(branch)
+        return self.clone_fresh(branch)
+
+    def update_local_repo(self, branch: str = "main") -> pygit2.Repository:
+        """
+        1. Opens the repo kept at the local path.
+        2. Fetches `origin/<branch>` and hard-resets the working tree to it,
+           dropping local changes and untracked files.
+        3. Falls back to a clean clone if the repo is missing or corrupt.
+
+        :param branch: Branch to update, defaults to main.
+        """
+        if not self.local_path.exists():
+            return self.clone_fresh(branch)
+        try:
+            repo = pygit2.Repository(str(self.local_path))
+            if repo.is_bare:
+                raise pygit2.GitError("local repo is bare")
+            remote = repo.remotes["origin"]
+            if remote.url != self.remote_url:
+                repo.remotes.set_url("origin", self.remote_url)
+                remote = repo.remotes["origin"]
+            remote.fetch(
+                [f"+refs/heads/{branch}:refs/remotes/origin/{branch}"],
+                callbacks=GitCallbacks(user=self.git_user, token=self.git_token),
+                depth=self.depth
+            )
+            target = repo.references[f"refs/remotes/origin/{branch}"].target
+            local_ref = f"refs/heads/{branch}"
+            if local_ref in repo.references:
+                repo.references[local_ref].set_target(target)
+            else:
+                repo.references.create(local_ref, target)
+            repo.checkout(
+                local_ref,
+                strategy=CheckoutStrategy.FORCE | CheckoutStrategy.REMOVE_UNTRACKED
+            )
+            repo.reset(target, ResetMode.HARD)
+            logger.info(f"[GitWrapper] Local repo reset to origin/{branch} ({target}).")
+            return repo
+        except (pygit2.GitError, KeyError, ValueError) as e:
+            logger.warning(f"[GitWrapper] Local repo unusable, recloning: {e}")
+            return self.clone_fresh(branch)
 
     def clone_fresh(
         self,
         branch: str = "main",
-        depth: int = 1
+        depth: Optional[int] = None
     ) -> pygit2.Repository:
         """
         1. Checks whether the repo exists locally.
@@ -96,67 +163,136 @@ class GitWrapper:
         3. Now clone or re-clone the repo.
 
         :param branch: Branch to clone, defaults to main.
-        :param depth: How many commits to clone, default to only the head.
+        :param depth: How many commits to clone, defaults to the wrapper's depth.
         """
         if self.local_path.exists():
             shutil.rmtree(self.local_path)
 
         return pygit2.clone_repository(
-            f"https://github.com/{self.forked_repo}.git",
+            self.remote_url,
             str(self.local_path),
             checkout_branch=branch,
-            depth=depth,
+            depth=self.depth if depth is None else depth,
         )
 
-    def commit_changes(self, repo: pygit2.Repository) -> None:
-        # Create a new branch for our changes
-        last_commit = repo.revparse_single("HEAD")
-        _new_branch = repo.branches.local.create(DATASET_BRANCH, last_commit)
-        repo.checkout(repo.branches.local[DATASET_BRANCH])
-
-        # Commit the changes.
-        index = repo.index
-        index.add_all()
-        ref = repo.head.name
-        parents = [ repo.head.target ]
+    def get_blob_oid(self, repo: pygit2.Repository, path: str) -> Optional[str]:
+        """
+        Git blob id of a repo-relative file at HEAD, None if the file does not exist.
+        """
+        try:
+            return str(repo.head.peel(pygit2.Tree)[path].id)
+        except KeyError:
+            return None
+
+    def commit_files(
+        self,
+        repo: pygit2.Repository,
+        files: Dict[str, Optional[bytes]],
+        message: str = "Update dataset."
+    ) -> Optional[pygit2.Oid]:
+        """
+        Commit `{repo-relative path: content}` on top of HEAD straight from git
+        objects, and point the dataset branch at it. A content of None removes
+        the file. Neither the working tree nor the index is touched, and
+        trees/blobs that did not change are reused, so the cost is O(changed files).
+
+        :return: The new commit id, or None if the files already match HEAD.
+        """
+        head = repo.head.peel(pygit2.Commit)
+        tree = self._graft_tree(repo, head.tree, files)
+        if tree == head.tree.id:
+            logger.info("[GitWrapper] Dataset files unchanged, nothing to commit.")
+            return None
         author = pygit2.Signature(
             'firestorm-automation',
             'firestorm-automation@firestorm.love'
         )
-        tree = index.write_tree()
-        message = "Update dataset."
-        commit = repo.create_commit(ref, author, author, message, tree, parents)
+        commit = repo.create_commit(None, author, author, message, tree, [head.id])
+        repo.branches.local.create(DATASET_BRANCH, repo[commit], force=True)
         logger.info(f"[GitWrapper] Changes Committed: {commit}")
+        return commit
 
-    def make_pull_request(self) -> str | Exception:
+    def _graft_tree(
+        self,
+        repo: pygit2.Repository,
+        tree: Optional[pygit2.Tree],
+        files: Dict[str, Optional[bytes]]
+    ) -> pygit2.Oid:
         """
-        Makes a pull request on Github.
-        :return: PR URL if success, Exception otherwise.
+        Returns the id of `tree` with `files` (relative to it) written into it,
+        or removed from it for a content of None.
         """
-        headers = {
-            "Authorization": f"Bearer {self.git_token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28"
-        }
+        builder = repo.TreeBuilder(tree) if tree is not None else repo.TreeBuilder()
+        subdirs: Dict[str, Dict[str, Optional[bytes]]] = {}
+        for path, data in files.items():
+            name, _, rest = path.partition("/")
+            if rest:
+                subdirs.setdefault(name, {})[rest] = data
+                continue
+            if data is None:
+                if builder.get(name) is not None:
+                    builder.remove(name)
+                continue
+            blob = repo.create_blob(data)
+            existing = builder.get(name)
+            if existing is None or existing.id != blob:
+                builder.insert(name, blob, pygit2.GIT_FILEMODE_BLOB)
+        for name, subfiles in subdirs.items():
+            existing = builder.get(name)
+            subtree = None
+            if existing is not None and existing.type_str == "tree":
+                subtree = repo[existing.id]
+            subtree_id = self._graft_tree(repo, subtree, subfiles)
+            if len(repo[subtree_id]) > 0:
+                builder.insert(name, subtree_id, pygit2.GIT_FILEMODE_TREE)
+            elif existing is not None:
+                # Git does not track empty directories.
+                builder.remove(name)
+        return builder.write()
 
+    async def make_pull_request(self) -> str | Exception:
+        """
+        Makes a pull request on Github, or refreshes the one already open for
+        the dataset branch (which already tracks the force-pushed branch).
+        :return: PR URL if success, Exception otherwise.
+        """
         # The repo or branch to sync to the upstream.
         # same repo: set the head as <branch>
         # forked repo: set the head as <forkUser>:<branch>.
+        head = f"{self.git_user}:{DATASET_BRANCH}"
         data = {
             "title": "Sync Dataset",
-            "head": f"{self.git_user}:{DATASET_BRANCH}",
+            "head": head,
             "base": "main", # Assume that prod is main branch.
             "body": "Updating the dataset to sync with the DB."
         }
 
-        response = requests.post(
-            f"https://api.github.com/repos/{self.upstream_repo}/pulls",
-            headers=headers,
-            json=data,
-            timeout=5
+        existing = await self.github.request(
+            "GET",
+            f"/repos/{self.upstream_repo}/pulls",
+            params={"head": head, "base": "main", "state": "open"}
+        )
+        if existing.status == 200 and existing.body:
+            number = existing.body[0]["number"]
+            response = await self.github.request(
+                "PATCH",
+                f"/repos/{self.upstream_repo}/pulls/{number}",
+                json={"title": data["title"], "body": data["body"]}
+            )
+            if response.status != 200:
+                raise RuntimeError(str(response.body))
+            logger.info(f"[GitWrapper] Updated existing pull request #{number}.")
+            return response.body["html_url"]
+
+        response = await self.github.request(
+            "POST",
+            f"/repos/{self.upstream_repo}/pulls",
+            json=data
         )
 
-        if response.status_code != 201:
-            raise RuntimeError(str(response.json()))
-        resp = response.json()
-        return resp["html_url"]
+        if response.status != 201:
+            raise RuntimeError(str(response.body))
+        return response.body["html_url"]
+
+    async def close(self) -> None:
+        await self.github.close()
@@ -0,0 +1,152 @@
+import asyncio
+import json as jsonlib
+import time
+from functools import partial
+from typing import Any, Dict, Mapping, Optional
+
+import aiohttp
+
+from .retry import DEFAULT_BACKOFF_BASE, DEFAULT_MAX_RETRIES, MAX_BACKOFF, RetryPolicy
+
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_API_VERSION = "2022-11-28"
+DEFAULT_TIMEOUT = 10.0
+
+
+def _parse_body(text: str) -> Any:
+    if not text:
+        return None
+    try:
+        return jsonlib.loads(text)
+    except ValueError:
+        # e.g. an HTML error page from a proxy.
+        return text
+
+
+class GithubResponse:
+    def __init__(self, status: int, headers: Mapping[str, str], body: Any):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class GithubError(RuntimeError):
+    """Github API call failed, after retries if the failure was retryable."""
+    def __init__(self, status: int, body: Any, response: Optional[GithubResponse] = None):
+        super().__init__(f"Github API error {status}: {body}")
+        self.status = status
+        self.body = body
+        self.response = response
+
+
+def _is_retryable(response: GithubResponse) -> bool:
+    """Server errors and (secondary) rate limits."""
+    rate_limited = response.status == 429 or (
+        response.status == 403 and (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in str(response.body).lower()
+        )
+    )
+    return rate_limited or response.status >= 500
+
+
+class GithubClient:
+    """
+    Minimal Github REST client sharing one keep-alive `aiohttp` session.
+
+    Retries 5xx responses, network errors and (secondary) rate limits with
+    exponential backoff, honouring `Retry-After` / `X-RateLimit-Reset` when
+    Github sends them.
+    """
+    def __init__(
+        self,
+        token: str,
+        api_url: str = GITHUB_API_URL,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE
+    ):
+        """
+        :param token: Github token used as bearer auth
+        :param api_url: Base URL of the API (overridable for tests)
+        :param timeout: Total timeout in seconds for a single attempt
+        :param max_retries: Retries after the first attempt for retryable failures
+        :param backoff_base: First backoff delay in seconds, doubled on every retry
+        """
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retry = RetryPolicy(max_retries, backoff_base)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily, as a session has to be created inside the running loop.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={
+                    "Authorization": f"Bearer {self.token}",
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": GITHUB_API_VERSION,
+                },
+                timeout=self.timeout,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        json: Optional[Any] = None,
+        params: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ) -> GithubResponse:
+        """
+        Send a request, retrying retryable failures.
+        Non-retryable error statuses are returned to the caller as-is.
+
+        :raises GithubError: if retries are exhausted on a retryable status.
+        """
+        return await self.retry.call(
+            partial(self._request_once, method, f"{self.api_url}{path}", json, params, headers),
+            self._retry_delay,
+            f"[Github] {method} {path}"
+        )
+
+    async def _request_once(
+        self,
+        method: str,
+        url: str,
+        json: Optional[Any],
+        params: Optional[Dict[str, str]],
+        headers: Optional[Dict[str, str]]
+    ) -> GithubResponse:
+        """Single attempt, raising `GithubError` for a retryable status."""
+        async with self._get_session().request(
+            method, url, json=json, params=params, headers=headers
+        ) as resp:
+            text = await resp.text()
+            # Keep the case-insensitive header mapping.
+            response = GithubResponse(resp.status, resp.headers.copy(), _parse_body(text))
+        if _is_retryable(response):
+            raise GithubError(response.status, response.body, response)
+        return response
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """How long to wait before retrying after `error`, None if it should not be retried."""
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError)):
+            return self.retry.backoff(attempt)
+        if not isinstance(error, GithubError) or error.response is None:
+            return None
+        response = error.response
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None and retry_after.isdigit():
+            return min(MAX_BACKOFF, float(retry_after))
+        reset = response.headers.get("X-RateLimit-Reset")
+        if response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None:
+            return min(MAX_BACKOFF, max(0.0, float(reset) - time.time()))
+        return self.retry.backoff(attempt)
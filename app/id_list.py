@@ -0,0 +1,60 @@
+import re
+from typing import List
+
+# Refuse lists that would build an unreasonably large `IN (...)` clause.
+MAX_IDS = 500
+
+_RANGE = re.compile(r"^#?(\d+)-#?(\d+)$")
+_SINGLE = re.compile(r"^#?(\d+)$")
+
+
+def parse_id_list(text: str, max_ids: int = MAX_IDS) -> List[int]:
+    """
+    Parse a list of prompt IDs such as `12, 15-18 #20`.
+    IDs and `a-b` ranges (inclusive) are separated by commas and/or whitespace,
+    a leading `#` is allowed. Duplicates are dropped, first occurrence order is kept.
+
+    :raises ValueError: on malformed input, reversed ranges or more than `max_ids` IDs.
+    """
+    uids = {}
+    # Normalize "12 - 15" to "12-15" so ranges survive splitting on whitespace.
+    text = re.sub(r"\s*-\s*", "-", text)
+    for token in re.split(r"[\s,]+", text.strip()):
+        if not token:
+            continue
+        match = _RANGE.match(token)
+        if match is not None:
+            start, end = int(match.group(1)), int(match.group(2))
+            if start > end:
+                raise ValueError(f"Invalid range `{token}`: start is after end.")
+            if end - start + 1 > max_ids:
+                raise ValueError(f"Too many IDs, at most {max_ids} can be given at once.")
+            ids = range(start, end + 1)
+        else:
+            match = _SINGLE.match(token)
+            if match is None:
+                raise ValueError(f"Invalid prompt ID `{token}`.")
+            ids = (int(match.group(1)),)
+        for uid in ids:
+            uids[uid] = None
+        if len(uids) > max_ids:
+            raise ValueError(f"Too many IDs, at most {max_ids} can be given at once.")
+    if not uids:
+        raise ValueError("No prompt IDs given.")
+    return list(uids)
+
+
+def format_id_list(uids: List[int]) -> str:
+    """Compact `#1-#3, #7` rendering of `uids`, consecutive IDs collapsed into ranges."""
+    parts = []
+    ordered = sorted(uids)
+    start = 0
+    for i, uid in enumerate(ordered):
+        if i + 1 < len(ordered) and ordered[i + 1] == uid + 1:
+            continue
+        if i == start:
+            parts.append(f"#{uid}")
+        else:
+            parts.append(f"#{ordered[start]}-#{uid}")
+        start = i + 1
+    return ", ".join(parts)
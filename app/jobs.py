@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, List, Optional
+
+from .metrics import JOB_STAGE_SECONDS
+
+logger = logging.getLogger("firestorm_bot")
+
+# Called with the name of the stage a job has just entered.
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+class SingleFlightJob:
+    """
+    Runs at most one instance of a long async job at a time.
+
+    Callers that arrive while the job is running join the in-flight run: they get
+    its progress updates (including stages already reached) and its result, rather
+    than starting a second run. Blocking stages are pushed to a dedicated worker
+    thread with `run_blocking`, so the event loop stays responsive throughout.
+    The duration of every stage is recorded in `JOB_STAGE_SECONDS`.
+    """
+    def __init__(self, name: str):
+        """
+        :param name: Used for logging and the worker thread name
+        """
+        self.name = name
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[ProgressCallback] = []
+        self._stage: Optional[str] = None
+        self._stage_started_at: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(
+        self,
+        job: Callable[["SingleFlightJob"], Awaitable[Any]],
+        on_progress: ProgressCallback
+    ) -> Any:
+        """
+        Start `job(self)`, or join the run already in flight.
+
+        :param job: Coroutine function implementing the job, receives this runner
+        :param on_progress: Notified of every stage the job reports
+        :return: Result of the (possibly shared) run. Errors are re-raised to every caller.
+        """
+        self._listeners.append(on_progress)
+        try:
+            if self.running:
+                logger.info(f"[{self.name}] Joining in-flight run.")
+                if self._stage is not None:
+                    await self._notify(on_progress, self._stage)
+            else:
+                self._stage = None
+                self._task = asyncio.create_task(self._run_job(job))
+            # Shielded, so a caller giving up does not cancel the shared run.
+            return await asyncio.shield(self._task)
+        finally:
+            self._listeners.remove(on_progress)
+
+    async def report(self, stage: str) -> None:
+        """Announce that the job entered `stage`."""
+        logger.info(f"[{self.name}] Stage: {stage}")
+        self._end_stage()
+        self._stage = stage
+        self._stage_started_at = time.perf_counter()
+        await asyncio.gather(
+            *(self._notify(listener, stage) for listener in list(self._listeners))
+        )
+
+    async def run_blocking(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking call on the job's worker thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    async def _run_job(self, job: Callable[["SingleFlightJob"], Awaitable[Any]]) -> Any:
+        try:
+            return await job(self)
+        finally:
+            self._end_stage()
+
+    def _end_stage(self) -> None:
+        if self._stage is not None and self._stage_started_at is not None:
+            elapsed = time.perf_counter() - self._stage_started_at
+            JOB_STAGE_SECONDS.observe(elapsed, job=self.name, stage=self._stage)
+            self._stage_started_at = None
+
+    async def _notify(self, listener: ProgressCallback, stage: str) -> None:
+        # A failed progress update (e.g. expired message) must not fail the job.
+        try:
+            await listener(stage)
+        except Exception as e: # pylint: disable=broad-exception-caught
+            logger.warning(f"[{self.name}] Progress update failed: {e}")
@@ -5,9 +5,13 @@ import sys
 from discord.utils import _ColourFormatter
 from dotenv import load_dotenv
 
+from .async_db import AsyncDb
 from .bot import FireStormBot
+from .cache import CachedDb
 from .db import Db
 from .git import GitWrapper
+from .github import GithubClient
+from .metrics import REGISTRY, MetricsServer
 
 logger = logging.getLogger("firestorm_bot")
 log_handler = logging.StreamHandler()
@@ -26,6 +30,7 @@ if __name__ == "__main__":
     db_user = os.environ.get('DB_USER', 'user')
     db_host = os.environ.get('DB_HOST', '127.0.0.1')
     db_port = int(os.environ.get('DB_PORT', 3306))
+    db_pool_size = int(os.environ.get('DB_POOL_SIZE', 4))
     default_db_name = os.environ.get('DEFAULT_DB', 'bingo-dataset')
     # git settings
     upstream_repo = os.environ.get('BINGO_REPO_NAME', 'FireStormShipping/firestorm-bingo')
@@ -33,6 +38,13 @@ if __name__ == "__main__":
     git_user = forked_repo.split('/')[0]
     git_token = os.environ.get('GITHUB_TOKEN', 'None')
     local_repo_path = os.environ.get('LOCAL_REPO_PATH', '/tmp/firestorm-bingo')
+    persistent_repo = os.environ.get('PERSISTENT_REPO', 'true').lower() == 'true'
+    github_timeout = float(os.environ.get('GITHUB_TIMEOUT', 10))
+    # metrics settings
+    metrics_host = os.environ.get('METRICS_HOST', '127.0.0.1')
+    metrics_port = int(os.environ.get('METRICS_PORT', 9108))
+    sync_concurrency = int(os.environ.get('COMMAND_SYNC_CONCURRENCY', 4))
+    force_sync = os.environ.get('FORCE_COMMAND_SYNC', 'false').lower() == 'true'
 
     if guild_ids is None:
         logger.fatal("No guilds specified! Quitting!")
@@ -42,8 +54,18 @@ if __name__ == "__main__":
     guild_list = [ int(id.strip(' ')) for id in guild_ids.split(',') ]
     approved_roles = [ r.strip(' ') for r in approved_roles.split(',') ]
 
-    db = Db(db_password, db_host, db_user, db_port, default_db_name)
-    git_wrapper = GitWrapper(git_user, git_token, upstream_repo, forked_repo, local_repo_path)
-    bot = FireStormBot(guild_list, approved_roles, db, git_wrapper)
+    db = AsyncDb(
+        CachedDb(Db(db_password, db_host, db_user, db_port, default_db_name, db_pool_size))
+    )
+    git_wrapper = GitWrapper(
+        git_user, git_token, upstream_repo, forked_repo, local_repo_path, persistent_repo,
+        github=GithubClient(git_token, timeout=github_timeout)
+    )
+    # Port 0 disables the metrics endpoint, rather than serving it on a random
+    # port Prometheus could not find.
+    metrics_server = MetricsServer(REGISTRY, metrics_host, metrics_port) if metrics_port else None
+    bot = FireStormBot(
+        guild_list, approved_roles, db, git_wrapper, metrics_server, sync_concurrency, force_sync
+    )
 
     bot.run(bot_token)
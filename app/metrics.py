@@ -0,0 +1,294 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+logger = logging.getLogger("firestorm_bot")
+
+# Upper bounds in seconds, around Discord's 3 seconds to acknowledge an interaction.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 3.0, 5.0, 10.0, 30.0
+)
+# Sync stages run for seconds to minutes.
+STAGE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label values of one series, in the order of the metric's label names.
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def format_seconds(seconds: float) -> str:
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class HistogramSeries:
+    """
+    Observations of one labelled series. Counts are kept per bucket and only
+    made cumulative when rendered.
+    """
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        # The last count is the implicit +Inf bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def copy(self) -> "HistogramSeries":
+        series = HistogramSeries(self.buckets)
+        series.counts = list(self.counts)
+        series.count = self.count
+        series.sum = self.sum
+        return series
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate of the `q` quantile, interpolated linearly within its bucket
+        like Prometheus' `histogram_quantile`. Capped at the largest bucket.
+        """
+        if self.count == 0:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def summary(self) -> str:
+        """Human readable count, average and estimated median and p99."""
+        if self.count == 0:
+            return "0 calls"
+        return (
+            f"{self.count} calls, avg {format_seconds(self.sum / self.count)}, "
+            f"p50 {format_seconds(self.quantile(0.5))}, p99 {format_seconds(self.quantile(0.99))}"
+        )
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return lines + self._render_samples()
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in sorted(self.values().items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = HistogramSeries(self.buckets)
+            series.observe(value)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the time spent in the block, even if it raises."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def series(self) -> Dict[LabelValues, HistogramSeries]:
+        """Consistent copy of every series."""
+        with self._lock:
+            return {key: series.copy() for key, series in self._series.items()}
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self.series().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series.counts):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together in the Prometheus text format.
+    Metrics are thread-safe: DB calls record theirs from the DB executor.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(line + "\n" for metric in metrics for line in metric.render())
+
+
+class MetricsServer:
+    """
+    Serves a registry on `GET /metrics` for Prometheus to scrape. Runs on the
+    bot's event loop: rendering is cheap and never waits on the DB.
+    """
+    def __init__(self, registry: "MetricsRegistry", host: str = "127.0.0.1", port: int = 9108):
+        """
+        :param registry: Metrics to serve
+        :param host: Interface to listen on, local only by default
+        :param port: Port to listen on, 0 picks a free one (used by tests: the bot
+            itself never starts a server for `METRICS_PORT=0`, see `main.py`)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Actual port, in case a free one was picked.
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"[Metrics] Serving on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle_metrics(self, _request: web.Request) -> web.Response:
+        return web.Response(body=self.registry.render().encode("utf-8"), headers={
+            "Content-Type": CONTENT_TYPE
+        })
+
+
+# Metrics of the bot, rendered by `MetricsServer` and `/bot-stats`.
+REGISTRY = MetricsRegistry()
+COMMAND_SECONDS = REGISTRY.histogram(
+    "firestorm_command_seconds",
+    "Time from Discord creating an app command interaction (its snowflake timestamp) "
+    "to the end of its handler, i.e. its last response. Includes gateway delivery.",
+    ("command", "status")
+)
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "firestorm_db_query_seconds",
+    "Time spent running a Db method on the DB executor.",
+    ("method",)
+)
+DB_WAIT_SECONDS = REGISTRY.histogram(
+    "firestorm_db_wait_seconds",
+    "Time a Db call waited for a free DB executor worker.",
+    ("method",)
+)
+DB_ROWS = REGISTRY.counter(
+    "firestorm_db_rows_total",
+    "Entries returned, or IDs handled, by Db methods.",
+    ("method",)
+)
+JOB_STAGE_SECONDS = REGISTRY.histogram(
+    "firestorm_job_stage_seconds",
+    "Duration of each stage of a background job, e.g. /sync-dataset.",
+    ("job", "stage"),
+    STAGE_BUCKETS
+)
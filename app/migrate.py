@@ -0,0 +1,113 @@
+import logging
+import re
+from pathlib import Path
+from typing import Any, List
+
+logger = logging.getLogger("firestorm_bot")
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+MIGRATION_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+# Serializes migrations when several bot instances start at once.
+MIGRATION_LOCK = "firestorm_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 30
+
+CREATE_MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version INT PRIMARY KEY,
+  name VARCHAR(256) NOT NULL,
+  applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class Migration:
+    """
+    A single versioned migration, loaded from `migrations/<version>_<name>.sql`.
+    """
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    def statements(self) -> List[str]:
+        return split_statements(self.path.read_text(encoding="utf-8"))
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Split a migration script into individual statements.
+    Statements end with `;` at the end of a line, `--` comment lines are dropped.
+    A compound statement, from a `BEGIN NOT ATOMIC` line to an `END;` line, is
+    kept whole.
+    """
+    statements = []
+    current: List[str] = []
+    compound = False
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("--"):
+            continue
+        current.append(line)
+        if stripped.upper() == "BEGIN NOT ATOMIC":
+            compound = True
+        if stripped.endswith(";") and (not compound or stripped.upper() == "END;"):
+            statements.append("\n".join(current).strip().rstrip(";"))
+            current = []
+            compound = False
+    if current:
+        statements.append("\n".join(current).strip())
+    return statements
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    migrations = []
+    for path in directory.iterdir():
+        match = MIGRATION_FILENAME.match(path.name)
+        if match is None:
+            continue
+        migrations.append(Migration(int(match.group(1)), match.group(2), path))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}: {versions}")
+    return migrations
+
+
+def run_migrations(conn: Any, directory: Path = MIGRATIONS_DIR) -> int:
+    """
+    Apply every migration newer than the latest recorded in `schema_migrations`.
+
+    Note that MariaDB commits DDL implicitly, so migrations should be written to be
+    safe to re-run (`IF NOT EXISTS`) in case one fails halfway through.
+
+    :param conn: DB-API connection to migrate
+    :return: Number of migrations applied
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT GET_LOCK(?, ?)", (MIGRATION_LOCK, MIGRATION_LOCK_TIMEOUT))
+        if cur.fetchone()[0] != 1:
+            raise RuntimeError("Timed out waiting for the schema migration lock.")
+        try:
+            cur.execute(CREATE_MIGRATIONS_TABLE)
+            cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+            current_version = cur.fetchone()[0]
+            applied = 0
+            for migration in load_migrations(directory):
+                if migration.version <= current_version:
+                    continue
+                logger.info(f"Applying migration {migration.version:04d}_{migration.name}...")
+                for statement in migration.statements():
+                    cur.execute(statement)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)",
+                    (migration.version, migration.name)
+                )
+                conn.commit()
+                applied += 1
+            return applied
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(?)", (MIGRATION_LOCK,))
+            cur.fetchone()
+    finally:
+        cur.close()
@@ -10,4 +10,4 @@ CREATE TABLE IF NOT EXISTS dataset (
   reject_reason VARCHAR(1024),
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
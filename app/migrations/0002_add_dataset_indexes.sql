@@ -0,0 +1,26 @@
+-- Duplicate prompts within a pool have to go before the unique (pool, prompt)
+-- key can be created. Of each group of duplicates, the row kept is the approved
+-- one if any, else a pending one, else a rejected one, the oldest first.
+-- Every other copy is archived in dataset_removed_duplicates before being
+-- deleted, so nothing is lost without a record.
+CREATE TABLE IF NOT EXISTS dataset_removed_duplicates LIKE dataset;
+
+INSERT IGNORE INTO dataset_removed_duplicates
+SELECT DISTINCT dropped.* FROM dataset dropped
+  JOIN dataset kept
+    ON dropped.pool = kept.pool
+   AND dropped.prompt = kept.prompt
+   AND dropped.id <> kept.id
+ WHERE (COALESCE(kept.approved, 0), NOT kept.rejected, -kept.id)
+     > (COALESCE(dropped.approved, 0), NOT dropped.rejected, -dropped.id);
+
+DELETE dropped FROM dataset dropped
+  JOIN dataset_removed_duplicates removed
+    ON dropped.id = removed.id;
+
+-- The unique key serves the duplicate check in add_prompt,
+-- idx_dataset_pool_approved serves pool lookups.
+ALTER TABLE dataset
+  ADD UNIQUE KEY IF NOT EXISTS uq_dataset_pool_prompt (pool, prompt),
+  ADD INDEX IF NOT EXISTS idx_dataset_pool_approved (pool, approved),
+  ADD INDEX IF NOT EXISTS idx_dataset_approved_rejected (approved, rejected);
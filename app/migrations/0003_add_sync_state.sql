@@ -0,0 +1,25 @@
+-- Incremental /sync-dataset: find pools changed since the last sync.
+ALTER TABLE dataset
+  ADD INDEX IF NOT EXISTS idx_dataset_updated_at (updated_at);
+
+-- Deleted approved prompts leave no row behind, so record which pool they came from.
+CREATE TABLE IF NOT EXISTS dataset_tombstones (
+  id INT AUTO_INCREMENT PRIMARY KEY,
+  pool VARCHAR(256) NOT NULL,
+  deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  INDEX idx_tombstones_deleted_at (deleted_at)
+);
+
+-- Single row (id = 1) holding the watermark of the last successful sync.
+CREATE TABLE IF NOT EXISTS sync_state (
+  id TINYINT PRIMARY KEY,
+  last_synced_at TIMESTAMP NULL
+);
+
+-- Git blob id of the file last synced for each pool. A pool whose file upstream
+-- does not match (e.g. the sync PR is not merged yet) is synced again.
+CREATE TABLE IF NOT EXISTS pool_sync_state (
+  pool VARCHAR(256) PRIMARY KEY,
+  blob_oid CHAR(40) NOT NULL,
+  synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,5 @@
+-- Keyset pages of /pending-prompts and /rejected-prompts filtered by pool.
+-- InnoDB appends the primary key to secondary indexes, so the rows of a
+-- (approved, rejected, pool) group are read straight in id order.
+ALTER TABLE dataset
+  ADD INDEX IF NOT EXISTS idx_dataset_queue_pool (approved, rejected, pool);
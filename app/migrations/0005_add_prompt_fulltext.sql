@@ -0,0 +1,3 @@
+-- /search-prompts: ranked full-text search over prompts.
+ALTER TABLE dataset
+  ADD FULLTEXT INDEX IF NOT EXISTS ft_dataset_prompt (prompt);
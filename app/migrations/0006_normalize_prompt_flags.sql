@@ -0,0 +1,32 @@
+-- One row per flag of a prompt, instead of a comma-separated dataset.flags.
+-- `position` keeps the order flags were given in, (flag, prompt_id) answers
+-- "prompts flagged X" and per-flag counts from the index.
+-- Flags are as long as dataset.flags was: over InnoDB's key length limit, so
+-- uniqueness per prompt is enforced through a hash and lookups use a prefix.
+-- dataset.flags itself is only dropped by 0008, once the backfill is verified.
+CREATE TABLE IF NOT EXISTS prompt_flags (
+  prompt_id INT NOT NULL,
+  position SMALLINT NOT NULL,
+  flag VARCHAR(1024) NOT NULL,
+  PRIMARY KEY (prompt_id, position),
+  UNIQUE KEY uq_prompt_flags_flag (prompt_id, flag) USING HASH,
+  INDEX idx_prompt_flags_flag (flag(255), prompt_id),
+  CONSTRAINT fk_prompt_flags_prompt FOREIGN KEY (prompt_id)
+    REFERENCES dataset (id) ON DELETE CASCADE
+);
+
+-- Backfill by splitting every flags string on commas. Blank flags are dropped,
+-- repeated ones keep their first position (INSERT IGNORE on the unique key).
+INSERT IGNORE INTO prompt_flags (prompt_id, flag, position)
+WITH RECURSIVE split (prompt_id, position, flag, rest) AS (
+  SELECT id, 0, TRIM(SUBSTRING_INDEX(flags, ',', 1)),
+         IF(LOCATE(',', flags) > 0, SUBSTRING(flags, LOCATE(',', flags) + 1), NULL)
+    FROM dataset
+   WHERE flags IS NOT NULL AND flags <> ''
+  UNION ALL
+  SELECT prompt_id, position + 1, TRIM(SUBSTRING_INDEX(rest, ',', 1)),
+         IF(LOCATE(',', rest) > 0, SUBSTRING(rest, LOCATE(',', rest) + 1), NULL)
+    FROM split
+   WHERE rest IS NOT NULL
+)
+SELECT prompt_id, flag, position FROM split WHERE flag <> '' ORDER BY prompt_id, position;
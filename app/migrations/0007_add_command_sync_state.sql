@@ -0,0 +1,7 @@
+-- Hash of the command tree last synced to each guild: guilds whose commands did
+-- not change are not synced again at startup.
+CREATE TABLE IF NOT EXISTS command_sync_state (
+  guild_id BIGINT UNSIGNED PRIMARY KEY,
+  tree_hash CHAR(64) NOT NULL,
+  synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
@@ -0,0 +1,22 @@
+-- Drop dataset.flags, now held by prompt_flags (0006). Refuses to while a
+-- prompt with non-blank flags has none in prompt_flags: the migration fails,
+-- the column is kept, and the bot does not start until the flags are fixed.
+-- The check is skipped when re-run after the column is gone.
+BEGIN NOT ATOMIC
+  IF EXISTS (
+    SELECT 1 FROM information_schema.columns
+     WHERE table_schema = DATABASE() AND table_name = 'dataset' AND column_name = 'flags'
+  ) THEN
+    IF EXISTS (
+      SELECT 1 FROM dataset d
+       WHERE TRIM(REPLACE(COALESCE(d.flags, ''), ',', '')) <> ''
+         AND NOT EXISTS (SELECT 1 FROM prompt_flags f WHERE f.prompt_id = d.id)
+    ) THEN
+      SIGNAL SQLSTATE '45000'
+        SET MESSAGE_TEXT = 'Prompts with flags missing from prompt_flags, keeping dataset.flags';
+    END IF;
+  END IF;
+END;
+
+ALTER TABLE dataset
+  DROP COLUMN IF EXISTS flags;
@@ -0,0 +1,37 @@
+from bisect import bisect_left
+from typing import Iterable, List, Tuple
+
+# Discord shows at most 25 autocomplete choices.
+MAX_CHOICES = 25
+
+
+class PoolIndex:
+    """
+    In-memory prefix index of pool names, answering autocomplete without
+    touching the DB. Names are kept sorted by their case-folded form, so a
+    prefix lookup is a binary search followed by a short scan.
+    """
+    def __init__(self, pools: Iterable[str] = ()):
+        self._keys: Tuple[str, ...] = ()
+        self._pools: Tuple[str, ...] = ()
+        self.refresh(pools)
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    def refresh(self, pools: Iterable[str]) -> None:
+        """Replace the indexed pools, e.g. with a fresh `get_pools()` result."""
+        ordered = sorted(set(pools), key=lambda pool: (pool.casefold(), pool))
+        # Swapped in one assignment, so lookups never see a half-built index.
+        self._keys, self._pools = tuple(p.casefold() for p in ordered), tuple(ordered)
+
+    def complete(self, prefix: str, limit: int = MAX_CHOICES) -> List[str]:
+        """Pools starting with `prefix` (case-insensitive), in alphabetical order."""
+        keys, pools = self._keys, self._pools
+        prefix = prefix.strip().casefold()
+        matches = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and len(matches) < limit and keys[i].startswith(prefix):
+            matches.append(pools[i])
+            i += 1
+        return matches
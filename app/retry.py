@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import random
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger("firestorm_bot")
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+MAX_BACKOFF = 60.0
+
+T = TypeVar("T")
+# Seconds to wait before retrying after an error on the given (0-based)
+# attempt, None if the error is not worth retrying.
+RetryDelay = Callable[[Exception, int], Optional[float]]
+
+
+class RetryPolicy:
+    """
+    Retries async calls failing with a retryable error, up to `max_retries`
+    times after the first attempt, waiting between attempts as the caller's
+    `RetryDelay` asks, usually `backoff`.
+    """
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE
+    ):
+        """
+        :param max_retries: Retries after the first attempt for retryable failures
+        :param backoff_base: First backoff delay in seconds, doubled on every retry
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter, capped at `MAX_BACKOFF`."""
+        delay = self.backoff_base * (2 ** attempt)
+        return min(MAX_BACKOFF, delay + random.uniform(0, delay / 2))
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        retry_delay: RetryDelay,
+        description: str
+    ) -> T:
+        """
+        Await `fn()` until it succeeds. The last error is raised once retries are
+        exhausted, a non-retryable one right away.
+
+        :param description: What `fn` does, for the retry logs
+        """
+        attempt = 0
+        while True:
+            try:
+                return await fn()
+            except Exception as e: # pylint: disable=broad-exception-caught
+                delay = retry_delay(e, attempt)
+                if delay is None or attempt >= self.max_retries:
+                    raise
+                logger.warning(f"{description} failed ({e!r}), retrying in {delay:.1f}s")
+            attempt += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,253 @@
+import heapq
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .app_types import DatasetEntry
+
+# Prompt ratings, least sensitive first: Safe, Questionable, Explicit.
+SENSITIVITY_LEVELS = ("S", "Q", "E")
+# A 5x5 bingo card.
+DEFAULT_CARD_SIZE = 25
+# Redraws allowed per prompt of a card, before drawing exactly from the prompts left.
+MAX_REDRAWS = 8
+# Draws per prompt of a card when simulating with NumPy: with replacement, from
+# which the first distinct prompts make the card.
+OVERSAMPLING = 3
+# Draws held in memory at once when simulating with NumPy.
+SIMULATION_CHUNK = 1 << 20
+
+_rng = random.Random()
+
+
+def sensitivities_up_to(level: str) -> Tuple[str, ...]:
+    """Sensitivities allowed when prompts rated up to `level` are."""
+    return SENSITIVITY_LEVELS[:SENSITIVITY_LEVELS.index(level) + 1]
+
+
+class AliasTable:
+    """
+    Walker's alias table over a list of weights: built in O(n), then draws an
+    index with a probability proportional to its weight in O(1).
+    """
+    def __init__(self, weights: Sequence[float]):
+        """
+        :param weights: Positive weights, at least one
+        """
+        count = len(weights)
+        self.total = math.fsum(weights)
+        if count == 0 or self.total <= 0:
+            raise ValueError("An alias table needs a positive total weight")
+        # Weights scaled so that their average is 1.
+        scaled = [weight * count / self.total for weight in weights]
+        # Column i holds i with probability prob[i], alias[i] otherwise.
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        # Pair each under-full column with an over-full one that tops it up.
+        # Columns left over once either list runs out are full up to rounding.
+        while small and large:
+            under, over = small.pop(), large.pop()
+            self.prob[under] = scaled[under]
+            self.alias[under] = over
+            scaled[over] -= 1.0 - scaled[under]
+            (small if scaled[over] < 1.0 else large).append(over)
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: random.Random) -> int:
+        # One uniform number picks the column (integer part) and the coin (fraction).
+        u = rng.random() * len(self.prob)
+        column = int(u)
+        return column if u - column < self.prob[column] else self.alias[column]
+
+    def draw_array(self, generator: "np.random.Generator", shape: Tuple[int, ...]) -> "np.ndarray":
+        """`draw` vectorized with NumPy, filling an array of the given shape."""
+        u = generator.random(shape) * len(self.prob)
+        columns = u.astype(np.int64)
+        return np.where(
+            u - columns < np.asarray(self.prob)[columns],
+            columns,
+            np.asarray(self.alias)[columns]
+        )
+
+
+def _weighted_sample(
+    entries: List[DatasetEntry],
+    size: int,
+    rng: random.Random
+) -> List[DatasetEntry]:
+    """
+    `size` distinct entries, picked one after another proportionally to their
+    weight (Efraimidis-Spirakis: the largest `log(U) / weight` keys), in O(n log size).
+    """
+    keys = [math.log(1.0 - rng.random()) / entry.weight for entry in entries]
+    top = heapq.nlargest(size, range(len(entries)), key=keys.__getitem__)
+    return [entries[i] for i in top]
+
+
+def _pick_table(
+    tables: List[Tuple[List[DatasetEntry], AliasTable]],
+    total: float,
+    rng: random.Random
+) -> Tuple[List[DatasetEntry], AliasTable]:
+    """Pick one of the sensitivity groups by total weight."""
+    u = rng.random() * total
+    for group, table in tables:
+        u -= table.total
+        if u < 0:
+            return group, table
+    # Only reached through rounding errors.
+    return tables[-1]
+
+
+class PoolSampler:
+    """
+    Draws bingo cards from the approved entries of a pool: distinct prompts
+    picked one after another, each with a probability proportional to its
+    weight among the prompts not on the card yet.
+
+    Entries are grouped by sensitivity with one alias table per group, so a
+    draw picks a group by total weight, then an entry of the group, in O(1)
+    whatever the allowed sensitivities. Prompts already on the card are
+    redrawn. Immutable once built, hence safe to share between threads.
+    """
+    def __init__(self, entries: Iterable[DatasetEntry]):
+        """
+        :param entries: Approved entries of the pool, those weighing 0 are never drawn
+        """
+        groups: Dict[str, List[DatasetEntry]] = {}
+        for entry in entries:
+            if entry.weight > 0:
+                groups.setdefault(entry.sensitivity, []).append(entry)
+        self._groups = {
+            sensitivity: (group, AliasTable([entry.weight for entry in group]))
+            for sensitivity, group in groups.items()
+        }
+
+    def __len__(self) -> int:
+        return sum(len(group) for group, _table in self._groups.values())
+
+    def entries(self, sensitivities: Iterable[str] = SENSITIVITY_LEVELS) -> List[DatasetEntry]:
+        """Entries that can be drawn with the given sensitivities."""
+        return [entry for group, _table in self._tables(sensitivities) for entry in group]
+
+    def draw(
+        self,
+        size: int,
+        sensitivities: Iterable[str] = SENSITIVITY_LEVELS,
+        rng: Optional[random.Random] = None
+    ) -> List[DatasetEntry]:
+        """
+        Draw a card of up to `size` distinct entries, in the order drawn.
+        The card is smaller if fewer entries have an allowed sensitivity.
+
+        :param rng: Random source, for reproducible draws
+        """
+        rng = rng if rng is not None else _rng
+        tables = self._tables(sensitivities)
+        total = math.fsum(table.total for _group, table in tables)
+        size = min(size, sum(len(group) for group, _table in tables))
+        card: Dict[int, DatasetEntry] = {}
+        redraws = size * MAX_REDRAWS
+        while len(card) < size and redraws > 0:
+            redraws -= 1
+            group, table = _pick_table(tables, total, rng)
+            entry = group[table.draw(rng)]
+            card.setdefault(entry.uid, entry)
+        if len(card) < size:
+            # A few heavy prompts keep being redrawn: the rest of the card is
+            # drawn from the prompts left, which keeps the same distribution.
+            left = [entry for entry in self.entries(sensitivities) if entry.uid not in card]
+            card.update(
+                (entry.uid, entry) for entry in _weighted_sample(left, size - len(card), rng)
+            )
+        return list(card.values())
+
+    def simulate(
+        self,
+        cards: int,
+        size: int,
+        sensitivities: Iterable[str] = SENSITIVITY_LEVELS,
+        seed: Optional[int] = None
+    ) -> List[Tuple[DatasetEntry, int]]:
+        """
+        Draw `cards` cards and count how many of them each entry lands on, to
+        check the weight distribution. Vectorized with NumPy when it is
+        installed, one card at a time otherwise.
+
+        :return: `(entry, cards including it)` for every entry that can be drawn.
+        """
+        entries = self.entries(sensitivities)
+        size = min(size, len(entries))
+        rng = random.Random(seed)
+        counts = [0] * len(entries)
+        if size == 0:
+            return list(zip(entries, counts))
+        index = {entry.uid: i for i, entry in enumerate(entries)}
+        left = cards
+        if np is not None:
+            table = AliasTable([entry.weight for entry in entries])
+            counts, left = _simulate_numpy(table, cards, size, np.random.default_rng(seed))
+        for _ in range(left):
+            for entry in self.draw(size, sensitivities, rng):
+                counts[index[entry.uid]] += 1
+        return list(zip(entries, counts))
+
+    def _tables(self, sensitivities: Iterable[str]) -> List[Tuple[List[DatasetEntry], AliasTable]]:
+        return [
+            self._groups[sensitivity]
+            for sensitivity in dict.fromkeys(sensitivities)
+            if sensitivity in self._groups
+        ]
+
+
+def _simulate_numpy(
+    table: AliasTable,
+    cards: int,
+    size: int,
+    generator: "np.random.Generator"
+) -> Tuple[List[int], int]:
+    """
+    Cards drawn as blocks of alias table draws with replacement: the first
+    `size` distinct entries drawn for a card are exactly a card drawn one
+    prompt after another.
+
+    :return: Cards including each entry of the table, and the number of cards
+        left to draw as they got fewer than `size` distinct entries.
+    """
+    draws = size * OVERSAMPLING
+    block = max(1, SIMULATION_CHUNK // draws)
+    totals = np.zeros(len(table), dtype=np.int64)
+    short = 0
+    for start in range(0, cards, block):
+        drawn = table.draw_array(generator, (min(block, cards - start), draws))
+        kept, missing = _first_distinct(drawn, size)
+        totals += np.bincount(kept, minlength=len(table))
+        short += missing
+    return totals.tolist(), short
+
+
+def _first_distinct(drawn: "np.ndarray", size: int) -> Tuple["np.ndarray", int]:
+    """
+    :param drawn: One row of entry indices drawn with replacement per card
+    :return: The first `size` distinct entries of every row (flattened), for
+        rows that have that many, and the number of rows that do not.
+    """
+    rows, draws = drawn.shape
+    # Flattened positions of the first draw of every (row, entry) pair, in order.
+    keys = drawn + (drawn.max() + 1) * np.arange(rows)[:, None]
+    _, first = np.unique(keys, return_index=True)
+    first.sort()
+    row_of = first // draws
+    distinct = np.bincount(row_of, minlength=rows)
+    rank = np.arange(len(first)) - np.repeat(np.cumsum(distinct) - distinct, distinct)
+    kept = first[(rank < size) & (distinct[row_of] >= size)]
+    return drawn.ravel()[kept], int(np.count_nonzero(distinct < size))
@@ -0,0 +1,41 @@
+import re
+from typing import Dict, Literal, Optional
+
+SearchStatus = Literal["approved", "pending", "rejected"]
+
+# `WHERE` condition selecting each status.
+STATUS_FILTERS: Dict[str, str] = {
+    "approved": "approved = 1",
+    "pending": "approved = 0 AND rejected = 0",
+    "rejected": "approved = 0 AND rejected = 1",
+}
+# InnoDB ignores shorter words (`innodb_ft_min_token_size`), requiring one
+# would match nothing.
+MIN_TOKEN_SIZE = 3
+# InnoDB's default full-text stopwords (of at least MIN_TOKEN_SIZE), never indexed either.
+STOPWORDS = frozenset((
+    "about", "are", "com", "for", "from", "how", "that", "the", "this",
+    "und", "was", "what", "when", "where", "who", "will", "with", "www",
+))
+MAX_TERMS = 8
+
+_WORD = re.compile(r"\w+")
+
+
+def fulltext_query(text: str) -> Optional[str]:
+    """
+    Turn free text into a boolean-mode `MATCH ... AGAINST` query requiring every
+    word as a prefix (`+word*`). User input never reaches the query syntax:
+    only word characters are kept, so operators cannot be injected.
+
+    Returns None if no word can be searched for (too short or a stopword).
+    """
+    terms = []
+    for word in _WORD.findall(text.casefold()):
+        if len(word) < MIN_TOKEN_SIZE or word in STOPWORDS:
+            continue
+        if f"+{word}*" not in terms:
+            terms.append(f"+{word}*")
+    if not terms:
+        return None
+    return " ".join(terms[:MAX_TERMS])
@@ -0,0 +1,204 @@
+import random
+import re
+import threading
+import unicodedata
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Character n-grams compared between prompts.
+SHINGLE_SIZE = 3
+# MinHash signature length = BANDS * ROWS. With 8 bands of 3 rows, pairs with a
+# Jaccard similarity of 0.7 share a bucket ~96% of the time, 0.3 only ~20%.
+BANDS = 8
+ROWS = 3
+DEFAULT_THRESHOLD = 0.7
+# Bound on the candidates verified per lookup, most frequent bucket hits first.
+MAX_CANDIDATES = 64
+# Distinct n-grams whose MinHash values are memoized (~1KB each).
+GRAM_CACHE_SIZE = 32768
+
+_MASK64 = (1 << 64) - 1
+# Multiply-shift hash functions `((a * h + b) mod 2^64) >> 32`, with odd `a`.
+_rng = random.Random(1729)
+_PERMUTATIONS = tuple(
+    (_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(BANDS * ROWS)
+)
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+class SimilarPrompt(NamedTuple):
+    uid: int
+    similarity: float
+    # Same text once case, punctuation and spacing are ignored.
+    exact: bool
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case-folded prompt with punctuation dropped and whitespace collapsed."""
+    text = unicodedata.normalize("NFKC", prompt).casefold()
+    return _NON_WORD.sub(" ", text).strip()
+
+
+def shingles(normalized: str) -> FrozenSet[str]:
+    """Character n-grams of a normalized prompt, padded so short words still count."""
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@lru_cache(maxsize=GRAM_CACHE_SIZE)
+def _gram_hashes(gram: str) -> Tuple[int, ...]:
+    """The n-gram hashed by every MinHash function, cached as prompts share most n-grams."""
+    # Not `hash()`, which is salted per process: keeps bucketing deterministic.
+    h = zlib.crc32(gram.encode("utf-8"))
+    return tuple(((a * h + b) & _MASK64) >> 32 for a, b in _PERMUTATIONS)
+
+
+def _band_keys(grams: FrozenSet[str]) -> List[int]:
+    """MinHash the n-grams and hash each band of the signature into one LSH bucket key."""
+    # Column-wise minimum over the cached per-gram hashes, all in C.
+    signature = list(map(min, zip(*map(_gram_hashes, grams))))
+    return [
+        hash((band, *signature[band * ROWS:(band + 1) * ROWS]))
+        for band in range(BANDS)
+    ]
+
+
+class _PoolIndex:
+    def __init__(self):
+        # Normalized text -> IDs, for exact (normalized) duplicates.
+        self.exact: Dict[str, List[int]] = {}
+        # LSH bucket key -> IDs, for near duplicates.
+        self.buckets: Dict[int, List[int]] = {}
+
+
+class SimilarityIndex:
+    """
+    In-memory, per-pool index of prompts for near-duplicate detection.
+
+    Prompts are normalized, then split into character n-grams whose MinHash
+    signature is bucketed with locality-sensitive hashing. A lookup only
+    verifies the prompts sharing a bucket, so its cost does not grow with the
+    size of the pool. Kept up to date incrementally from the commands that
+    add, modify and delete prompts.
+    """
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        :param threshold: Jaccard similarity of n-grams from which prompts are near duplicates
+        """
+        self.threshold = threshold
+        self._pools: Dict[str, _PoolIndex] = {}
+        # uid -> (pool, normalized prompt), to remove or verify an entry.
+        self._entries: Dict[int, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+        # Set once `load` has indexed every prompt, lookups may miss prompts until then.
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, prompts: Iterable[Tuple[int, str, str]]) -> None:
+        """Index `(uid, pool, prompt)` rows, e.g. streamed from the DB at startup."""
+        for uid, pool, prompt in prompts:
+            self.add(uid, pool, prompt)
+        self.loaded = True
+
+    def add(self, uid: int, pool: str, prompt: str) -> None:
+        normalized = normalize_prompt(prompt)
+        keys = _band_keys(shingles(normalized))
+        with self._lock:
+            self._remove(uid)
+            index = self._pools.setdefault(pool, _PoolIndex())
+            index.exact.setdefault(normalized, []).append(uid)
+            for key in keys:
+                index.buckets.setdefault(key, []).append(uid)
+            self._entries[uid] = (pool, normalized)
+
+    def remove(self, uid: int) -> None:
+        with self._lock:
+            self._remove(uid)
+
+    def find(
+        self,
+        pool: str,
+        prompt: str,
+        exclude: Optional[int] = None,
+        limit: int = 5
+    ) -> List[SimilarPrompt]:
+        """
+        Prompts of `pool` similar to `prompt`, most similar first.
+
+        :param exclude: ID to ignore, e.g. the prompt being modified
+        :param limit: Maximum number of matches returned
+        """
+        normalized = normalize_prompt(prompt)
+        grams = shingles(normalized)
+        keys = _band_keys(grams)
+        with self._lock:
+            exact, candidates = self._candidates(pool, normalized, keys, exclude)
+        matches = dict.fromkeys(exact, 1.0)
+        for uid, other in candidates:
+            similarity = jaccard(grams, shingles(other))
+            if similarity >= self.threshold:
+                matches[uid] = similarity
+        ranked = sorted(matches.items(), key=lambda match: (-match[1], match[0]))
+        return [
+            SimilarPrompt(uid, similarity, uid in exact)
+            for uid, similarity in ranked[:limit]
+        ]
+
+    def _candidates(
+        self,
+        pool: str,
+        normalized: str,
+        keys: List[int],
+        exclude: Optional[int]
+    ) -> Tuple[Set[int], List[Tuple[int, str]]]:
+        """
+        Exact (normalized) matches, and `(uid, normalized prompt)` of the other
+        prompts sharing an LSH bucket, to verify outside the lock.
+        """
+        index = self._pools.get(pool)
+        if index is None:
+            return set(), []
+        exact = {uid for uid in index.exact.get(normalized, ()) if uid != exclude}
+        hits = Counter(
+            uid for key in keys for uid in index.buckets.get(key, ()) if uid != exclude
+        )
+        candidates = [
+            (uid, self._entries[uid][1])
+            for uid, _count in hits.most_common(MAX_CANDIDATES)
+            if uid not in exact
+        ]
+        return exact, candidates
+
+    def _remove(self, uid: int) -> None:
+        entry = self._entries.pop(uid, None)
+        if entry is None:
+            return
+        pool, normalized = entry
+        index = self._pools[pool]
+        _discard(index.exact, normalized, uid)
+        for key in _band_keys(shingles(normalized)):
+            _discard(index.buckets, key, uid)
+        if not index.exact:
+            del self._pools[pool]
+
+
+def _discard(mapping: Dict, key, uid: int) -> None:
+    uids = mapping.get(key)
+    if uids is None:
+        return
+    try:
+        uids.remove(uid)
+    except ValueError:
+        return
+    if not uids:
+        del mapping[key]
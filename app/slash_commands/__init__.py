@@ -0,0 +1,30 @@
+"""
+Commands that can be called as `/<command>`, one cog per feature. The cogs
+share a single `CommandContext`, loaded before they are added to the bot.
+"""
+
+from typing import List
+
+from .base import CommandContext, DatasetCog
+from .browsing import BrowsingCommands
+from .bulk import BulkCommands
+from .moderation import ModerationCommands
+from .stats import StatsCommands
+from .sync import SyncCommands
+
+__all__ = [
+    "BrowsingCommands",
+    "BulkCommands",
+    "CommandContext",
+    "DatasetCog",
+    "ModerationCommands",
+    "StatsCommands",
+    "SyncCommands",
+    "make_cogs",
+]
+
+COGS = (ModerationCommands, BulkCommands, BrowsingCommands, SyncCommands, StatsCommands)
+
+
+def make_cogs(context: CommandContext) -> List[DatasetCog]:
+    return [cog(context) for cog in COGS]
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import List, Literal, Optional
+
+import discord
+import mariadb
+from discord import app_commands
+from discord.ext import commands
+
+from ..async_db import AsyncDb
+from ..db import Db
+from ..git import GitWrapper
+from ..jobs import SingleFlightJob
+from ..pool_index import PoolIndex
+from ..similarity import SimilarityIndex
+
+logger = logging.getLogger("firestorm_bot")
+
+SENSITIVITY = Literal['S', 'E', 'Q']
+
+# Discord's limit on the length of a message.
+MESSAGE_LIMIT = 2000
+# Discord's limit on the length of an autocomplete choice name/value.
+CHOICE_LIMIT = 100
+
+
+def _load_similarity_index(db: Db, index: SimilarityIndex) -> None:
+    """
+    Runs on the DB executor: index every prompt already in the DB.
+    If the DB fails partway through, the index is left partial and not `loaded`.
+    """
+    try:
+        index.load(db.iter_prompt_texts())
+    except mariadb.Error as e:
+        logger.error(
+            f"Similarity index failed to load after {len(index)} prompts, "
+            f"duplicate checks will miss the rest: {e}"
+        )
+        return
+    logger.info(f"Similarity index loaded with {len(index)} prompts.")
+
+
+def truncate_message(msg: str) -> str:
+    """Cut a message to Discord's length limit."""
+    if len(msg) > MESSAGE_LIMIT:
+        return msg[:MESSAGE_LIMIT - 1] + "…"
+    return msg
+
+
+class CommandContext:
+    """
+    State shared by every command cog: the DB, the git wrapper, the sync job
+    and the in-memory indexes kept in sync with prompt writes.
+    """
+    def __init__(self, approved_roles: List[str], db: AsyncDb, git_wrapper: GitWrapper):
+        """
+        :param approved_roles: Roles that are allowed to approve prompts
+        :param db: Async DB instance
+        :param git_wrapper: Git wrapper for git operations
+        """
+        self.approved_roles = approved_roles
+        self.db = db
+        self.git = git_wrapper
+        # Only one sync may touch the local repo at a time.
+        self.sync_job = SingleFlightJob("firestorm-sync")
+        # Serves `pool` autocomplete, refreshed whenever the approved pools may change.
+        self.pool_index = PoolIndex()
+        # Near-duplicate detection for /add-prompt, kept in sync with prompt writes.
+        self.similarity = SimilarityIndex()
+        self.similarity_load: Optional[asyncio.Future] = None
+
+    async def load(self) -> None:
+        """Fill the in-memory indexes, before any cog is added."""
+        await self.refresh_pool_index()
+        # Loaded in the background: lookups simply miss prompts not indexed yet.
+        self.similarity_load = asyncio.ensure_future(
+            self.db.run(_load_similarity_index, self.similarity)
+        )
+
+    async def close(self) -> None:
+        self.sync_job.shutdown()
+        await self.git.close()
+        # Waits for queries in flight, off the event loop.
+        await asyncio.to_thread(self.db.close)
+
+    async def refresh_pool_index(self) -> None:
+        self.pool_index.refresh(await self.db.get_pools())
+
+    def is_privileged_role(self, interaction: discord.Interaction) -> bool:
+        """
+        Checks if user has an approved role or not.
+        """
+        user_roles = interaction.user.roles
+        for role in user_roles:
+            if role.name in self.approved_roles:
+                return True
+        return False
+
+    async def missing_pool_message(self, pool: str) -> str:
+        pools = await self.db.get_pools()
+        msg = f"❌ Pool `{pool}` does not exist!\n"
+        if len(pools) == 0:
+            msg += "There are no existing pools.\n"
+        else:
+            msg += "Existing pools: " + ', '.join(pools)
+            msg += "\n"
+        msg += "To make a new pool:\n"
+        msg += "1) Add a prompt with /add-prompt.\n"
+        msg += "2) Someone with the correct role needs to /approve-prompt.\n"
+        msg += "3) Now /show-pool will show the new pool with prompts."
+        return msg
+
+
+class DatasetCog(commands.Cog):
+    """
+    Base of the command cogs, all sharing one `CommandContext`.
+    """
+    def __init__(self, context: CommandContext):
+        self.context = context
+        self.db = context.db
+
+    async def pool_autocomplete(
+        self,
+        _interaction: discord.Interaction,
+        current: str
+    ) -> List[app_commands.Choice[str]]:
+        """
+        Suggest existing pools. Served from the in-memory index only, autocomplete
+        has to answer within 3 seconds and runs on every keystroke.
+        """
+        return [
+            app_commands.Choice(name=pool, value=pool)
+            for pool in self.context.pool_index.complete(current)
+            # Longer names cannot be sent as a choice.
+            if len(pool) <= CHOICE_LIMIT
+        ]
@@ -0,0 +1,403 @@
+import io
+from functools import partial
+from typing import List, Optional
+
+import discord
+import mariadb
+from discord import app_commands
+
+from ..app_types import DatasetEntry
+from ..dataset_encoder import TableEncoder
+from ..db import Db
+from ..sampling import DEFAULT_CARD_SIZE, SENSITIVITY_LEVELS, sensitivities_up_to
+from ..search import SearchStatus, fulltext_query
+from ..views import (
+    PaginatorView,
+    card_embed,
+    format_entry_line,
+    keyset_fetcher,
+    offset_fetcher,
+    page_embed,
+)
+from .base import SENSITIVITY, DatasetCog, truncate_message
+
+MAX_CARD_SIZE = 50
+MAX_SIMULATED_CARDS = 100_000
+
+
+def _render_pool_table(db: Db, pool: str) -> Optional[io.BytesIO]:
+    """
+    Runs on the DB executor: stream a pool into an in-memory table file.
+    Returns None if the pool has no approved entries.
+    """
+    pool_file = io.BytesIO()
+    if TableEncoder().write_table(db.iter_pool(pool), pool_file) == 0:
+        return None
+    pool_file.seek(0)
+    return pool_file
+
+
+def _render_pool_page(pool: str, entries: List[DatasetEntry], page: int) -> discord.Embed:
+    return page_embed(f"Pool: {pool}", [format_entry_line(entry) for entry in entries], page)
+
+
+def _render_card_simulation(
+    db: Db,
+    pool: str,
+    cards: int,
+    size: int,
+    sensitivities: List[str]
+) -> Optional[io.BytesIO]:
+    """
+    Runs on the DB executor: draw `cards` cards and tabulate how many of them
+    each prompt landed on, next to its share of the pool's weight.
+    Returns None if no prompt can be drawn.
+    """
+    counts = db.get_sampler(pool).simulate(cards, size, sensitivities)
+    if not counts:
+        return None
+    total_weight = sum(entry.weight for entry, _count in counts)
+    table = "| UID | Prompt | Weight | Sensitivity | Weight Share | Cards | Card Rate |\n"
+    for entry, count in sorted(counts, key=lambda item: (-item[0].weight, item[0].uid)):
+        table += (
+            f"| {entry.uid} | {entry.prompt} | {entry.weight} | {entry.sensitivity} | "
+            f"{entry.weight / total_weight:.2%} | {count} | {count / cards:.2%} |\n"
+        )
+    return io.BytesIO(table.encode("utf-8"))
+
+
+def _render_queue_page(
+    title: str,
+    rejected: bool,
+    entries: List[DatasetEntry],
+    page: int
+) -> discord.Embed:
+    lines = []
+    for entry in entries:
+        line = f"[{entry.pool}] " + format_entry_line(entry)
+        if rejected:
+            line += f" — Rejection Reason: {entry.rejection_reason}"
+        lines.append(line)
+    return page_embed(title, lines, page)
+
+
+def _render_queue_table(
+    db: Db,
+    rejected: bool,
+    pool: Optional[str],
+    sensitivity: Optional[str]
+) -> Optional[io.BytesIO]:
+    """
+    Runs on the DB executor: stream the pending (or rejected) prompts into an
+    in-memory table file. Returns None if there are none.
+    """
+    queue_file = io.BytesIO()
+    entries = db.iter_queue(rejected, pool, sensitivity)
+    if TableEncoder().write_table(entries, queue_file, include_reason=rejected) == 0:
+        return None
+    queue_file.seek(0)
+    return queue_file
+
+
+class BrowsingCommands(DatasetCog):
+    """
+    Browsing pools, drawing cards and looking through pending, rejected and
+    searched prompts.
+    """
+
+    ###################################################################################
+    @app_commands.command(
+        name="show-pool",
+        description="Show current entries in a specified pool. Only approved entries will show up.",
+    )
+    @app_commands.describe(
+        pool="The name of the pool to show",
+        paginate="Browse the pool page by page instead of downloading it as a file"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def show_pool(
+        self,
+        interaction: discord.Interaction,
+        pool: str,
+        paginate: Optional[bool]
+    ) -> None:
+        """
+        Given a pool name, show all the current entries in this pool.
+        """
+        # ack msg first as pool size may be big.
+        await interaction.response.defer()
+        pool = pool.strip()
+        if paginate:
+            view = PaginatorView(
+                keyset_fetcher(partial(self.db.show_pool_page, pool)),
+                partial(_render_pool_page, pool),
+                interaction.user.id
+            )
+            if await view.load():
+                await view.send(interaction)
+            else:
+                await interaction.followup.send(await self.context.missing_pool_message(pool))
+            return
+        # Stream the pool straight into memory, no temporary files involved.
+        try:
+            pool_file = await self.db.run(_render_pool_table, pool)
+        except mariadb.Error:
+            await interaction.followup.send(f"❌ DB failed to read pool `{pool}`.")
+            return
+        if pool_file is None:
+            await interaction.followup.send(await self.context.missing_pool_message(pool))
+            return
+        filename = pool.replace(" ", "_") + ".txt"
+        await interaction.followup.send(file=discord.File(pool_file, filename=filename))
+
+    ###################################################################################
+    @app_commands.command(
+        name="draw-card",
+        description="Draw a bingo card from a pool, prompts are picked according to their weight.",
+    )
+    @app_commands.describe(
+        pool="The name of the pool to draw from",
+        size=f"Number of prompts on the card (default {DEFAULT_CARD_SIZE})",
+        sensitivity="Most sensitive prompts allowed, from Safe to Questionable to Explicit",
+        simulate="Draw this many cards instead, and attach how often each prompt came up"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def draw_card(
+        self,
+        interaction: discord.Interaction,
+        pool: str,
+        size: Optional[app_commands.Range[int, 1, MAX_CARD_SIZE]],
+        sensitivity: Optional[SENSITIVITY],
+        simulate: Optional[app_commands.Range[int, 1, MAX_SIMULATED_CARDS]]
+    ) -> None:
+        """
+        Preview a card as the upstream app could draw it, or check the weight
+        distribution of a pool over many cards.
+        """
+        await interaction.response.defer()
+        pool = pool.strip()
+        size = size or DEFAULT_CARD_SIZE
+        sensitivities = (
+            sensitivities_up_to(sensitivity) if sensitivity else SENSITIVITY_LEVELS
+        )
+        if simulate:
+            report = await self.db.run(
+                _render_card_simulation, pool, simulate, size, sensitivities
+            )
+            found = report is not None
+        else:
+            card = await self.db.draw_card(pool, size, sensitivities)
+            found = len(card) > 0
+        if not found:
+            if sensitivity:
+                await interaction.followup.send(
+                    f"No approved prompts in `{pool}` are rated up to {sensitivity}."
+                )
+            else:
+                await interaction.followup.send(await self.context.missing_pool_message(pool))
+        elif simulate:
+            filename = pool.replace(" ", "_") + "_cards.txt"
+            await interaction.followup.send(
+                f"🎲 Drew {simulate} cards of up to {size} prompts from `{pool}`.",
+                file=discord.File(report, filename=filename)
+            )
+        else:
+            await interaction.followup.send(embed=card_embed(pool, card))
+
+    ###################################################################################
+    @app_commands.command(
+        name="list-pools",
+        description="Shows all the currently available pools.",
+    )
+    async def list_pools(self, interaction: discord.Interaction) -> None:
+        """
+        Show all the available pools.
+        """
+        pools = await self.db.get_pools()
+        msg = "Existing pools: "
+        if len(pools) == 0:
+            msg += "There are no existing pools.\n"
+            msg += "To make a new pool:\n"
+            msg += "1) Add a prompt with /add-prompt.\n"
+            msg += "2) Someone with the correct role needs to /approve-prompt.\n"
+            msg += "3) Now /list-pools will show the newly created pool."
+        else:
+            msg += ', '.join(pools)
+        await interaction.response.send_message(msg)
+
+    ###################################################################################
+    @app_commands.command(
+        name="pending-prompts",
+        description="Show all the current prompts that are pending approval.",
+    )
+    @app_commands.describe(
+        pool="Only show prompts of this pool",
+        sensitivity="Only show prompts with this sensitivity",
+        export="Download every matching prompt as a file instead of browsing pages"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def pending_prompts(
+        self,
+        interaction: discord.Interaction,
+        pool: Optional[str],
+        sensitivity: Optional[SENSITIVITY],
+        export: Optional[bool]
+    ) -> None:
+        """
+        Show all the current prompts that are pending approval.
+        """
+        await self._send_queue(interaction, False, pool, sensitivity, export)
+
+    ###################################################################################
+    @app_commands.command(
+        name="rejected-prompts",
+        description="Show all the rejected prompts.",
+    )
+    @app_commands.describe(
+        pool="Only show prompts of this pool",
+        sensitivity="Only show prompts with this sensitivity",
+        export="Download every matching prompt as a file instead of browsing pages"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def rejected_prompts(
+        self,
+        interaction: discord.Interaction,
+        pool: Optional[str],
+        sensitivity: Optional[SENSITIVITY],
+        export: Optional[bool]
+    ) -> None:
+        """
+        Show all the rejected prompts.
+        """
+        await self._send_queue(interaction, True, pool, sensitivity, export)
+
+    ###################################################################################
+    @app_commands.command(
+        name="search-prompts",
+        description="Search prompts across all pools.",
+    )
+    @app_commands.describe(
+        query="Words to look for, matched as prefixes (e.g. `hold hand`)",
+        status="Search approved (default), pending or rejected prompts",
+        pool="Only search this pool",
+        sensitivity="Only search prompts with this sensitivity",
+        flag="Only search prompts with this flag (lists every such prompt if no query is given)"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def search_prompts(
+        self,
+        interaction: discord.Interaction,
+        query: Optional[str],
+        status: Optional[SearchStatus],
+        pool: Optional[str],
+        sensitivity: Optional[SENSITIVITY],
+        flag: Optional[str]
+    ) -> None:
+        """
+        Full-text search over prompts, best matches first, one page at a time.
+        """
+        if flag is not None:
+            flag = flag.strip() or None
+        fulltext = None
+        error_msg = None
+        if query is not None:
+            fulltext = fulltext_query(query)
+            if fulltext is None:
+                error_msg = "❌ Search for at least one word of 3 or more letters."
+        elif flag is None:
+            error_msg = "❌ Give a search query and/or a flag."
+        if error_msg is not None:
+            await interaction.response.send_message(error_msg, ephemeral=True)
+            return
+        await interaction.response.defer()
+        status = status or "approved"
+        if pool is not None:
+            pool = pool.strip()
+        # Cut to keep the title and replies within Discord's limits.
+        criteria = f"`{query[:200]}`" if query is not None else f"flag `{flag[:200]}`"
+        view = PaginatorView(
+            offset_fetcher(
+                lambda offset, limit: self.db.search_prompts(
+                    fulltext, status, offset, limit, pool, sensitivity, flag
+                )
+            ),
+            partial(_render_queue_page, f"Search: {criteria}", status == "rejected"),
+            interaction.user.id
+        )
+        try:
+            found = await view.load()
+        except mariadb.Error:
+            await interaction.followup.send(f"❌ DB failed to search for {criteria}.")
+            return
+        if found:
+            await view.send(interaction)
+        else:
+            await interaction.followup.send(f"No {status} prompts match {criteria}.")
+
+    ###################################################################################
+    @app_commands.command(
+        name="list-flags",
+        description="Shows the flags used by approved prompts, with how many prompts use them.",
+    )
+    @app_commands.describe(pool="Only count prompts of this pool")
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def list_flags(self, interaction: discord.Interaction, pool: Optional[str]) -> None:
+        """
+        Show every flag in use, most used first.
+        """
+        if pool is not None:
+            pool = pool.strip()
+        counts = await self.db.get_flag_counts(pool)
+        if not counts:
+            await interaction.response.send_message("There are no flagged prompts.")
+            return
+        msg = "Flags: " + ", ".join(f"{flag} ({count})" for flag, count in counts)
+        await interaction.response.send_message(truncate_message(msg))
+
+    ###################################################################################
+    # Internal functions
+    ###################################################################################
+    async def _send_queue(
+        self,
+        interaction: discord.Interaction,
+        rejected: bool,
+        pool: Optional[str],
+        sensitivity: Optional[str],
+        export: Optional[bool]
+    ) -> None:
+        """
+        Reply with the pending (or rejected) prompts: one page at a time in a
+        paginator, or all of them as a file when `export` is set.
+        """
+        await interaction.response.defer()
+        if pool is not None:
+            pool = pool.strip()
+        kind = "rejected" if rejected else "pending"
+        if export:
+            try:
+                queue_file = await self.db.run(_render_queue_table, rejected, pool, sensitivity)
+            except mariadb.Error:
+                await interaction.followup.send(f"❌ DB failed to export {kind} prompts.")
+                return
+            if queue_file is not None:
+                await interaction.followup.send(
+                    file=discord.File(queue_file, filename=f"{kind}_prompts.txt")
+                )
+                return
+        else:
+            title = f"{kind.capitalize()} prompts"
+            if pool is not None:
+                title += f" in {pool}"
+            view = PaginatorView(
+                keyset_fetcher(
+                    lambda after_uid, limit: self.db.get_queue_page(
+                        rejected, after_uid, limit, pool, sensitivity
+                    )
+                ),
+                partial(_render_queue_page, title, rejected),
+                interaction.user.id
+            )
+            if await view.load():
+                await view.send(interaction)
+                return
+        await interaction.followup.send(f"No {kind} prompts.")
@@ -0,0 +1,178 @@
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+
+from ..app_types import BULK_DONE, BulkResult
+from ..id_list import MAX_IDS, format_id_list, parse_id_list
+from .base import DatasetCog, truncate_message
+
+
+def _render_bulk_result(action: str, result: BulkResult) -> str:
+    """One reply summarizing a bulk command, IDs grouped by outcome."""
+    grouped = result.by_outcome()
+    done = grouped.pop(BULK_DONE, [])
+    output = f"✅ {action.capitalize()} {len(done)}/{len(result.outcomes)} prompts"
+    output += f": {format_id_list(done)}\n" if done else "\n"
+    for outcome, uids in grouped.items():
+        output += f"⚠️ Skipped {len(uids)} ({outcome}): {format_id_list(uids)}\n"
+    return truncate_message(output)
+
+
+class BulkCommands(DatasetCog):
+    """
+    Moderating many prompts at once, each command in a single transaction.
+    """
+
+    ###################################################################################
+    @app_commands.command(
+        name="approve-prompts",
+        description="Approve several prompts at once.",
+    )
+    @app_commands.describe(
+        prompt_ids="IDs and ranges of the prompts to approve, e.g. `12, 15-20`",
+        pool="Approve every pending prompt of this pool instead"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def approve_prompts(
+        self,
+        interaction: discord.Interaction,
+        prompt_ids: Optional[str],
+        pool: Optional[str]
+    ) -> None:
+        """
+        Allow only certain roles to approve prompts, all in a single transaction.
+        """
+        if not self.context.is_privileged_role(interaction):
+            await interaction.response.send_message(
+                "❌ Role is not allowed to approve prompts.",
+                ephemeral=True
+            )
+            return
+        await interaction.response.defer()
+        uids = await self._resolve_bulk_ids(interaction, prompt_ids, pool)
+        if uids is None:
+            return
+        result = await self.db.approve_prompts(uids)
+        await self._send_bulk_result(interaction, "approved", result)
+        if result is not None and result.pools:
+            await self.context.refresh_pool_index()
+
+    ###################################################################################
+    @app_commands.command(
+        name="reject-prompts",
+        description="Reject several prompts at once.",
+    )
+    @app_commands.describe(
+        reason="Reason for rejecting the prompts",
+        prompt_ids="IDs and ranges of the prompts to reject, e.g. `12, 15-20`",
+        pool="Reject every pending prompt of this pool instead"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def reject_prompts(
+        self,
+        interaction: discord.Interaction,
+        reason: str,
+        prompt_ids: Optional[str],
+        pool: Optional[str]
+    ) -> None:
+        """
+        Allow only certain roles to reject prompts, all in a single transaction.
+        """
+        if not self.context.is_privileged_role(interaction):
+            await interaction.response.send_message(
+                "❌ Role is not allowed to reject prompts.",
+                ephemeral=True
+            )
+            return
+        await interaction.response.defer()
+        uids = await self._resolve_bulk_ids(interaction, prompt_ids, pool)
+        if uids is None:
+            return
+        result = await self.db.reject_prompts(uids, reason)
+        await self._send_bulk_result(interaction, f"rejected (Reason: {reason})", result)
+
+    ###################################################################################
+    @app_commands.command(
+        name="delete-prompts",
+        description="Delete several prompts at once.",
+    )
+    @app_commands.describe(
+        prompt_ids="IDs and ranges of the prompts to delete, e.g. `12, 15-20`",
+        pool="Delete every pending prompt of this pool instead"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def delete_prompts(
+        self,
+        interaction: discord.Interaction,
+        prompt_ids: Optional[str],
+        pool: Optional[str]
+    ) -> None:
+        """
+        Delete prompts in a single transaction.
+        Approved prompts can only be deleted by specific roles, others are skipped.
+        """
+        await interaction.response.defer()
+        uids = await self._resolve_bulk_ids(interaction, prompt_ids, pool)
+        if uids is None:
+            return
+        result = await self.db.delete_prompts(uids, self.context.is_privileged_role(interaction))
+        if result is not None:
+            for uid in result.by_outcome().get(BULK_DONE, []):
+                self.context.similarity.remove(uid)
+        await self._send_bulk_result(interaction, "deleted", result)
+        if result is not None and result.pools:
+            await self.context.refresh_pool_index()
+
+    ###################################################################################
+    # Internal functions
+    ###################################################################################
+    async def _resolve_bulk_ids(
+        self,
+        interaction: discord.Interaction,
+        prompt_ids: Optional[str],
+        pool: Optional[str]
+    ) -> Optional[List[int]]:
+        """
+        IDs targeted by a bulk command: either the parsed `prompt_ids`, or the
+        pending prompts of `pool`, up to `MAX_IDS` of them. Replies with the
+        problem and returns None if the arguments do not resolve to any ID.
+        """
+        error_msg = None
+        uids: List[int] = []
+        if (prompt_ids is None) == (pool is None):
+            error_msg = "❌ Give either a list of prompt IDs or a pool, not both."
+        elif pool is not None:
+            pool = pool.strip()
+            # One more than handled, to tell whether the pool has more left.
+            uids = await self.db.get_pending_ids(pool, MAX_IDS + 1)
+            if not uids:
+                error_msg = f"❌ Pool `{pool}` has no pending prompts."
+            elif len(uids) > MAX_IDS:
+                uids = uids[:MAX_IDS]
+                await interaction.followup.send(
+                    f"⚠️ Pool `{pool}` has more than {MAX_IDS} pending prompts, only the "
+                    "first ones are handled. Run the command again for the rest."
+                )
+        else:
+            try:
+                uids = parse_id_list(prompt_ids)
+            except ValueError as e:
+                error_msg = f"❌ {e}"
+        if error_msg is not None:
+            await interaction.followup.send(error_msg)
+            return None
+        return uids
+
+    async def _send_bulk_result(
+        self,
+        interaction: discord.Interaction,
+        action: str,
+        result: Optional[BulkResult]
+    ) -> None:
+        if result is None:
+            await interaction.followup.send(
+                "❌ Unknown error, no prompt was changed!"
+            )
+            return
+        await interaction.followup.send(_render_bulk_result(action, result))
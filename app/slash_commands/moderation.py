@@ -0,0 +1,271 @@
+from typing import List, Optional
+
+import discord
+from discord import app_commands
+
+from ..app_types import ERROR_ENTRY_EXISTS, ERROR_MARIA_DB, join_flags, split_flags
+from ..similarity import SimilarPrompt
+from .base import SENSITIVITY, DatasetCog
+
+DEFAULT_WEIGHTS = {'S': 1, 'E': 2, 'Q': 3}
+
+
+def _format_similar(similar: List[SimilarPrompt]) -> str:
+    return ", ".join(f"#{match.uid} ({match.similarity:.0%})" for match in similar)
+
+
+class ModerationCommands(DatasetCog):
+    """
+    Submitting a prompt, and moderating prompts one at a time.
+    """
+
+    ###################################################################################
+    @app_commands.command(
+        name="add-prompt",
+        description="Submit a prompt for approval",
+    )
+    @app_commands.describe(
+        pool="The pool to add the prompt to",
+        prompt="The prompt to add to the pool",
+        sensitivity="Safe/Explicit/Questionable",
+        weight="Weight of the Prompt. Default value depends on sensitivity",
+        flags="Categories (Comma-separated string)"
+    )
+    @app_commands.autocomplete(pool=DatasetCog.pool_autocomplete)
+    async def add_prompt(self,
+        interaction: discord.Interaction,
+        pool: str,
+        prompt: str,
+        sensitivity: SENSITIVITY,
+        weight: Optional[int],
+        flags: Optional[str]
+    ) -> None:
+        error_msg = None
+        uid = -1
+        # Perform some pre-checks
+        pool = pool.strip()
+        prompt = prompt.strip()
+        if weight is None:
+            weight = DEFAULT_WEIGHTS[sensitivity]
+        if flags is None:
+            flags = ''
+        flag_list = split_flags(flags)
+        flags = join_flags(flag_list)
+        similar = self.context.similarity.find(pool, prompt)
+        exact = [match for match in similar if match.exact]
+        if exact:
+            # Same prompt up to case, punctuation and spacing.
+            error_msg = f"Prompt already exists in this pool: {_format_similar(exact)}."
+        else:
+            uid = await self.db.add_prompt(pool, prompt, weight, sensitivity, flag_list)
+            if uid < 0:
+                if uid == ERROR_MARIA_DB:
+                    error_msg = "DB failed to add prompt."
+                elif uid == ERROR_ENTRY_EXISTS:
+                    error_msg = "Prompt already exists in this pool."
+                else:
+                    error_msg = "Unknown DB error."
+            else:
+                self.context.similarity.add(uid, pool, prompt)
+
+        embed = None
+        if error_msg is not None:
+            embed = discord.Embed(
+                title = "Error adding prompt!",
+                description = error_msg,
+                color = discord.Color.red()
+            )
+            embed.set_footer(text="Error encountered.")
+        else:
+            embed = discord.Embed(
+                title=f"Prompt ID: #{uid}",
+                description="Prompt Received!",
+                color=discord.Color.blue()
+            )
+            embed.set_footer(text="Prompt will be added to pool after approval.")
+        embed.add_field(name="Pool", value=pool, inline=True)
+        embed.add_field(name="Prompt", value=prompt, inline=True)
+        embed.add_field(name="Weight", value=weight, inline=True)
+        embed.add_field(name="Sensitivity", value=sensitivity, inline=True)
+        embed.add_field(name="Flags", value=flags, inline=False)
+        if error_msg is None and similar:
+            embed.add_field(
+                name="⚠️ Similar prompts already in this pool",
+                value=_format_similar(similar),
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed)
+
+    ###################################################################################
+    @app_commands.command(
+        name="modify-prompt",
+        description="Modify a prompt.",
+    )
+    @app_commands.describe(
+        prompt_id="The ID of the prompt to modify",
+        prompt="Modify the prompt string",
+        weight="Modify the prompt weight",
+        sensitivity="Modify the prompt sensitivity",
+        flags="Modify the prompt flags"
+    )
+    async def modify_prompt(
+        self,
+        interaction: discord.Interaction,
+        prompt_id: int,
+        prompt: Optional[str],
+        weight: Optional[int],
+        sensitivity: Optional[SENSITIVITY],
+        flags: Optional[str]
+    ) -> None:
+        """
+        Modify a prompt.
+        Approved prompts can only be modified by specific roles.
+        Unapproved prompts can be modified by anyone.
+        """
+        # Construct summary of modifications requested
+        modifications = "Modifications: "
+        if prompt:
+            modifications += f"prompt: {prompt}, "
+        if weight:
+            modifications += f"weight: {weight}, "
+        if sensitivity:
+            modifications += f"sensitivity: {sensitivity}, "
+        if flags:
+            modifications += f"flags: {flags}"
+        # strip trailing whitespace and ,
+        modifications = modifications.strip(", ")
+
+        try:
+            error_msg = None
+            # Perform some pre-checks
+            if prompt:
+                prompt = prompt.strip()
+            updated_entry = await self.db.modify_prompt(
+                prompt_id,
+                self.context.is_privileged_role(interaction),
+                prompt,
+                weight,
+                sensitivity,
+                split_flags(flags) if flags else None
+            )
+            if updated_entry is None:
+                error_msg = "DB failed to modify prompt."
+            elif prompt:
+                self.context.similarity.add(prompt_id, updated_entry.pool, updated_entry.prompt)
+
+            # Construct the embed
+            embed = None
+            if error_msg is not None:
+                embed = discord.Embed(
+                    title = f"Failed to update Prompt ID #{prompt_id}!",
+                    description = modifications,
+                    color = discord.Color.red()
+                )
+                embed.set_footer(text=error_msg)
+            else:
+                embed = discord.Embed(
+                    title=f"Updated Prompt ID #{prompt_id}",
+                    description=modifications,
+                    color=discord.Color.blue()
+                )
+                embed.set_footer(text="Prompt successfully modified.")
+                embed.add_field(name="Pool", value=updated_entry.pool, inline=True)
+                embed.add_field(name="Prompt", value=updated_entry.prompt, inline=True)
+                embed.add_field(name="Weight", value=updated_entry.weight, inline=True)
+                embed.add_field(name="Sensitivity", value=updated_entry.sensitivity, inline=True)
+                embed.add_field(name="Flags", value=join_flags(updated_entry.flags), inline=False)
+                embed.add_field(name="Approved?", value=bool(updated_entry.approved), inline=False)
+            await interaction.response.send_message(embed=embed)
+        except PermissionError:
+            embed = discord.Embed(
+                title = f"Role cannot update Prompt ID #{prompt_id}!",
+                description = modifications,
+                color = discord.Color.red()
+            )
+            embed.set_footer(text="❌ Role is not allowed to modify approved prompt.")
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    ###################################################################################
+    @app_commands.command(
+        name="delete-prompt",
+        description="Delete a prompt (can be approved or unapproved).",
+    )
+    @app_commands.describe(prompt_id="The ID of the prompt to delete")
+    async def delete_prompt(self, interaction: discord.Interaction, prompt_id: int):
+        """
+        Delete a prompt.
+        Approved prompts can only be deleted by specific roles.
+        Unapproved prompts can be deleted by anyone.
+        """
+        try:
+            if await self.db.delete_prompt(prompt_id, self.context.is_privileged_role(interaction)):
+                self.context.similarity.remove(prompt_id)
+                await interaction.response.send_message(f"✅ Prompt ID #{prompt_id} deleted!")
+                await self.context.refresh_pool_index()
+                return
+            await interaction.response.send_message(
+                f"❌ Unknown error, failed to delete Prompt ID #{prompt_id}!"
+            )
+        except PermissionError:
+            await interaction.response.send_message(
+                f"❌ Role is not allowed to delete approved prompt ID #{prompt_id}.",
+                ephemeral=True
+            )
+
+    ###################################################################################
+    @app_commands.command(
+        name="approve-prompt",
+        description="Approve Prompt Command",
+    )
+    @app_commands.describe(prompt_id="The ID of the unapproved prompt to approve")
+    async def approve_prompt(self, interaction: discord.Interaction, prompt_id: int) -> None:
+        """
+        Allow only certain roles to approve the prompt.
+        """
+        if self.context.is_privileged_role(interaction):
+            if await self.db.approve_prompt(prompt_id):
+                await interaction.response.send_message(f"✅ Prompt ID #{prompt_id} approved!")
+                await self.context.refresh_pool_index()
+            else:
+                await interaction.response.send_message(
+                    f"❌ Unknown error, failed to approve Prompt ID #{prompt_id}!"
+                )
+            return
+        await interaction.response.send_message(
+            f"❌ Role is not allowed to approve prompt ID #{prompt_id}.",
+            ephemeral=True
+        )
+
+    ###################################################################################
+    @app_commands.command(
+        name="reject-prompt",
+        description="Reject Prompt Command",
+    )
+    @app_commands.describe(
+        prompt_id="The ID of the unapproved prompt to reject",
+        reason="Reason for rejecting prompt"
+    )
+    async def reject_prompt(
+        self,
+        interaction: discord.Interaction,
+        prompt_id: int,
+        reason: str
+    ) -> None:
+        """
+        Allow only certain roles to reject the prompt.
+        """
+        if self.context.is_privileged_role(interaction):
+            if await self.db.reject_prompt(prompt_id, reason):
+                await interaction.response.send_message(
+                    f"✅ Prompt ID #{prompt_id} rejected, Reason: {reason}"
+                )
+            else:
+                await interaction.response.send_message(
+                    f"❌ Unknown error, failed to reject Prompt ID #{prompt_id}!"
+                )
+            return
+        await interaction.response.send_message(
+            f"❌ Role is not allowed to reject prompt ID #{prompt_id}.",
+            ephemeral=True
+        )
@@ -0,0 +1,95 @@
+from typing import Dict, Optional
+
+import discord
+from discord import app_commands
+
+from ..metrics import (
+    COMMAND_SECONDS,
+    DB_QUERY_SECONDS,
+    DB_ROWS,
+    DB_WAIT_SECONDS,
+    JOB_STAGE_SECONDS,
+    format_seconds,
+)
+from .base import DatasetCog, truncate_message
+from .sync import SYNC_STAGES
+
+# DB methods listed by /bot-stats, most total time first.
+STATS_DB_METHODS = 10
+
+
+def _render_bot_stats(db_stats: Dict[str, Optional[dict]], sync_job: str) -> str:
+    """Summary of the metrics also served to Prometheus, slowest first."""
+    output = "**Commands**\n"
+    commands_series = sorted(COMMAND_SECONDS.series().items(), key=lambda item: -item[1].sum)
+    for (command, status), series in commands_series:
+        output += f"`/{command}` ({status}): {series.summary()}\n"
+    if not commands_series:
+        output += "No command run yet.\n"
+    output += "**DB queries**\n"
+    rows = DB_ROWS.values()
+    waits = DB_WAIT_SECONDS.series()
+    db_series = sorted(DB_QUERY_SECONDS.series().items(), key=lambda item: -item[1].sum)
+    for (method,), series in db_series[:STATS_DB_METHODS]:
+        output += f"`{method}`: {series.summary()}, {rows.get((method,), 0):.0f} rows, "
+        output += f"wait p99 {format_seconds(waits[(method,)].quantile(0.99))}\n"
+    output += "**Sync stages**\n"
+    stages = JOB_STAGE_SECONDS.series()
+    for stage, description in SYNC_STAGES.items():
+        series = stages.get((sync_job, stage))
+        if series is not None:
+            output += f"{description}: {series.summary()}\n"
+    output += "**DB pool**: " + ", ".join(f"{k}: {v}" for k, v in db_stats["pool"].items())
+    if db_stats["cache"] is not None:
+        output += "\n**Cache**: " + ", ".join(f"{k}: {v}" for k, v in db_stats["cache"].items())
+    return truncate_message(output)
+
+
+class StatsCommands(DatasetCog):
+    """
+    The bot's metrics and help.
+    """
+
+    ###################################################################################
+    @app_commands.command(
+        name="bot-stats",
+        description="Shows command latencies, DB query timings and sync stage durations.",
+    )
+    async def show_stats(self, interaction: discord.Interaction) -> None:
+        """
+        Summary of the bot's metrics since it started, for allowed roles.
+        """
+        if not self.context.is_privileged_role(interaction):
+            await interaction.response.send_message(
+                "❌ Role is not allowed to view bot stats!",
+                ephemeral=True
+            )
+            return
+        await interaction.response.send_message(
+            _render_bot_stats(self.db.stats(), self.context.sync_job.name),
+            ephemeral=True
+        )
+
+    ###################################################################################
+    @app_commands.command(
+        name="help",
+        description="How to use this bot.",
+    )
+    async def display_help(self, interaction: discord.Interaction) -> None:
+        """
+        Display basic info about how to use this bot.
+        """
+        output = "**How to use this bot**\n"
+        output += "1. Use `/list-pools` to view a list of available pools/datasets.\n"
+        output += "    If the pool you want is not listed, jump to Step 3, just input the desired pool name.\n"
+        output += "2. To view current entries in a pool, use `/show-pool`.\n"
+        output += "    To preview a bingo card drawn from a pool, use `/draw-card`.\n"
+        output += "3. Use `/add-prompt` to add a new prompt to a pool.\n"
+        output += "    Take note of the ID assigned to the prompt.\n"
+        output += "4. Made a typo? Modify your prompt with `/modify-prompt` and select any field you want to change.\n"
+        output += "    Use the prompt ID provided in Step 3.\n"
+        output += "    Note: Unapproved prompts can be modified by anyone.\n"
+        output += "    Approved prompts can only be modified by allowed roles.\n"
+        output += "5. Wait for allowed roles to `/approve-prompt`.\n"
+        output += "6. Tada! That's all!"
+        await interaction.response.send_message(output, ephemeral=True)
@@ -0,0 +1,173 @@
+import io
+import logging
+from typing import Dict, Optional
+
+import discord
+import pygit2
+from discord import app_commands
+
+from ..dataset_encoder import JsonEncoder
+from ..db import REMOVED_BLOB_OID, Db
+from ..git import dataset_path
+from ..jobs import SingleFlightJob
+from .base import DatasetCog
+
+logger = logging.getLogger("firestorm_bot")
+
+SYNC_STAGES = {
+    "merge": "Sync fork with upstream",
+    "clone": "Update local repo",
+    "encode": "Encode changed pools",
+    "commit": "Commit",
+    "push": "Push to fork",
+    "pr": "Open pull request",
+}
+
+
+def _encode_pool_json(db: Db, pool: str) -> Optional[bytes]:
+    """
+    Runs on the DB executor: stream a pool into the JSON file format used by
+    firestorm-bingo. `iter_pool` always reads the DB, never `CachedDb`'s copy,
+    which may be stale. Returns None if the pool has no approved entries.
+    """
+    pool_file = io.BytesIO()
+    if JsonEncoder().write_pool(db.iter_pool(pool), pool_file) == 0:
+        return None
+    return pool_file.getvalue()
+
+
+def _render_sync_progress(stage: Optional[str], joined: bool) -> str:
+    """Checklist of sync stages, with everything before `stage` ticked off."""
+    if joined:
+        output = "⏳ A dataset sync is already running, following its progress...\n"
+    else:
+        output = "⏳ Syncing dataset...\n"
+    reached = stage is None
+    for name, description in SYNC_STAGES.items():
+        if name == stage:
+            output += f"🔄 {description}\n"
+            reached = True
+        elif reached:
+            output += f"▫️ {description}\n"
+        else:
+            output += f"✅ {description}\n"
+    return output
+
+
+class SyncCommands(DatasetCog):
+    """
+    Syncing the dataset to firestorm-bingo.
+    """
+
+    ###################################################################################
+    @app_commands.command(
+        name="sync-dataset",
+        description="Sync the latest dataset from DB to Github.",
+    )
+    async def sync_dataset(self, interaction: discord.Interaction) -> None:
+        """
+        Grabs the latest dataset from the DB, convert them to JSON files,
+        and make a pull-request to firestorm-bingo.
+        """
+        if self.context.is_privileged_role(interaction):
+            # Syncing dataset takes a while, this will give us more time to
+            # respond to the request.
+            await interaction.response.defer()
+            joined = self.context.sync_job.running
+            progress_msg = await interaction.followup.send(
+                _render_sync_progress(None, joined),
+                wait=True
+            )
+
+            async def on_progress(stage: str) -> None:
+                await progress_msg.edit(content=_render_sync_progress(stage, joined))
+
+            try:
+                pr_url = await self.context.sync_job.run(self._sync_dataset_internal, on_progress)
+                if pr_url is None:
+                    await interaction.followup.send(
+                        "✅ Dataset already up to date, nothing to sync."
+                    )
+                else:
+                    await interaction.followup.send(
+                        f"✅ Dataset successfully synced: {pr_url}"
+                    )
+            except Exception as e: # pylint: disable=broad-exception-caught
+                await interaction.followup.send(
+                    f"❌ Error occurred: {e}"
+                )
+        else:
+            await interaction.response.send_message(
+                "❌ Role is not allowed to sync the dataset!",
+                ephemeral=True
+            )
+
+    ###################################################################################
+    # Internal functions
+    ###################################################################################
+    async def _sync_dataset_internal(self, job: SingleFlightJob) -> Optional[str]:
+        """
+        Runs as a `SingleFlightJob`: git calls run on the job's worker thread,
+        Github API and DB calls are awaited natively.
+
+        Only pools changed since the last successful sync (or whose synced file
+        has not landed upstream yet) are queried, re-encoded and staged.
+
+        Returns the URL for the PR, or None if there was nothing to sync.
+        """
+        # 1. Sync upstream to forked repo
+        await job.report("merge")
+        logger.info("[sync-dataset-internal] Syncing upstream to fork.")
+        await self.context.git.sync_forked_repo_with_upstream()
+        # 2. Bring the local copy of the forked repo up to date
+        await job.report("clone")
+        logger.info("[sync-dataset-internal] Updating local copy of forked repo.")
+        repo = await job.run_blocking(self.context.git.prepare_repo)
+        # 3. Work out which pools changed since the last sync.
+        await job.report("encode")
+        synced_at = await self.db.db_now()
+        watermark, synced_oids = await self.db.get_sync_state()
+        pools = set(await self.db.get_changed_pools(watermark))
+        blob_oids: Dict[str, Optional[str]] = {}
+        for pool, blob_oid in synced_oids.items():
+            expected = None if blob_oid == REMOVED_BLOB_OID else blob_oid
+            if self.context.git.get_blob_oid(repo, dataset_path(pool)) != expected:
+                pools.add(pool)
+            elif expected is None:
+                # The removal landed upstream, the pool no longer needs tracking.
+                blob_oids[pool] = None
+        if not pools:
+            logger.info("[sync-dataset-internal] No pool changed since last sync.")
+            await self.db.record_sync(synced_at, blob_oids)
+            await job.report("done")
+            return None
+        # 4. For each changed pool, process their entries.
+        logger.info(f"[sync-dataset-internal] Encoding {len(pools)} changed pools.")
+        files: Dict[str, Optional[bytes]] = {}
+        for pool in sorted(pools):
+            data = await self.db.run(_encode_pool_json, pool)
+            # A pool whose last approved prompt was deleted loses its file, which
+            # is tracked until the removal lands upstream.
+            files[dataset_path(pool)] = data
+            blob_oids[pool] = str(pygit2.hash(data)) if data is not None else REMOVED_BLOB_OID
+        # 5. Commit the changes straight from git objects.
+        await job.report("commit")
+        logger.info("[sync-dataset-internal] Committing changes.")
+        commit = await job.run_blocking(self.context.git.commit_files, repo, files)
+        if commit is None:
+            # Everything changed is already upstream.
+            logger.info("[sync-dataset-internal] Dataset files already up to date.")
+            await self.db.record_sync(synced_at, blob_oids)
+            await job.report("done")
+            return None
+        # 6. Update the fork on remote
+        await job.report("push")
+        logger.info("[sync-dataset-internal] Pushing to fork.")
+        await job.run_blocking(self.context.git.push_to_remote, repo)
+        # 7. Make Pull Request, return PR URL.
+        await job.report("pr")
+        pr_url = await self.context.git.make_pull_request()
+        # 8. Move the watermark forward only once the PR is up.
+        await self.db.record_sync(synced_at, blob_oids)
+        await job.report("done")
+        return pr_url
@@ -0,0 +1,194 @@
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import discord
+
+from .app_types import DatasetEntry, join_flags
+
+logger = logging.getLogger("firestorm_bot")
+
+PAGE_SIZE = 10
+PAGINATOR_TIMEOUT = 300
+# Discord's limit on the length of an embed description.
+EMBED_DESCRIPTION_LIMIT = 4096
+
+# Fetches the page starting at `cursor`; returns the page's items and the cursor
+# of the next page (None if this is the last page).
+FetchPage = Callable[[Any], Awaitable[Tuple[List[Any], Any]]]
+# Renders the items of the page at the given (0-based) index.
+RenderPage = Callable[[List[Any], int], discord.Embed]
+
+
+def format_entry_line(entry: DatasetEntry) -> str:
+    line = f"**#{entry.uid}** {entry.prompt} (Weight: {entry.weight}, {entry.sensitivity}"
+    if entry.flags:
+        line += f", Flags: {join_flags(entry.flags)}"
+    return line + ")"
+
+
+def page_embed(
+    title: str,
+    lines: List[str],
+    page: int,
+    color: discord.Color = discord.Color.blue()
+) -> discord.Embed:
+    """
+    Embed listing one page of `lines`. Each line is cut to an equal share of the
+    description limit, so a page of long entries still fits in one embed.
+    """
+    budget = EMBED_DESCRIPTION_LIMIT // max(len(lines), 1) - 1
+    description = "\n".join(
+        line if len(line) <= budget else line[:budget - 1] + "…" for line in lines
+    )
+    embed = discord.Embed(title=title, description=description, color=color)
+    embed.set_footer(text=f"Page {page + 1}")
+    return embed
+
+
+def card_embed(pool: str, card: List[DatasetEntry]) -> discord.Embed:
+    """Embed listing the prompts of a drawn card, in the order drawn."""
+    lines = [f"{i}. " + format_entry_line(entry) for i, entry in enumerate(card, 1)]
+    embed = page_embed(f"Card: {pool}", lines, 0, discord.Color.green())
+    embed.set_footer(text=f"{len(card)} prompts drawn by weight")
+    return embed
+
+
+class PaginatorView(discord.ui.View):
+    """
+    Prev/next buttons over a cursor-paginated query. Only one page is held in
+    memory at a time; cursors of pages already visited are kept so "previous"
+    does not need to scan backwards.
+    """
+    def __init__(
+        self,
+        fetch_page: FetchPage,
+        render_page: RenderPage,
+        owner_id: int,
+        first_cursor: Any = 0,
+        timeout: float = PAGINATOR_TIMEOUT
+    ):
+        """
+        :param fetch_page: Coroutine fetching a page for a cursor
+        :param render_page: Builds the embed for a page
+        :param owner_id: Only this user can flip pages
+        :param first_cursor: Cursor of the first page
+        """
+        super().__init__(timeout=timeout)
+        self._fetch_page = fetch_page
+        self._render_page = render_page
+        self._owner_id = owner_id
+        self._cursors = [first_cursor]
+        self._next_cursor: Any = None
+        self._items: List[Any] = []
+        self.message: Optional[discord.Message] = None
+
+    @property
+    def page(self) -> int:
+        return len(self._cursors) - 1
+
+    async def load(self, cursors: Optional[List[Any]] = None) -> bool:
+        """
+        Fetch the current page, or the last page of `cursors`, which then replace
+        the cursors of the visited pages. Nothing changes if the fetch raises.
+        :return: False if the first page is empty.
+        """
+        cursors = cursors or self._cursors
+        self._items, self._next_cursor = await self._fetch_page(cursors[-1])
+        self._cursors = cursors
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self._next_cursor is None
+        return self.page > 0 or len(self._items) > 0
+
+    def embed(self) -> discord.Embed:
+        return self._render_page(self._items, self.page)
+
+    async def send(self, interaction: discord.Interaction) -> None:
+        """Send the current page as a followup to an already deferred interaction."""
+        self.message = await interaction.followup.send(embed=self.embed(), view=self, wait=True)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self._owner_id:
+            await interaction.response.send_message(
+                "❌ Only the user who ran the command can change pages.",
+                ephemeral=True
+            )
+            return False
+        return True
+
+    async def on_error(
+        self,
+        interaction: discord.Interaction,
+        error: Exception,
+        item: discord.ui.Item
+    ) -> None:
+        """A page that failed to load (e.g. the DB is down) leaves the message as it was."""
+        logger.warning(f"[PaginatorView] Failed to flip page ({item}): {error!r}")
+        msg = "❌ Failed to load the page, try again later."
+        if interaction.response.is_done():
+            await interaction.followup.send(msg, ephemeral=True)
+        else:
+            await interaction.response.send_message(msg, ephemeral=True)
+
+    async def on_timeout(self) -> None:
+        self.previous_page.disabled = True
+        self.next_page.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, _button: discord.ui.Button):
+        await self._show_page(interaction, self._cursors[:-1])
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, _button: discord.ui.Button):
+        cursors = self._cursors
+        if self._next_cursor is not None:
+            cursors = cursors + [self._next_cursor]
+        await self._show_page(interaction, cursors)
+
+    async def _show_page(self, interaction: discord.Interaction, cursors: List[Any]) -> None:
+        """
+        Fetch the last page of `cursors` and edit it into the message. The click
+        is acknowledged first: the fetch hits the DB and may outlast Discord's
+        3 second deadline for a response.
+        """
+        await interaction.response.defer()
+        await self.load(cursors)
+        await interaction.edit_original_response(embed=self.embed(), view=self)
+
+
+def keyset_fetcher(
+    fetch: Callable[[int, int], Awaitable[List[DatasetEntry]]],
+    page_size: int = PAGE_SIZE
+) -> FetchPage:
+    """
+    Adapts a `fetch(after_uid, limit)` keyset query to a `FetchPage`.
+    One extra row is requested to know whether a next page exists.
+    """
+    async def fetch_page(after_uid: int) -> Tuple[List[DatasetEntry], Optional[int]]:
+        entries = await fetch(after_uid, page_size + 1)
+        if len(entries) > page_size:
+            entries = entries[:page_size]
+            return entries, entries[-1].uid
+        return entries, None
+    return fetch_page
+
+
+def offset_fetcher(
+    fetch: Callable[[int, int], Awaitable[List[Any]]],
+    page_size: int = PAGE_SIZE
+) -> FetchPage:
+    """
+    Adapts a `fetch(offset, limit)` query to a `FetchPage`, for results that have
+    no stable key to resume from (e.g. ranked by relevance).
+    One extra row is requested to know whether a next page exists.
+    """
+    async def fetch_page(offset: int) -> Tuple[List[Any], Optional[int]]:
+        items = await fetch(offset, page_size + 1)
+        if len(items) > page_size:
+            return items[:page_size], offset + page_size
+        return items, None
+    return fetch_page
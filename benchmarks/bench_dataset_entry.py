@@ -0,0 +1,93 @@
+"""
+Microbenchmark: memory and construction time of `DatasetEntry` versus the
+previous plain-class implementation, for entries built from DB rows.
+
+Usage: python3 -m benchmarks.bench_dataset_entry [--entries 100000]
+"""
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from app.app_types import DatasetEntry
+
+
+class LegacyDatasetEntry:
+    """`DatasetEntry` as it was before it became a NamedTuple."""
+    def __init__(
+        self,
+        uid: int,
+        pool: str,
+        prompt: str,
+        weight: int,
+        sensitivity: str,
+        flags: str,
+        approved: bool = True,
+        rejected: bool = False,
+        rejection_reason: str = "",
+    ):
+        self.uid = uid
+        self.pool = pool
+        self.prompt = prompt
+        self.weight = weight
+        self.sensitivity = sensitivity
+        self.flags = flags
+        self.approved = approved
+        self.rejected = rejected
+        self.rejection_reason = rejection_reason
+
+
+def make_rows(count: int) -> List[Tuple]:
+    """Rows shaped like `ENTRY_COLUMNS`, once the flags of a prompt are grouped."""
+    return [
+        (uid, f"pool{uid % 50}", f"prompt number {uid}", 1 + uid % 3, "SEQ"[uid % 3],
+         ("flag1", "flag2") if uid % 4 == 0 else (), 1, 0, "")
+        for uid in range(count)
+    ]
+
+
+def build_legacy(rows: List[Tuple]) -> list:
+    # What the Db getters used to do: positional indexing per field.
+    return [
+        LegacyDatasetEntry(row[0], row[1], row[2], row[3], row[4], row[5], row[6], row[7], row[8])
+        for row in rows
+    ]
+
+
+def build_tuple(rows: List[Tuple]) -> list:
+    return list(map(DatasetEntry._make, rows))
+
+
+def measure_memory(build: Callable[[List[Tuple]], list], rows: List[Tuple]) -> int:
+    """Bytes allocated for the entries themselves (field values are shared with the rows)."""
+    gc.collect()
+    tracemalloc.start()
+    entries = build(rows)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entries
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DatasetEntry microbenchmark")
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.entries)
+    print(f"{args.entries} entries, best of {args.repeat} runs")
+    print(f"{'implementation':<20}{'memory (MiB)':>14}{'bytes/entry':>14}{'build (ms)':>12}")
+    for name, build in (("legacy class", build_legacy), ("NamedTuple", build_tuple)):
+        memory = measure_memory(build, rows)
+        seconds = min(timeit.repeat(lambda b=build: b(rows), number=1, repeat=args.repeat))
+        print(
+            f"{name:<20}{memory / 2**20:>14.2f}{memory / args.entries:>14.1f}"
+            f"{seconds * 1000:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
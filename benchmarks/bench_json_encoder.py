@@ -0,0 +1,116 @@
+"""
+Benchmark: encoding a pool file for /sync-dataset.
+
+Compares the previous approach (a list of entry dicts dumped with
+`json.dumps(indent=2)`) with `JsonEncoder.write_pool` streaming to a sink, and,
+when it is installed, with orjson dumping chunks of entry dicts. Reports
+throughput and the peak memory allocated while encoding (the entries
+themselves excluded).
+
+Usage: python3 -m benchmarks.bench_json_encoder [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import io
+import json
+import random
+import string
+import time
+import tracemalloc
+from typing import Callable, List
+
+from app.app_types import DatasetEntry
+from app.dataset_encoder import JSON_CHUNK_SIZE, JsonEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class NullSink(io.RawIOBase):
+    """Counts and discards written bytes, like a file on disk would for memory."""
+    def __init__(self):
+        super().__init__()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.size += len(b)
+        return len(b)
+
+
+def make_entries(count: int) -> List[DatasetEntry]:
+    rnd = random.Random(0)
+    words = ["".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 8))) for _ in range(2000)]
+    flags = ["wholesome", "spicy", "angst", "fluff", "au", "crossover"]
+    return [
+        DatasetEntry(
+            uid, "pool", " ".join(rnd.choices(words, k=rnd.randint(2, 10))),
+            rnd.choice((1, 1, 2, 3)), rnd.choice("SEQ"), tuple(rnd.sample(flags, rnd.randint(0, 2)))
+        )
+        for uid in range(count)
+    ]
+
+
+def legacy(entries: List[DatasetEntry], sink: NullSink) -> None:
+    enc = JsonEncoder()
+    sink.write(json.dumps({"entries": [enc.encode(e) for e in entries]}, indent=2).encode("utf-8"))
+
+
+def streaming(entries: List[DatasetEntry], sink: NullSink) -> None:
+    JsonEncoder().write_pool(entries, sink)
+
+
+def orjson_chunks(entries: List[DatasetEntry], sink: NullSink) -> None:
+    # Same bytes for printable ASCII data only, which the generated entries are.
+    enc = JsonEncoder()
+    sink.write(b'{\n  "entries": [\n')
+    for start in range(0, len(entries), JSON_CHUNK_SIZE):
+        chunk = [enc.encode(e) for e in entries[start:start + JSON_CHUNK_SIZE]]
+        data = orjson.dumps(chunk, option=orjson.OPT_INDENT_2) # pylint: disable=no-member
+        if start:
+            sink.write(b",\n")
+        sink.write(b"  " + data[2:-2].replace(b"\n", b"\n  "))
+    sink.write(b"\n  ]\n}")
+
+
+def measure(encode: Callable[[List[DatasetEntry], NullSink], None], entries: List[DatasetEntry]):
+    sink = NullSink()
+    start = time.perf_counter()
+    encode(entries, sink)
+    seconds = time.perf_counter() - start
+    # Memory in a separate run, tracemalloc slows allocations down.
+    tracemalloc.start()
+    encode(entries, NullSink())
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, sink.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON pool encoder benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    variants = [("json.dumps(indent=2)", legacy), ("write_pool", streaming)]
+    if orjson is not None:
+        variants.append(("orjson, chunked", orjson_chunks))
+    print(
+        f"{'entries':>9}  {'encoder':<22}{'seconds':>9}{'entries/s':>12}"
+        f"{'MB/s':>8}{'peak MiB':>10}"
+    )
+    for size in args.sizes:
+        entries = make_entries(size)
+        for name, encode in variants:
+            seconds, peak, output = measure(encode, entries)
+            print(
+                f"{size:>9}  {name:<22}{seconds:>9.3f}{size / seconds:>12,.0f}"
+                f"{output / seconds / 1e6:>8.1f}{peak / 2**20:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
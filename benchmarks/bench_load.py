@@ -0,0 +1,440 @@
+"""
+Load test: replays a mix of /add-prompt, /show-pool and /pending-prompts
+interactions against the command cogs, without Discord.
+
+Interactions are fakes recording when they are acknowledged (first response
+or defer) and answered, sent by members with or without a privileged role.
+They arrive open loop, as a Poisson process at the target rate, so a bot that
+falls behind queues them up like the gateway would. Discord drops an
+interaction that is not acknowledged within 3 seconds: those count as timeouts.
+
+The cogs run on the bot's real stack (`AsyncDb` over `CachedDb`), over
+`MemoryDb` with a simulated query latency, or over MariaDB with `--mariadb`
+(see `benchmarks.suite` for the database it seeds).
+
+Usage: python3 -m benchmarks.bench_load [--rates 50 100 200 400] [--duration 10]
+    [--workload recorded.jsonl] [--output load.json]
+
+A recorded workload is a JSON lines file of
+`{"command": "show-pool", "options": {"pool": "pool_0001"}, "privileged": false}`,
+replayed in order and cycled through as needed. `--save-workload` writes the
+synthetic workload in that format.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import discord
+from discord import app_commands
+
+from app.async_db import AsyncDb
+from app.cache import CachedDb
+from app.git import GitWrapper
+from app.slash_commands import CommandContext, DatasetCog, make_cogs
+from benchmarks.suite import open_mariadb
+from benchmarks.synthetic import FLAGS, MemoryDb, group_by_pool, make_dataset
+
+# Discord invalidates an interaction not acknowledged within this many seconds.
+ACK_DEADLINE = 3.0
+# Share of each command in the synthetic workload.
+WORKLOAD_MIX = {"add-prompt": 0.2, "show-pool": 0.5, "pending-prompts": 0.3}
+# Commands a workload may replay.
+COMMANDS = tuple(WORKLOAD_MIX)
+# Command handlers by command name, with the cog they are bound to.
+Handlers = Dict[str, Tuple[DatasetCog, app_commands.Command]]
+PRIVILEGED_ROLE = "admin"
+# Share of members with the privileged role.
+PRIVILEGED_RATIO = 0.1
+MEMBERS = 500
+DEFAULT_RATES = [25, 50, 100, 200]
+
+
+class FakeRole(NamedTuple):
+    id: int
+    name: str
+
+
+class FakeMember(NamedTuple):
+    """The attributes of `discord.Member` the cogs read."""
+    id: int
+    name: str
+    roles: List[FakeRole]
+
+
+class FakeMessage:
+    def __init__(self, message_id: int, content: Optional[str], **kwargs: Any):
+        self.id = message_id
+        self.content = content
+        self.kwargs = kwargs
+
+    async def edit(self, **kwargs: Any) -> "FakeMessage":
+        self.kwargs.update(kwargs)
+        return self
+
+
+class ResponseRecorder:
+    """`InteractionResponse` that records when, and how, it was acknowledged."""
+    def __init__(self, interaction: "FakeInteraction"):
+        self._interaction = interaction
+        self.acked_at: Optional[float] = None
+        self.kind: Optional[str] = None
+        self.messages: List[FakeMessage] = []
+
+    def is_done(self) -> bool:
+        return self.acked_at is not None
+
+    def _ack(self, kind: str) -> None:
+        if self.acked_at is not None:
+            raise discord.InteractionResponded(self._interaction)
+        self.acked_at = time.perf_counter()
+        self.kind = kind
+
+    async def defer(self, **_kwargs: Any) -> None:
+        self._ack("defer")
+
+    async def send_message(self, content: Optional[str] = None, **kwargs: Any) -> None:
+        self._ack("message")
+        self.messages.append(FakeMessage(0, content, **kwargs))
+
+    async def edit_message(self, **kwargs: Any) -> None:
+        self._ack("edit")
+        self.messages.append(FakeMessage(0, None, **kwargs))
+
+
+class FollowupRecorder:
+    """`Webhook` of the interaction's followups."""
+    def __init__(self, response: ResponseRecorder):
+        self._response = response
+        self.messages: List[FakeMessage] = []
+
+    async def send(
+        self,
+        content: Optional[str] = None,
+        *,
+        wait: bool = False,
+        **kwargs: Any
+    ) -> Optional[FakeMessage]:
+        if not self._response.is_done():
+            raise RuntimeError("Followup sent before the interaction was acknowledged")
+        message = FakeMessage(len(self.messages) + 1, content, **kwargs)
+        self.messages.append(message)
+        return message if wait else None
+
+
+class FakeInteraction:
+    """The attributes of `discord.Interaction` the cogs use."""
+    def __init__(self, interaction_id: int, command: str, user: FakeMember):
+        self.id = interaction_id
+        self.command_name = command
+        self.user = user
+        self.extras: Dict[str, Any] = {}
+        self.created_at = time.perf_counter()
+        self.response = ResponseRecorder(self)
+        self.followup = FollowupRecorder(self.response)
+
+
+class Request(NamedTuple):
+    command: str
+    options: Dict[str, Any]
+    privileged: bool = False
+
+
+class Result(NamedTuple):
+    command: str
+    # Seconds from arrival to the acknowledgement, None if it never came.
+    ack: Optional[float]
+    # Seconds from arrival to the end of the handler.
+    done: float
+    error: Optional[str]
+
+    @property
+    def timed_out(self) -> bool:
+        return self.ack is None or self.ack > ACK_DEADLINE
+
+
+def synthetic_workload(
+    count: int,
+    pools: List[str],
+    seed: int = 0,
+    mix: Optional[Dict[str, float]] = None
+) -> List[Request]:
+    """
+    `count` requests drawn from `mix`, targeting `pools` (listed biggest first)
+    about as often as they hold prompts.
+    """
+    mix = mix or WORKLOAD_MIX
+    rnd = random.Random(seed)
+    pool_weights = [1.0 / (i + 1) for i in range(len(pools))]
+    requests = []
+    for command in rnd.choices(list(mix), weights=list(mix.values()), k=count):
+        pool = rnd.choices(pools, weights=pool_weights)[0]
+        if command == "add-prompt":
+            options = {
+                "pool": pool,
+                "prompt": " ".join(
+                    "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 8)))
+                    for _ in range(rnd.randint(2, 8))
+                ),
+                "sensitivity": rnd.choice("SSSQE"),
+                "flags": rnd.choice((None, None, rnd.choice(FLAGS))),
+            }
+        elif command == "show-pool":
+            options = {"pool": pool, "paginate": rnd.random() < 0.5}
+        else:
+            options = {"pool": rnd.choice((None, pool)), "export": rnd.random() < 0.1}
+        requests.append(Request(command, options, rnd.random() < PRIVILEGED_RATIO))
+    return requests
+
+
+def load_workload(path: Path) -> List[Request]:
+    requests = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if data.get("command") not in COMMANDS:
+                raise ValueError(f"{path}:{line_number}: unknown command {data.get('command')}")
+            requests.append(Request(
+                data["command"], data.get("options", {}), bool(data.get("privileged", False))
+            ))
+    if not requests:
+        raise ValueError(f"{path} holds no request")
+    return requests
+
+
+def save_workload(path: Path, requests: List[Request]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request._asdict()) + "\n")
+
+
+def make_members(count: int, seed: int = 0) -> List[FakeMember]:
+    """`count` members, the first `PRIVILEGED_RATIO` of them with the privileged role."""
+    rnd = random.Random(seed)
+    everyone = FakeRole(1, "@everyone")
+    privileged = FakeRole(2, PRIVILEGED_ROLE)
+    return [
+        FakeMember(
+            uid, f"member{uid}",
+            [everyone, privileged] if i < max(1, count * PRIVILEGED_RATIO) else [everyone]
+        )
+        for i, uid in enumerate(rnd.sample(range(1, count * 100), count))
+    ]
+
+
+async def dispatch(
+    handlers: Handlers,
+    interaction_id: int,
+    request: Request,
+    user: FakeMember
+) -> Result:
+    """Run one command handler like the command tree would, once its options are parsed."""
+    cog, command = handlers[request.command]
+    kwargs = {}
+    for parameter in command.parameters:
+        if parameter.name in request.options:
+            kwargs[parameter.name] = request.options[parameter.name]
+        elif parameter.required:
+            raise ValueError(f"/{request.command} needs the {parameter.name} option")
+        else:
+            kwargs[parameter.name] = parameter.default
+    interaction = FakeInteraction(interaction_id, request.command, user)
+    error = None
+    try:
+        await command.callback(cog, interaction, **kwargs)
+    except Exception as e: # pylint: disable=broad-exception-caught
+        # Reported with the results, like the tree's error handler would log it.
+        error = f"{type(e).__name__}: {e}"
+    done = time.perf_counter() - interaction.created_at
+    acked_at = interaction.response.acked_at
+    ack = acked_at - interaction.created_at if acked_at is not None else None
+    return Result(request.command, ack, done, error)
+
+
+async def replay(
+    handlers: Handlers,
+    requests: List[Request],
+    members: List[FakeMember],
+    rate: float,
+    seed: int = 0
+) -> Tuple[List[Result], float]:
+    """
+    Send `requests` at `rate` per second on average, without waiting for the
+    previous ones to be answered.
+
+    :return: The results, and the seconds from the first arrival to the last answer.
+    """
+    rnd = random.Random(seed)
+    # Members with and without the privileged role.
+    users = {
+        privileged: [member for member in members if (len(member.roles) > 1) == privileged]
+        for privileged in (False, True)
+    }
+    tasks = []
+    started_at = next_at = time.perf_counter()
+    for interaction_id, request in enumerate(requests, 1):
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        user = rnd.choice(users[request.privileged])
+        tasks.append(asyncio.create_task(dispatch(handlers, interaction_id, request, user)))
+        next_at += rnd.expovariate(rate)
+    results = await asyncio.gather(*tasks)
+    return results, time.perf_counter() - started_at
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, None without values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(results: List[Result], elapsed: float) -> Dict[str, Any]:
+    acks = [result.ack for result in results if result.ack is not None]
+    done = [result.done for result in results]
+    errors = [result.error for result in results if result.error is not None]
+    return {
+        "requests": len(results),
+        "throughput": len(results) / elapsed if elapsed > 0 else 0.0,
+        "ack_p50": _percentile(acks, 0.5),
+        "ack_p99": _percentile(acks, 0.99),
+        "ack_max": max(acks, default=None),
+        "done_p50": _percentile(done, 0.5),
+        "done_p99": _percentile(done, 0.99),
+        "timeout_rate": sum(r.timed_out for r in results) / len(results) if results else 0.0,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+
+def print_summary(label: str, summary: Dict[str, Any]) -> None:
+    print(
+        f"{label:<22}{summary['requests']:>8}{summary['throughput']:>10.1f}"
+        f"{_ms(summary['ack_p50']):>10}{_ms(summary['ack_p99']):>10}"
+        f"{_ms(summary['done_p99']):>11}{summary['timeout_rate']:>10.2%}{summary['errors']:>8}"
+    )
+    if summary["first_error"] is not None:
+        print(f"{'':<22}first error: {summary['first_error']}")
+
+
+def report_rate(rate: float, results: List[Result], elapsed: float) -> Dict[str, Any]:
+    """Print and return the summary of one rate, overall and per command."""
+    total = summarize(results, elapsed)
+    print_summary(f"{rate:g}/s target", total)
+    by_command = {}
+    for command in COMMANDS:
+        subset = [result for result in results if result.command == command]
+        if subset:
+            by_command[command] = summarize(subset, elapsed)
+            print_summary(f"  /{command}", by_command[command])
+    return {"rate": rate, "total": total, "commands": by_command}
+
+
+async def make_context(db: AsyncDb) -> CommandContext:
+    # Never used by the replayed commands.
+    git = GitWrapper(
+        "user", "token", "upstream/repo", "user/repo",
+        str(Path(tempfile.gettempdir()) / "firestorm-load-repo")
+    )
+    context = CommandContext([PRIVILEGED_ROLE], db, git)
+    await context.load()
+    # Lookups from /add-prompt should hit a full similarity index, like at steady state.
+    await context.similarity_load
+    return context
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    entries = make_dataset(args.prompts, args.pools, args.seed)
+    if args.mariadb:
+        backend = open_mariadb(entries)
+    else:
+        backend = MemoryDb(entries, args.db_latency / 1000, args.pool_size)
+    db = AsyncDb(CachedDb(backend))
+    context = await make_context(db)
+    handlers: Handlers = {
+        command.name: (cog, command)
+        for cog in make_cogs(context)
+        for command in cog.get_app_commands()
+    }
+    pools = sorted(group_by_pool(entries), key=lambda pool: int(pool.rsplit("_", 1)[1]))
+    members = make_members(MEMBERS, args.seed)
+
+    report: Dict[str, Any] = {"config": {
+        key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()
+    }, "rates": []}
+    print(
+        f"{'':<22}{'requests':>8}{'req/s':>10}{'ack p50':>10}{'ack p99':>10}"
+        f"{'done p99':>11}{'timeouts':>10}{'errors':>8}"
+    )
+    print(f"{'':<22}{'':>8}{'':>10}{'ms':>10}{'ms':>10}{'ms':>11}")
+    recorded = load_workload(args.workload) if args.workload is not None else None
+    try:
+        for rate in args.rates:
+            count = max(1, int(rate * args.duration))
+            if recorded is not None:
+                requests = list(itertools.islice(itertools.cycle(recorded), count))
+            else:
+                requests = synthetic_workload(count, pools, args.seed + int(rate))
+            if args.save_workload is not None:
+                save_workload(args.save_workload, requests)
+            results, elapsed = await replay(handlers, requests, members, rate, args.seed)
+            report["rates"].append(report_rate(rate, results, elapsed))
+    finally:
+        await context.close()
+    return report
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Command cogs load test")
+    parser.add_argument("--rates", type=float, nargs="+", default=DEFAULT_RATES,
+                        help="Target interactions per second, one run each.")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds of traffic sent at each rate.")
+    parser.add_argument("--prompts", type=int, default=100_000,
+                        help="Prompts in the synthetic dataset.")
+    parser.add_argument("--pools", type=int, default=200)
+    parser.add_argument("--db-latency", type=float, default=2.0,
+                        help="Milliseconds every MemoryDb query takes.")
+    parser.add_argument("--pool-size", type=int, default=4,
+                        help="MemoryDb connections, i.e. DB executor workers.")
+    parser.add_argument("--mariadb", action="store_true",
+                        help="Run against MariaDB instead of MemoryDb.")
+    parser.add_argument("--workload", type=Path, help="Recorded workload to replay.")
+    parser.add_argument("--save-workload", type=Path,
+                        help="Write the workload of the last rate to this file.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run(args))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+    sustained = [r["rate"] for r in report["rates"] if r["total"]["timeout_rate"] == 0]
+    if sustained:
+        print(f"\nHighest rate without a missed {ACK_DEADLINE:g}s ack: {max(sustained):g}/s")
+    else:
+        print(f"\nEvery rate missed the {ACK_DEADLINE:g}s ack for some interactions.")
+
+
+if __name__ == "__main__":
+    main()
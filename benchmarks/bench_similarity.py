@@ -0,0 +1,58 @@
+"""
+Microbenchmark: near-duplicate lookups against one large pool of the
+`SimilarityIndex` used by /add-prompt.
+
+Usage: python3 -m benchmarks.bench_similarity [--prompts 50000]
+"""
+
+import argparse
+import random
+import string
+import time
+
+from app.similarity import SimilarityIndex, jaccard, normalize_prompt, shingles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Similarity index microbenchmark")
+    parser.add_argument("--prompts", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    words = [
+        "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 8))) for _ in range(5000)
+    ]
+    prompts = [" ".join(rnd.choices(words, k=rnd.randint(1, 6))) for _ in range(args.prompts)]
+
+    index = SimilarityIndex()
+    start = time.perf_counter()
+    index.load((uid, "pool", prompt) for uid, prompt in enumerate(prompts))
+    print(f"Indexed {args.prompts} prompts in {time.perf_counter() - start:.2f}s")
+
+    # Half near duplicates (plural, shouting, punctuation), half new prompts.
+    queries = [prompts[i].upper() + "s!" for i in range(args.lookups // 2)]
+    queries += [" ".join(rnd.choices(words, k=3)) for _ in range(args.lookups // 2)]
+    timings = []
+    found = expected = 0
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        matches = index.find("pool", query)
+        timings.append(time.perf_counter() - start)
+        if i < args.lookups // 2:
+            similarity = jaccard(
+                shingles(normalize_prompt(query)), shingles(normalize_prompt(prompts[i]))
+            )
+            if similarity >= index.threshold:
+                expected += 1
+                found += any(match.uid == i for match in matches)
+    timings.sort()
+    print(
+        f"Lookup: mean {sum(timings) / len(timings) * 1e6:.0f}us, "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f}us"
+    )
+    print(f"Recall on near duplicates above the threshold: {found}/{expected}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+Benchmark suite: the components behind the bot's commands and /sync-dataset,
+on synthetic datasets of 1k to 1M prompts spread over many pools, offline.
+
+- encoder: `TableEncoder.write_table`, `JsonEncoder.write_pool` and
+  `JsonEncoder.iter_decode` over every pool.
+- db: the `Db` read paths (`show_pool`, paginated and streamed pools, pending
+  IDs, card draws), with and without `CachedDb`. Runs against `MemoryDb`, an
+  in-memory stand-in, unless `--mariadb` points it at a local server.
+- git: `GitWrapper.prepare_repo`, `commit_files` and `push_to_remote` against a
+  local bare repo standing in for the fork.
+
+Every case keeps the best of `--repeat` runs. Results are written as JSON with
+`--output`, and compared to a previous results file with `--baseline`: the
+suite exits with status 1 if a case got more than `--threshold` slower.
+
+Usage: python3 -m benchmarks.suite [--sizes 1000 10000 100000] [--pools 200]
+    [--groups encoder db git] [--output results.json] [--baseline baseline.json]
+
+Use `--sizes 1000000` for the full-size dataset. `--mariadb` seeds the
+`BENCH_DB` database (default `bingo-bench`) of the server configured by the
+usual DB_* variables, replacing its dataset: never point it at the bot's own.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import pygit2
+
+from app.app_types import DatasetEntry
+from app.cache import CachedDb, TTLCache
+from app.dataset_encoder import JsonEncoder, TableEncoder
+from app.git import DATASET_BRANCH, GitWrapper, dataset_path
+from app.id_list import MAX_IDS
+from app.sampling import DEFAULT_CARD_SIZE
+from app.views import PAGE_SIZE
+
+try:
+    from app.db import Db
+except ImportError:
+    Db = None
+
+from benchmarks.bench_json_encoder import NullSink
+from benchmarks.synthetic import MemoryDb, group_by_pool, make_dataset
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_POOLS = 200
+DEFAULT_REPEAT = 5
+# Slowdown over the baseline reported as a regression, 0.25 = 25% slower.
+DEFAULT_THRESHOLD = 0.25
+GROUPS = ("encoder", "db", "git")
+CARDS_DRAWN = 1000
+SIGNATURE = pygit2.Signature("firestorm-bench", "bench@firestorm.love")
+
+SEED_PROMPTS = (
+    "INSERT IGNORE INTO dataset (id, pool, prompt, weight, sensitivity, approved) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SEED_FLAGS = "INSERT IGNORE INTO prompt_flags (prompt_id, flag, position) VALUES (?, ?, ?)"
+SEED_BATCH_SIZE = 5000
+
+
+class Case(NamedTuple):
+    """One benchmark: `run` processes `items` things (entries, pages, cards...)."""
+    name: str
+    items: int
+    run: Callable[[], Any]
+
+
+def measure(case: Case, repeat: int) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "seconds": best,
+        "median": statistics.median(timings),
+        "items": case.items,
+        "items_per_second": case.items / best if best > 0 else None,
+    }
+
+
+def encoder_cases(pools: Dict[str, List[DatasetEntry]]) -> Iterator[Case]:
+    count = sum(len(entries) for entries in pools.values())
+    yield Case("write_table", count, lambda: [
+        TableEncoder().write_table(entries, NullSink()) for entries in pools.values()
+    ])
+    yield Case("write_pool", count, lambda: [
+        JsonEncoder().write_pool(entries, NullSink()) for entries in pools.values()
+    ])
+    documents = {}
+    for pool, entries in pools.items():
+        sink = io.BytesIO()
+        JsonEncoder().write_pool(entries, sink)
+        documents[pool] = sink.getvalue().decode("utf-8")
+    yield Case("iter_decode", count, lambda: [
+        sum(1 for _ in JsonEncoder().iter_decode(io.StringIO(doc), pool))
+        for pool, doc in documents.items()
+    ])
+
+
+def _walk_pages(db: Any, pool: str) -> int:
+    """Every page of a pool, fetched like `PaginatorView` does."""
+    pages = 0
+    after_uid = 0
+    while True:
+        page = db.show_pool_page(pool, after_uid, PAGE_SIZE + 1)
+        pages += 1
+        if len(page) <= PAGE_SIZE:
+            return pages
+        after_uid = page[PAGE_SIZE - 1].uid
+
+
+def db_cases(db: Any, entries: List[DatasetEntry]) -> Iterator[Case]:
+    pools = group_by_pool(entries)
+    approved = sum(entry.approved for entry in entries)
+    largest = max(pools, key=lambda pool: len(pools[pool]))
+    largest_approved = sum(entry.approved for entry in pools[largest])
+    yield Case("get_pools", 1, db.get_pools)
+    yield Case("show_pool", approved, lambda: [db.show_pool(pool) for pool in pools])
+    yield Case("show_pool_largest", largest_approved, lambda: db.show_pool(largest))
+    pages = _walk_pages(db, largest)
+    yield Case("show_pool_page_largest", pages, lambda: _walk_pages(db, largest))
+    yield Case(
+        "iter_pool_largest", largest_approved, lambda: sum(1 for _ in db.iter_pool(largest))
+    )
+    yield Case(
+        "get_pending_ids", len(pools), lambda: [db.get_pending_ids(pool, MAX_IDS) for pool in pools]
+    )
+    yield Case("get_sampler_largest", largest_approved, lambda: db.get_sampler(largest))
+
+    # Cached: warmed up by the first run, the others are hits like in production.
+    cached = CachedDb(db, TTLCache(maxsize=len(pools) * 2 + 1))
+    yield Case("cached.show_pool", approved, lambda: [cached.show_pool(pool) for pool in pools])
+    yield Case("cached.draw_card_largest", CARDS_DRAWN, lambda: [
+        cached.draw_card(largest, DEFAULT_CARD_SIZE) for _ in range(CARDS_DRAWN)
+    ])
+
+
+class GitBench:
+    """
+    A local bare repo standing in for the fork, holding one pool file per
+    pool, and the bot's persistent checkout of it.
+    """
+    def __init__(self, root: Path, pools: Dict[str, List[DatasetEntry]]):
+        self.remote = pygit2.init_repository(str(root / "fork.git"), bare=True, initial_head="main")
+        self.files = {dataset_path(pool): _encode(entries) for pool, entries in pools.items()}
+        # What /sync-dataset commits: every pool changed, one prompt reweighted each.
+        self.changed = {
+            dataset_path(pool): _encode([entries[0]._replace(weight=entries[0].weight + 1)]
+                                        + entries[1:])
+            for pool, entries in pools.items()
+        }
+        self.git = GitWrapper(
+            "user", "token", "upstream/repo", "user/repo", str(root / "local"),
+            remote_url=str(root / "fork.git"), depth=0
+        )
+        self._seed_remote()
+        self.repo = self.git.prepare_repo()
+        self._commits = 0
+
+    def _seed_remote(self) -> None:
+        empty = self.remote.TreeBuilder().write()
+        self.remote.create_commit("refs/heads/main", SIGNATURE, SIGNATURE, "initial", empty, [])
+        # `commit_files` on the bare repo builds the tree, then main takes it.
+        commit = self.git.commit_files(self.remote, self.files, "dataset")
+        self.remote.references["refs/heads/main"].set_target(commit)
+        self.remote.branches.local.delete(DATASET_BRANCH)
+
+    def commit(self, files: Dict[str, bytes]) -> pygit2.Oid:
+        # A new message every time, so pushes never find the commit already there.
+        self._commits += 1
+        return self.git.commit_files(self.repo, files, f"Update dataset ({self._commits}).")
+
+    def commit_and_push(self) -> None:
+        self.commit(self.changed)
+        self.git.push_to_remote(self.repo)
+
+    def cases(self) -> Iterator[Case]:
+        largest = max(self.files, key=lambda path: len(self.files[path]))
+        yield Case("prepare_repo", 1, self.git.prepare_repo)
+        yield Case("commit_files_one", 1, lambda: self.commit({largest: self.changed[largest]}))
+        yield Case("commit_files_all", len(self.changed), lambda: self.commit(self.changed))
+        yield Case("commit_and_push_all", len(self.changed), self.commit_and_push)
+
+    def check(self) -> None:
+        """The pushed branch holds the changed files."""
+        tree = self.remote.references[f"refs/heads/{DATASET_BRANCH}"].peel(pygit2.Tree)
+        for path, data in self.changed.items():
+            if self.remote[tree[path].id].data != data:
+                raise RuntimeError(f"{path} was not pushed")
+
+
+def _encode(entries: List[DatasetEntry]) -> bytes:
+    sink = io.BytesIO()
+    JsonEncoder().write_pool(entries, sink)
+    return sink.getvalue()
+
+
+def open_mariadb(entries: List[DatasetEntry]) -> Any:
+    """`Db` over the benchmark database, with its dataset replaced by `entries`."""
+    if Db is None:
+        sys.exit("--mariadb needs the mariadb package installed.")
+    database = os.environ.get("BENCH_DB", "bingo-bench")
+    if database == os.environ.get("DEFAULT_DB", "bingo-dataset"):
+        sys.exit(f"BENCH_DB is the bot's database ({database}), refusing to replace its dataset.")
+    db = Db(
+        password=os.environ.get("DB_PASSWORD", "1234"),
+        host=os.environ.get("DB_HOST", "127.0.0.1"),
+        user=os.environ.get("DB_USER", "user"),
+        port=int(os.environ.get("DB_PORT", 3306)),
+        database=database,
+    )
+    # Seeding goes through the wrapper's pooled connections, like the bot's queries.
+    # pylint: disable=protected-access
+    with db._cursor() as (conn, cur):
+        cur.execute("DELETE FROM prompt_flags")
+        cur.execute("DELETE FROM dataset")
+        for start in range(0, len(entries), SEED_BATCH_SIZE):
+            batch = entries[start:start + SEED_BATCH_SIZE]
+            cur.executemany(SEED_PROMPTS, [
+                (e.uid, e.pool, e.prompt, e.weight, e.sensitivity, e.approved) for e in batch
+            ])
+            flags = [(e.uid, flag, i) for e in batch for i, flag in enumerate(e.flags)]
+            if flags:
+                cur.executemany(SEED_FLAGS, flags)
+        conn.commit()
+    return db
+
+
+def run_group(
+    group: str,
+    entries: List[DatasetEntry],
+    args: argparse.Namespace
+) -> Iterator[Case]:
+    # Pool files hold approved entries only.
+    pools = group_by_pool(entry for entry in entries if entry.approved)
+    if group == "encoder":
+        yield from encoder_cases(pools)
+    elif group == "db":
+        db = open_mariadb(entries) if args.mariadb else MemoryDb(entries)
+        try:
+            yield from db_cases(db, entries)
+        finally:
+            db.close()
+    elif group == "git":
+        with tempfile.TemporaryDirectory() as tmp:
+            bench = GitBench(Path(tmp), pools)
+            yield from bench.cases()
+            bench.check()
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float
+) -> List[str]:
+    """
+    Print how every case did against the baseline.
+    :return: Names of the cases more than `threshold` slower.
+    """
+    regressions = []
+    print(f"\n{'case':<48}{'baseline':>10}{'now':>10}{'change':>9}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<48}{'':>10}{result['seconds']:>10.4f}{'new':>9}")
+            continue
+        change = result["seconds"] / before["seconds"] - 1 if before["seconds"] > 0 else 0.0
+        mark = ""
+        if change > threshold:
+            regressions.append(name)
+            mark = "  REGRESSION"
+        print(
+            f"{name:<48}{before['seconds']:>10.4f}{result['seconds']:>10.4f}"
+            f"{change:>+9.1%}{mark}"
+        )
+    for name in baseline.keys() - results.keys():
+        print(f"{name:<48}{baseline[name]['seconds']:>10.4f}{'':>10}{'missing':>9}")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Component benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Prompts in each synthetic dataset.")
+    parser.add_argument("--pools", type=int, default=DEFAULT_POOLS,
+                        help="Pools the prompts are spread over.")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Runs of each case, the best one is kept.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mariadb", action="store_true",
+                        help="Benchmark the db group against MariaDB instead of MemoryDb.")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, help="Results file to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown over the baseline that fails the run, 0.25 = 25%%.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    baseline: Optional[dict] = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("version") != RESULTS_VERSION:
+            sys.exit(f"{args.baseline} is not a version {RESULTS_VERSION} results file.")
+        if baseline["config"]["pools"] != args.pools or baseline["config"]["seed"] != args.seed:
+            print("Warning: the baseline was run with other --pools or --seed.")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case':<48}{'items':>9}{'best s':>10}{'median s':>10}{'items/s':>13}")
+    for size in args.sizes:
+        entries = make_dataset(size, args.pools, args.seed)
+        for group in args.groups:
+            for case in run_group(group, entries, args):
+                name = f"{group}.{case.name}[{size}]"
+                result = results[name] = measure(case, args.repeat)
+                print(
+                    f"{name:<48}{case.items:>9}{result['seconds']:>10.4f}"
+                    f"{result['median']:>10.4f}{result['items_per_second'] or 0:>13,.0f}"
+                )
+
+    if args.output is not None:
+        args.output.write_text(json.dumps({
+            "version": RESULTS_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "sizes": args.sizes,
+                "pools": args.pools,
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "db": "mariadb" if args.mariadb else "memory",
+            },
+            "results": results,
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} cases regressed by more than {args.threshold:.0%}.")
+            sys.exit(1)
+        print(f"\nNo case regressed by more than {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
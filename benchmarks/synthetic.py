@@ -0,0 +1,206 @@
+"""
+Synthetic datasets for the benchmarks, and an in-memory stand-in for `Db`.
+
+Prompts are spread over many pools with a Zipf-like distribution (a few big
+pools, a long tail of small ones), like the real dataset. Everything is
+generated from a seed, so two runs benchmark exactly the same data.
+"""
+
+import bisect
+import random
+import string
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.app_types import ERROR_ENTRY_EXISTS, DatasetEntry
+from app.sampling import SENSITIVITY_LEVELS, PoolSampler
+
+FLAGS = ("wholesome", "spicy", "angst", "fluff", "au", "crossover", "canon", "crack")
+# Share of prompts still waiting for approval.
+PENDING_RATIO = 0.05
+# Same default as `Db`, which cannot be imported without the mariadb package.
+DEFAULT_POOL_SIZE = 4
+
+
+def pool_name(index: int) -> str:
+    return f"pool_{index:04d}"
+
+
+def make_dataset(count: int, pools: int, seed: int = 0) -> List[DatasetEntry]:
+    """
+    `count` entries with UIDs 1..count spread over `pools` pools, in UID order.
+    About `PENDING_RATIO` of them are pending, the rest approved.
+    """
+    rnd = random.Random(seed)
+    words = [
+        "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(3, 8))) for _ in range(5000)
+    ]
+    names = [pool_name(i) for i in range(pools)]
+    # Pool i holds a share of the prompts proportional to 1 / (i + 1).
+    pool_weights = [1.0 / (i + 1) for i in range(pools)]
+    return [
+        DatasetEntry(
+            uid,
+            pool,
+            " ".join(rnd.choices(words, k=rnd.randint(2, 12))),
+            rnd.choice((1, 1, 1, 2, 3, 5)),
+            rnd.choice("SSSQE"),
+            tuple(rnd.sample(FLAGS, rnd.choice((0, 0, 1, 1, 2, 3)))),
+            approved=rnd.random() >= PENDING_RATIO
+        )
+        for uid, pool in enumerate(rnd.choices(names, weights=pool_weights, k=count), 1)
+    ]
+
+
+def group_by_pool(entries: Iterable[DatasetEntry]) -> Dict[str, List[DatasetEntry]]:
+    pools: Dict[str, List[DatasetEntry]] = {}
+    for entry in entries:
+        pools.setdefault(entry.pool, []).append(entry)
+    return pools
+
+
+class MemoryDb:
+    """
+    In-memory stand-in for the `Db` methods the bot serves commands from,
+    when no MariaDB server is available. Results are fresh lists built like
+    `Db` builds them from rows, so the Python side (and `CachedDb` in front of
+    it) is measured without any SQL. Thread-safe, like `Db`.
+    """
+    def __init__(
+        self,
+        entries: Iterable[DatasetEntry],
+        latency: float = 0.0,
+        pool_size: int = DEFAULT_POOL_SIZE
+    ):
+        """
+        :param latency: Seconds every query blocks for, standing in for the
+            round trip to MariaDB
+        :param pool_size: Number of "connections", i.e. of DB executor workers
+        """
+        self.latency = latency
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._pools: Dict[str, List[DatasetEntry]] = {}
+        self._uids: Dict[str, List[int]] = {}
+        self._keys: Set[Tuple[str, str]] = set()
+        # Pending prompts, in UID order.
+        self._queue: List[DatasetEntry] = []
+        self._last_uid = 0
+        for entry in entries:
+            self._insert(entry)
+
+    def close(self) -> None:
+        pass
+
+    def _insert(self, entry: DatasetEntry) -> None:
+        self._pools.setdefault(entry.pool, []).append(entry)
+        self._uids.setdefault(entry.pool, []).append(entry.uid)
+        self._keys.add((entry.pool, entry.prompt))
+        if not entry.approved and not entry.rejected:
+            self._queue.append(entry)
+        self._last_uid = max(self._last_uid, entry.uid)
+
+    def _query(self) -> None:
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def add_prompt(
+        self,
+        pool: str,
+        prompt: str,
+        weight: int,
+        sensitivity: str,
+        flags: Tuple[str, ...]
+    ) -> int:
+        self._query()
+        with self._lock:
+            if (pool, prompt) in self._keys:
+                return ERROR_ENTRY_EXISTS
+            uid = self._last_uid + 1
+            self._insert(DatasetEntry(uid, pool, prompt, weight, sensitivity, flags, False))
+        return uid
+
+    def get_pools(self) -> List[str]:
+        self._query()
+        with self._lock:
+            return [pool for pool, rows in self._pools.items() if any(e.approved for e in rows)]
+
+    def get_pending_ids(self, pool: str, limit: int) -> List[int]:
+        self._query()
+        with self._lock:
+            return [entry.uid for entry in self._queue if entry.pool == pool][:limit]
+
+    def show_pool(self, pool: str) -> List[DatasetEntry]:
+        self._query()
+        with self._lock:
+            return [DatasetEntry(*entry) for entry in self._pools.get(pool, ()) if entry.approved]
+
+    def iter_pool(self, pool: str) -> Iterator[DatasetEntry]:
+        return iter(self.show_pool(pool))
+
+    def show_pool_page(self, pool: str, after_uid: int, limit: int) -> List[DatasetEntry]:
+        self._query()
+        with self._lock:
+            rows = self._pools.get(pool, [])
+            start = bisect.bisect_right(self._uids.get(pool, []), after_uid)
+            return _page(rows, start, limit, lambda entry: entry.approved)
+
+    def get_queue_page(
+        self,
+        rejected: bool,
+        after_uid: int,
+        limit: int,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None
+    ) -> List[DatasetEntry]:
+        self._query()
+        if rejected:
+            return []
+        with self._lock:
+            start = bisect.bisect_right(self._queue, after_uid, key=lambda entry: entry.uid)
+            return _page(self._queue, start, limit, lambda entry: (
+                (pool is None or entry.pool == pool)
+                and (sensitivity is None or entry.sensitivity == sensitivity)
+            ))
+
+    def iter_queue(
+        self,
+        rejected: bool,
+        pool: Optional[str] = None,
+        sensitivity: Optional[str] = None
+    ) -> Iterator[DatasetEntry]:
+        return iter(self.get_queue_page(rejected, 0, len(self._queue), pool, sensitivity))
+
+    def iter_prompt_texts(self) -> Iterator[Tuple[int, str, str]]:
+        self._query()
+        with self._lock:
+            rows = [(e.uid, e.pool, e.prompt) for pool in self._pools.values() for e in pool]
+        return iter(rows)
+
+    def get_sampler(self, pool: str) -> PoolSampler:
+        return PoolSampler(self.show_pool(pool))
+
+    def draw_card(
+        self,
+        pool: str,
+        size: int,
+        sensitivities: Iterable[str] = SENSITIVITY_LEVELS
+    ) -> List[DatasetEntry]:
+        return self.get_sampler(pool).draw(size, sensitivities)
+
+
+def _page(
+    rows: List[DatasetEntry],
+    start: int,
+    limit: int,
+    keep: Callable[[DatasetEntry], bool]
+) -> List[DatasetEntry]:
+    """Up to `limit` copies of the rows kept, from `start` on."""
+    page = []
+    for i in range(start, len(rows)):
+        if len(page) == limit:
+            break
+        if keep(rows[i]):
+            page.append(DatasetEntry(*rows[i]))
+    return page
@@ -1,113 +1,228 @@
 """
-Script that takes a json prompts file, parses it, and stores the info into a given mariadb.
+Script that takes JSON prompts files, parses them, and stores the info into a given mariadb.
+
+Every file is a pool named after the file. Entries are streamed from the file
+and upserted on (pool, prompt) in batches, one transaction per batch: running
+the import again updates weights, sensitivities and flags instead of adding
+duplicates, so an interrupted import can simply be restarted. Files are
+imported in parallel, each over its own connection.
 """
 
 import argparse
-import json
 import logging
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, List
 
 import mariadb
 from dotenv import load_dotenv
 
+CURRENT_DIR = Path(__file__).resolve().parent
+# Reuse the bot's decoder when run as `python3 scripts/json_to_db.py`.
+sys.path.insert(0, str(CURRENT_DIR.parent))
+
+# pylint: disable=wrong-import-position
+from app.app_types import DatasetEntry
+from app.dataset_encoder import JsonEncoder
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-CURRENT_DIR = str(Path(__file__).resolve().parent)
-
-class Db(object):
-    def __init__(self,
-        password: str,
-        host: str = "127.0.0.1",
-        user: str = "root",
-        port: int = 3306,
-        database: str = "bingo-dataset"
-    ):
-        try:
-            conn = mariadb.connect(
-                user=user,
-                password=password,
-                host=host,
-                port=port,
-                database=database,
-                reconnect=True
-
-            )
-            self.conn = conn
-            self.cur = conn.cursor()
-            logger.info(f"Successfully connected to {database}!")
-
-        except mariadb.OperationalError as e:
-            logger.error(f"DB connection error: {e}")
-            sys.exit(1)
-        except mariadb.Error as e:
-            logger.error(f"DB error: {e}")
-            sys.exit(1)
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self.cur.close()
-        self.conn.close()
-
-    def add_prompts(self, pool: str, entries: List[Dict]) -> bool:
-        """
-        Returns True if managed to add all prompts to the DB,
-        otherwise False if any fails.
-        """
-        insert_sql = "INSERT INTO dataset (pool, prompt, weight, sensitivity, flags, approved) VALUES (?, ?, ?, ?, ?, ?)"
-        prompts_to_insert = []
-        for entry in entries:
-            prompt = entry["text"]
-            weight = entry["weight"] if "weight" in entry else 1
-            sensitivity = entry["sensitivity"] if "sensitivity" in entry else "S"
-            flags = ",".join(entry["flags"]) if "flags" in entry else ""
-            prompts_to_insert.append(
-                (pool, prompt, weight, sensitivity, flags, True)
-            )
-        logger.info(f"Number of prompts found in dataset: {len(prompts_to_insert)}")
-        logger.info("Attempting to store into database now...")
-        try:
-            self.cur.executemany(insert_sql, prompts_to_insert)
-            self.conn.commit()
-            logger.info(f"Successfully inserted {self.cur.rowcount} prompts into the database.")
-            return True
-        except mariadb.Error as e:
-            logger.warning(f"Error adding prompt: {e}")
-            return False
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_JOBS = 4
+# Seconds between two progress reports.
+PROGRESS_INTERVAL = 2.0
+
+# Prompts coming from the upstream dataset are approved, even if they were
+# still pending or rejected in the DB.
+UPSERT_PROMPT = (
+    "INSERT INTO dataset (pool, prompt, weight, sensitivity, approved) VALUES (?, ?, ?, ?, TRUE) "
+    "ON DUPLICATE KEY UPDATE weight = VALUE(weight), sensitivity = VALUE(sensitivity), "
+    "approved = TRUE, rejected = FALSE, reject_reason = NULL"
+)
+# Flags are matched to their prompt through the unique (pool, prompt) key, as
+# a batched upsert does not report the ID of every row.
+DELETE_FLAGS = (
+    "DELETE prompt_flags FROM prompt_flags JOIN dataset ON dataset.id = prompt_flags.prompt_id "
+    "WHERE dataset.pool = ? AND dataset.prompt = ?"
+)
+INSERT_FLAG = (
+    "INSERT IGNORE INTO prompt_flags (prompt_id, flag, position) "
+    "SELECT id, ?, ? FROM dataset WHERE pool = ? AND prompt = ?"
+)
+
+
+class Progress:
+    """
+    Entry counters shared by the import threads, logged every `PROGRESS_INTERVAL` seconds.
+    """
+    def __init__(self, files: int):
+        self.files = files
+        self.files_done = 0
+        self.entries = 0
+        self.started_at = time.monotonic()
+        self._reported_at = self.started_at
+        self._lock = threading.Lock()
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.entries += count
+            now = time.monotonic()
+            if now - self._reported_at >= PROGRESS_INTERVAL:
+                self._reported_at = now
+                self._report(now)
+
+    def file_done(self) -> None:
+        with self._lock:
+            self.files_done += 1
+
+    def summary(self) -> None:
+        with self._lock:
+            self._report(time.monotonic())
+
+    def _report(self, now: float) -> None:
+        elapsed = now - self.started_at
+        rate = self.entries / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"{self.files_done}/{self.files} files, {self.entries} entries "
+            f"in {elapsed:.1f}s ({rate:.0f} entries/s)"
+        )
+
+
+def upsert_batch(cur: mariadb.Cursor, entries: List[DatasetEntry]) -> None:
+    """Upsert the prompts of a batch and replace their flags."""
+    # The same prompt listed twice in a file: the last one wins.
+    entries = list({entry.prompt: entry for entry in entries}.values())
+    cur.executemany(
+        UPSERT_PROMPT,
+        [(entry.pool, entry.prompt, entry.weight, entry.sensitivity) for entry in entries]
+    )
+    cur.executemany(DELETE_FLAGS, [(entry.pool, entry.prompt) for entry in entries])
+    flags = [
+        (flag, position, entry.pool, entry.prompt)
+        for entry in entries
+        for position, flag in enumerate(entry.flags)
+    ]
+    if flags:
+        cur.executemany(INSERT_FLAG, flags)
+
+
+def import_file(
+    path: Path,
+    connect: Callable[[], mariadb.Connection],
+    batch_size: int,
+    progress: Progress
+) -> int:
+    """
+    Import one pool file over its own connection, committing every `batch_size` entries.
+    :return: Number of entries imported.
+    """
+    pool = path.stem
+    started_at = time.monotonic()
+    count = 0
+    conn = connect()
+    try:
+        cur = conn.cursor()
+        with open(path, "r", encoding="utf-8") as f:
+            entries = JsonEncoder().iter_decode(f, pool)
+            while batch := list(islice(entries, batch_size)):
+                try:
+                    upsert_batch(cur, batch)
+                    conn.commit()
+                except mariadb.Error:
+                    conn.rollback()
+                    raise
+                count += len(batch)
+                progress.add(len(batch))
+    finally:
+        conn.close()
+    progress.file_done()
+    logger.info(f"Imported {count} prompts into {pool} in {time.monotonic() - started_at:.1f}s.")
+    return count
+
+
+def find_files(paths: List[str]) -> List[Path]:
+    """The given files, and the `.json` files of the given directories."""
+    files = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.json")) if path.is_dir() else [path])
+    return files
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
-        description="Process a JSON dataset and adds it to an existing DB."
+        description="Process JSON datasets and adds them to an existing DB."
+    )
+    parser.add_argument(
+        'paths',
+        nargs='+',
+        help='JSON files, or directories of JSON files, to be added to the database.'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help='Entries upserted per transaction.'
     )
-    parser.add_argument('filename', help='The JSON file to be added to the database.')
-    args = parser.parse_args()
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=DEFAULT_JOBS,
+        help='Files imported in parallel.'
+    )
+    return parser.parse_args()
 
-    return args.filename
 
 def main():
-    load_dotenv(dotenv_path=f"{CURRENT_DIR}/.env")
+    load_dotenv(dotenv_path=CURRENT_DIR / ".env")
     db_password = os.environ.get('DB_PASSWORD', '1234')
     db_user = os.environ.get('DB_USER', 'user')
     db_host = os.environ.get('DB_HOST', '127.0.0.1')
     db_port = int(os.environ.get('DB_PORT', 3306))
     default_db_name = os.environ.get('DEFAULT_DB', 'bingo-dataset')
 
-    dataset_file = parse_args()
-    dataset_name = dataset_file.strip(" ./").split(".")[0]
-
-    logger.info(f"Processing {dataset_file}...")
-    with open(dataset_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    logger.info("Connecting to db...")
-    db = Db(db_password, db_host, db_user, db_port, default_db_name)
-
-    db.add_prompts(dataset_name, data["entries"])
+    args = parse_args()
+    files = find_files(args.paths)
+    if not files:
+        logger.error("No JSON dataset found.")
+        sys.exit(1)
+
+    def connect() -> mariadb.Connection:
+        return mariadb.connect(
+            user=db_user,
+            password=db_password,
+            host=db_host,
+            port=db_port,
+            database=default_db_name,
+            autocommit=False
+        )
+
+    logger.info(f"Importing {len(files)} files into {default_db_name}...")
+    progress = Progress(len(files))
+    failed = []
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {
+            executor.submit(import_file, path, connect, args.batch_size, progress): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except (mariadb.Error, OSError, ValueError) as e:
+                logger.error(f"Failed to import {futures[future]}: {e}")
+                failed.append(futures[future])
+    progress.summary()
+    if failed:
+        logger.error(f"{len(failed)} files failed, batches committed before the error are kept.")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+import importlib.util
+import sys
+import types
+
+
+def stub_mariadb() -> None:
+    """
+    `app.db` imports mariadb, which needs the MariaDB Connector/C to install.
+    Tests never reach the DB, only the exception types have to exist.
+    """
+    if "mariadb" in sys.modules or importlib.util.find_spec("mariadb") is not None:
+        return
+    stub = types.ModuleType("mariadb")
+    error = type("Error", (Exception,), {})
+    stub.Error = error
+    for name in ("OperationalError", "IntegrityError", "PoolError"):
+        setattr(stub, name, type(name, (error,), {}))
+    stub.Connection = stub.ConnectionPool = stub.Cursor = object
+    sys.modules["mariadb"] = stub
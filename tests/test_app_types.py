@@ -0,0 +1,15 @@
+import unittest
+
+from app.app_types import join_flags, split_flags
+
+
+class TestFlags(unittest.TestCase):
+    def test_split_flags(self):
+        self.assertEqual(split_flags("a, b,c"), ("a", "b", "c"))
+        self.assertEqual(split_flags(" a ,, b , a "), ("a", "b"))
+        self.assertEqual(split_flags(""), ())
+        self.assertEqual(split_flags(" , "), ())
+
+    def test_join_flags(self):
+        self.assertEqual(join_flags(("a", "b")), "a, b")
+        self.assertEqual(split_flags(join_flags(("x y", "z"))), ("x y", "z"))
@@ -0,0 +1,142 @@
+import unittest
+
+from app.app_types import BULK_DONE, BULK_NOT_FOUND, BulkResult, DatasetEntry
+from app.cache import CachedDb, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingDb:
+    """Minimal in-memory stand-in for the Db methods CachedDb wraps."""
+    def __init__(self):
+        self.entries = {
+            1: DatasetEntry(1, "pool1", "a", 1, "S", (), approved=True),
+            2: DatasetEntry(2, "pool1", "b", 1, "S", (), approved=False),
+            3: DatasetEntry(3, "pool2", "c", 1, "S", (), approved=True),
+        }
+        self.calls = {"get_pools": 0, "show_pool": 0}
+
+    def get_prompt(self, uid):
+        return self.entries.get(uid)
+
+    def get_pools(self):
+        self.calls["get_pools"] += 1
+        return sorted({e.pool for e in self.entries.values() if e.approved})
+
+    def show_pool(self, pool):
+        self.calls["show_pool"] += 1
+        return [e for e in self.entries.values() if e.pool == pool and e.approved]
+
+    def approve_prompt(self, uid):
+        self.entries[uid] = self.entries[uid]._replace(approved=True)
+        return True
+
+    def delete_prompt(self, uid, _is_privileged_role):
+        del self.entries[uid]
+        return True
+
+    def approve_prompts(self, uids):
+        result = BulkResult(uids)
+        for uid in uids:
+            if uid in self.entries:
+                self.approve_prompt(uid)
+                result.outcomes[uid] = BULK_DONE
+                result.pools.add(self.entries[uid].pool)
+        return result
+
+    def delete_prompts(self, uids, is_privileged_role):
+        result = BulkResult(uids)
+        for uid in uids:
+            if uid in self.entries:
+                result.pools.add(self.entries[uid].pool)
+                self.delete_prompt(uid, is_privileged_role)
+                result.outcomes[uid] = BULK_DONE
+        return result
+
+    def get_pending_prompts(self):
+        return [e for e in self.entries.values() if not e.approved]
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_hit_miss_and_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        self.assertEqual(cache.get("a"), (False, None))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), (True, 1))
+        clock.now = 5
+        self.assertEqual(cache.get("a"), (False, None))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "size": 0})
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), (False, None))
+        self.assertEqual(cache.get("a"), (True, 1))
+        self.assertEqual(cache.get("c"), (True, 3))
+
+
+class TestCachedDb(unittest.TestCase):
+    def test_reads_are_cached(self):
+        db = CountingDb()
+        cached = CachedDb(db)
+        for _ in range(3):
+            self.assertEqual(cached.get_pools(), ["pool1", "pool2"])
+            self.assertEqual(len(cached.show_pool("pool1")), 1)
+        self.assertEqual(db.calls, {"get_pools": 1, "show_pool": 1})
+        self.assertEqual(cached.cache_stats()["hits"], 4)
+
+    def test_approve_invalidates_only_affected_pool(self):
+        db = CountingDb()
+        cached = CachedDb(db)
+        cached.show_pool("pool1")
+        cached.show_pool("pool2")
+        self.assertTrue(cached.approve_prompt(2))
+        self.assertEqual(len(cached.show_pool("pool1")), 2)
+        cached.show_pool("pool2")
+        self.assertEqual(db.calls["show_pool"], 3)
+
+    def test_delete_invalidates_pool_list(self):
+        db = CountingDb()
+        cached = CachedDb(db)
+        self.assertEqual(cached.get_pools(), ["pool1", "pool2"])
+        self.assertTrue(cached.delete_prompt(3, True))
+        self.assertEqual(cached.get_pools(), ["pool1"])
+
+    def test_bulk_invalidates_affected_pools(self):
+        db = CountingDb()
+        cached = CachedDb(db)
+        cached.show_pool("pool1")
+        cached.show_pool("pool2")
+        result = cached.approve_prompts([2, 4])
+        self.assertEqual(result.by_outcome(), {BULK_DONE: [2], BULK_NOT_FOUND: [4]})
+        self.assertEqual(len(cached.show_pool("pool1")), 2)
+        cached.show_pool("pool2")
+        self.assertEqual(db.calls["show_pool"], 3)
+        cached.delete_prompts([1, 3], True)
+        self.assertEqual(cached.get_pools(), ["pool1"])
+        self.assertEqual(len(cached.show_pool("pool1")), 1)
+
+    def test_sampler_rebuilt_when_pool_changes(self):
+        db = CountingDb()
+        cached = CachedDb(db)
+        sampler = cached.get_sampler("pool1")
+        self.assertIs(cached.get_sampler("pool1"), sampler)
+        self.assertEqual([e.uid for e in cached.draw_card("pool1", 5)], [1])
+        cached.approve_prompt(2)
+        self.assertIsNot(cached.get_sampler("pool1"), sampler)
+        self.assertEqual(sorted(e.uid for e in cached.draw_card("pool1", 5)), [1, 2])
+        self.assertEqual(db.calls["show_pool"], 2)
+
+    def test_passthrough(self):
+        cached = CachedDb(CountingDb())
+        self.assertEqual([e.uid for e in cached.get_pending_prompts()], [2])
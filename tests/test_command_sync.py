@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+
+import discord
+from discord import app_commands
+from discord.errors import Forbidden, HTTPException, RateLimited
+
+from app.command_sync import (
+    SYNC_FAILED,
+    SYNC_FORBIDDEN,
+    SYNC_SYNCED,
+    SYNC_UNCHANGED,
+    CommandSyncer,
+    tree_hash,
+)
+
+
+class FakeResponse:
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "error"
+
+
+class FakeTree(app_commands.CommandTree):
+    """Command tree recording syncs instead of calling Discord."""
+    def __init__(self):
+        client = discord.Client(intents=discord.Intents.none())
+        client._connection.application_id = 1 # pylint: disable=protected-access
+        super().__init__(client)
+        self.synced = []
+        # Errors to raise before succeeding, per guild ID.
+        self.failures = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def sync(self, *, guild=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            queued = self.failures.get(guild.id)
+            if queued:
+                raise queued.pop(0)
+            self.synced.append(guild.id)
+            return []
+        finally:
+            self.in_flight -= 1
+
+
+class FakeDb:
+    def __init__(self, hashes=None, fail_load=False):
+        self.hashes = dict(hashes or {})
+        self.fail_load = fail_load
+
+    async def get_command_hashes(self):
+        if self.fail_load:
+            raise RuntimeError("DB down")
+        return dict(self.hashes)
+
+    async def record_command_hash(self, guild_id, digest):
+        self.hashes[guild_id] = digest
+
+
+def make_command(name: str) -> app_commands.Command:
+    async def callback(_interaction: discord.Interaction, _pool: str) -> None:
+        pass
+    return app_commands.Command(name=name, description="test", callback=callback)
+
+
+class TestCommandSync(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tree = FakeTree()
+        self.guild_ids = list(range(1, 11))
+        for guild_id in self.guild_ids:
+            self.tree.add_command(make_command("ping"), guild=discord.Object(guild_id))
+        self.db = FakeDb()
+
+    def test_tree_hash_follows_commands(self):
+        guild = discord.Object(1)
+        digest = tree_hash(self.tree, guild)
+        self.assertEqual(digest, tree_hash(self.tree, guild))
+        self.assertEqual(digest, tree_hash(self.tree, discord.Object(2)))
+        self.tree.add_command(make_command("pong"), guild=guild)
+        self.assertNotEqual(digest, tree_hash(self.tree, guild))
+        self.assertNotEqual(tree_hash(self.tree, guild), tree_hash(self.tree, discord.Object(2)))
+
+    async def test_skips_unchanged_guilds(self):
+        syncer = CommandSyncer(self.tree, self.db)
+        outcomes = await syncer.sync_guilds(self.guild_ids)
+        self.assertEqual(set(outcomes.values()), {SYNC_SYNCED})
+        self.assertEqual(sorted(self.tree.synced), self.guild_ids)
+        self.assertEqual(set(self.db.hashes), set(self.guild_ids))
+
+        # Next start: one guild got a new command.
+        self.tree.synced.clear()
+        self.tree.add_command(make_command("pong"), guild=discord.Object(3))
+        restarted = CommandSyncer(self.tree, self.db)
+        outcomes = await restarted.sync_guilds(self.guild_ids)
+        self.assertEqual(self.tree.synced, [3])
+        self.assertEqual(outcomes[3], SYNC_SYNCED)
+        self.assertEqual(outcomes[1], SYNC_UNCHANGED)
+
+        outcomes = await restarted.sync_guilds(self.guild_ids, force=True)
+        self.assertEqual(set(outcomes.values()), {SYNC_SYNCED})
+
+    async def test_concurrency_is_bounded(self):
+        syncer = CommandSyncer(self.tree, self.db, concurrency=3)
+        await syncer.sync_guilds(self.guild_ids)
+        self.assertEqual(len(self.tree.synced), len(self.guild_ids))
+        self.assertEqual(self.tree.max_in_flight, 3)
+
+    async def test_retries_rate_limits_and_server_errors(self):
+        self.tree.failures[1] = [RateLimited(0.01), HTTPException(FakeResponse(503), "down")]
+        syncer = CommandSyncer(self.tree, self.db, backoff_base=0.01)
+        outcomes = await syncer.sync_guilds([1])
+        self.assertEqual(outcomes, {1: SYNC_SYNCED})
+        self.assertEqual(self.tree.synced, [1])
+
+    async def test_gives_up_without_recording(self):
+        self.tree.failures[1] = [Forbidden(FakeResponse(403), "missing access")]
+        self.tree.failures[2] = [RateLimited(0.01)] * 3
+        self.tree.failures[3] = [HTTPException(FakeResponse(400), "invalid")]
+        syncer = CommandSyncer(self.tree, self.db, max_retries=2)
+        outcomes = await syncer.sync_guilds([1, 2, 3])
+        self.assertEqual(outcomes, {1: SYNC_FORBIDDEN, 2: SYNC_FAILED, 3: SYNC_FAILED})
+        self.assertEqual(self.db.hashes, {})
+
+    async def test_syncs_everything_without_hashes(self):
+        digest = tree_hash(self.tree, discord.Object(1))
+        self.db = FakeDb({1: digest}, fail_load=True)
+        syncer = CommandSyncer(self.tree, self.db)
+        outcomes = await syncer.sync_guilds([1, 2])
+        self.assertEqual(outcomes, {1: SYNC_SYNCED, 2: SYNC_SYNCED})
+
+
+if __name__ == "__main__":
+    unittest.main()
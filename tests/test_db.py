@@ -0,0 +1,36 @@
+import unittest
+
+from tests.stubs import stub_mariadb
+
+stub_mariadb()
+# pylint: disable-next=wrong-import-position
+from app.db.base import group_entries, select_entries
+
+
+def row(uid, flag):
+    return (uid, "pool", f"p{uid}", 1, "S", flag, 1, 0, "")
+
+
+class TestGroupEntries(unittest.TestCase):
+    def test_one_row_per_flag(self):
+        rows = [row(1, None), row(2, "a"), row(2, "b"), row(3, "c"), row(4, None)]
+        entries = list(group_entries(iter(rows)))
+        self.assertEqual([e.uid for e in entries], [1, 2, 3, 4])
+        self.assertEqual([e.flags for e in entries], [(), ("a", "b"), ("c",), ()])
+        self.assertEqual(entries[1].prompt, "p2")
+        self.assertTrue(entries[1].approved)
+
+    def test_no_rows(self):
+        self.assertEqual(list(group_entries([])), [])
+
+
+class TestSelectEntries(unittest.TestCase):
+    def test_page_applies_to_prompts(self):
+        query = select_entries("pool = ?", "LIMIT ?")
+        self.assertIn("FROM dataset WHERE pool = ? ORDER BY id LIMIT ?) d", query)
+        self.assertTrue(query.endswith("ORDER BY d.id, f.position"))
+
+    def test_rank(self):
+        query = select_entries("x = ?", rank="MATCH (prompt) AGAINST (?)")
+        self.assertLess(query.index("AGAINST (?) AS entry_rank"), query.index("x = ?"))
+        self.assertTrue(query.endswith("ORDER BY d.entry_rank DESC, d.id, f.position"))
@@ -1,7 +1,8 @@
+import io
 import json
 import unittest
 
-from app.app_types import DatasetEntry
+from app.app_types import DatasetEntry, split_flags
 from app.dataset_encoder import JsonEncoder, TableEncoder
 
 
@@ -28,10 +29,37 @@ class TestTableEncoder(unittest.TestCase):
         header = enc.get_header_pretty()
         self.assertTrue(header in sample)
 
-        entry = DatasetEntry(1, "test", "test", 1, "S", "test")
+        entry = DatasetEntry(1, "test", "test", 1, "S", ("test",))
         row = enc.encode(entry)
         self.assertTrue(row in sample)
 
+    def test_write_table(self):
+        enc = TableEncoder()
+        sink = io.BytesIO()
+        entries = iter([
+            DatasetEntry(1, "test", "tést", 1, "S", ("test",)),
+            DatasetEntry(2, "test", "test2", 2, "E", ()),
+        ])
+        count = enc.write_table(entries, sink)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sink.getvalue().decode("utf-8"),
+            enc.get_header_pretty()
+            + "| 1 | test | tést | 1 | S | test |\n"
+            + "| 2 | test | test2 | 2 | E |  |\n"
+        )
+
+    def test_write_table_with_reason(self):
+        enc = TableEncoder()
+        sink = io.BytesIO()
+        entry = DatasetEntry(1, "test", "test", 1, "S", (), False, True, "duplicate")
+        enc.write_table([entry], sink, include_reason=True)
+        self.assertEqual(
+            sink.getvalue().decode("utf-8"),
+            "| UID | Pool | Prompt | Weight | Sensitivity | Flags | Rejection Reason |\n"
+            + "| 1 | test | test | 1 | S |  | duplicate |\n"
+        )
+
 class TestJsonEncoder(unittest.TestCase):
     def test_sample_entry_full_singleflag(self):
         sample = """{
@@ -43,7 +71,7 @@ class TestJsonEncoder(unittest.TestCase):
     ]
 }"""
         enc = JsonEncoder()
-        entry = DatasetEntry(1, "test", "test", 2, "E", "flag")
+        entry = DatasetEntry(1, "test", "test", 2, "E", split_flags("flag"))
         output = json.dumps(enc.encode(entry), indent=4)
         self.assertEqual(sample, output)
 
@@ -58,7 +86,7 @@ class TestJsonEncoder(unittest.TestCase):
     ]
 }"""
         enc = JsonEncoder()
-        entry = DatasetEntry(1, "test", "test", 2, "E", "flag1,flag2")
+        entry = DatasetEntry(1, "test", "test", 2, "E", split_flags("flag1,flag2"))
         output = json.dumps(enc.encode(entry), indent=4)
         self.assertEqual(sample, output)
 
@@ -73,7 +101,7 @@ class TestJsonEncoder(unittest.TestCase):
     ]
 }"""
         enc = JsonEncoder()
-        entry = DatasetEntry(1, "test", "test", 2, "E", "flag1, flag2")
+        entry = DatasetEntry(1, "test", "test", 2, "E", split_flags("flag1, flag2"))
         output = json.dumps(enc.encode(entry), indent=4)
         self.assertEqual(sample, output)
 
@@ -82,7 +110,7 @@ class TestJsonEncoder(unittest.TestCase):
     "text": "test2"
 }"""
         enc = JsonEncoder()
-        entry = DatasetEntry(1, "test", "test2", 1, "S", "")
+        entry = DatasetEntry(1, "test", "test2", 1, "S", ())
         output = json.dumps(enc.encode(entry), indent=4)
         self.assertEqual(sample, output)
 
@@ -95,6 +123,81 @@ class TestJsonEncoder(unittest.TestCase):
     ]
 }"""
         enc = JsonEncoder()
-        entry = DatasetEntry(1, "test", "test2", 1, "S", "A,\"extras\" / poly")
+        entry = DatasetEntry(1, "test", "test2", 1, "S", split_flags("A,\"extras\" / poly"))
         output = json.dumps(enc.encode(entry), indent=4)
         self.assertEqual(sample, output)
+
+    def test_write_pool_matches_json_dumps(self):
+        entries = [
+            DatasetEntry(1, "test", "plain", 1, "S", ()),
+            DatasetEntry(2, "test", "q\"uote \\ / tést 日本 \x01\x7f\n", 3, "Q", ("a b", "ü")),
+            DatasetEntry(3, "test", "test", 2, "E", ("flag",)),
+        ]
+        enc = JsonEncoder()
+        for count in range(len(entries) + 1):
+            for chunk_size in (1, 2, 1000):
+                sink = io.BytesIO()
+                written = enc.write_pool(iter(entries[:count]), sink, chunk_size)
+                expected = json.dumps(
+                    {"entries": [enc.encode(entry) for entry in entries[:count]]},
+                    indent=2
+                ).encode("utf-8")
+                self.assertEqual(written, count)
+                self.assertEqual(sink.getvalue(), expected, (count, chunk_size))
+
+    def test_decode_round_trip(self):
+        entries = [
+            DatasetEntry(0, "pool", "plain", 1, "S", ()),
+            DatasetEntry(0, "pool", "q\"uote \\ / tést 日本 \x01\n", 3, "Q", ("a b", "ü")),
+            DatasetEntry(0, "pool", "12345", 2, "E", ("flag",)),
+        ]
+        enc = JsonEncoder()
+        sink = io.BytesIO()
+        enc.write_pool(entries, sink)
+        text = sink.getvalue().decode("utf-8")
+        self.assertEqual(enc.decode(text, pool="pool"), entries)
+        # Values cut off between reads are completed by the next read.
+        for read_size in (1, 2, 7):
+            decoded = list(enc.iter_decode(io.StringIO(text), "pool", read_size))
+            self.assertEqual(decoded, entries, read_size)
+
+    def test_decode_normalizes_entries(self):
+        enc = JsonEncoder()
+        text = """{
+  "name": "test",
+  "entries": [
+    {"text": "a", "flags": [" x ", "", "x", "y,z"]},
+    {"text": "b", "flags": []}
+  ],
+  "extra": [1, {"text": "skipped"}]
+}"""
+        self.assertEqual(
+            enc.decode(text, pool="test"),
+            [
+                DatasetEntry(0, "test", "a", 1, "S", ("x", "y", "z")),
+                DatasetEntry(0, "test", "b", 1, "S", ()),
+            ]
+        )
+        self.assertEqual(enc.decode('{"entries": []}'), [])
+        self.assertEqual(enc.decode("{}"), [])
+
+    def test_decode_invalid(self):
+        enc = JsonEncoder()
+        with self.assertRaises(TypeError):
+            enc.decode("{}", "random_type")
+        invalid = [
+            "",
+            "[]",
+            '{"entries": [{"text": "a"},]}',
+            '{"entries": [{"text": "a"}] "name": "b"}',
+            '{"entries": [{"text": "a"}]} {}',
+            '{"entries": [{"text": "a"}',
+            '{"entries": ["a"]}',
+            '{"entries": [{"text": "a", "weight": "2"}]}',
+            '{"entries": [{"text": "a", "weight": true}]}',
+            '{"entries": [{"text": "a", "sensitivity": "X"}]}',
+            '{"entries": [{"text": "a", "flags": "x"}]}',
+        ]
+        for text in invalid:
+            with self.assertRaises(ValueError, msg=text):
+                enc.decode(text)
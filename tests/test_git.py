@@ -0,0 +1,172 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pygit2
+
+from app.git import DATASET_BRANCH, GitWrapper, dataset_path
+
+SIGNATURE = pygit2.Signature("test", "test@example.com")
+
+
+class BareRemote:
+    """Local bare repo standing in for the fork on Github."""
+    def __init__(self, path: Path):
+        self.repo = pygit2.init_repository(str(path), bare=True, initial_head="main")
+        self.url = str(path)
+
+    def commit_files(self, files: dict, message: str = "update") -> pygit2.Oid:
+        """Commit `{path: bytes}` on top of main (only supports `dir/dir/file` depth)."""
+        parents = []
+        trees = {}
+        if "refs/heads/main" in self.repo.references:
+            head = self.repo.references["refs/heads/main"].target
+            parents = [head]
+            for path, data in self._flatten(self.repo[head].tree).items():
+                trees[path] = data
+        trees.update(files)
+        return self.repo.create_commit(
+            "refs/heads/main", SIGNATURE, SIGNATURE, message, self._build(trees), parents
+        )
+
+    def _flatten(self, tree: pygit2.Tree, prefix: str = "") -> dict:
+        files = {}
+        for entry in tree:
+            if entry.type_str == "tree":
+                files.update(self._flatten(self.repo[entry.id], f"{prefix}{entry.name}/"))
+            else:
+                files[f"{prefix}{entry.name}"] = self.repo[entry.id].data
+        return files
+
+    def _build(self, files: dict) -> pygit2.Oid:
+        children = {}
+        builder = self.repo.TreeBuilder()
+        for path, data in files.items():
+            head, _, rest = path.partition("/")
+            if rest:
+                children.setdefault(head, {})[rest] = data
+            else:
+                builder.insert(head, self.repo.create_blob(data), pygit2.GIT_FILEMODE_BLOB)
+        for name, subfiles in children.items():
+            builder.insert(name, self._build(subfiles), pygit2.GIT_FILEMODE_TREE)
+        return builder.write()
+
+
+class GitTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        self.remote = BareRemote(tmp / "fork.git")
+        self.remote.commit_files({
+            dataset_path("pool1"): b'{"entries": []}',
+            "README.md": b"readme",
+        }, "initial")
+        self.local_path = tmp / "local"
+        self.git = GitWrapper(
+            "user", "token", "upstream/repo", "user/repo", str(self.local_path),
+            remote_url=self.remote.url, depth=0
+        )
+
+
+class TestPersistentRepo(GitTestCase):
+    def test_clones_when_missing(self):
+        repo = self.git.prepare_repo()
+        self.assertEqual(repo.head.shorthand, "main")
+        self.assertTrue((self.local_path / "README.md").exists())
+
+    def test_fast_forwards_and_resets(self):
+        repo = self.git.prepare_repo()
+        # Leave the repo like a previous sync would: on the dataset branch, dirty.
+        repo.branches.local.create(DATASET_BRANCH, repo[repo.head.target])
+        repo.checkout(repo.branches.local[DATASET_BRANCH])
+        (self.local_path / "README.md").write_text("dirty", encoding="utf-8")
+        (self.local_path / "untracked.txt").write_text("junk", encoding="utf-8")
+        new_head = self.remote.commit_files({dataset_path("pool2"): b"{}"}, "add pool2")
+        marker = self.local_path / ".git" / "marker"
+        marker.write_text("kept", encoding="utf-8")
+
+        repo = self.git.prepare_repo()
+        self.assertEqual(repo.head.shorthand, "main")
+        self.assertEqual(repo.head.target, new_head)
+        self.assertEqual((self.local_path / "README.md").read_text(encoding="utf-8"), "readme")
+        self.assertFalse((self.local_path / "untracked.txt").exists())
+        self.assertTrue((self.local_path / dataset_path("pool2")).exists())
+        # Not recloned.
+        self.assertTrue(marker.exists())
+
+    def test_reclones_corrupt_repo(self):
+        self.git.prepare_repo()
+        (self.local_path / ".git" / "HEAD").unlink()
+        repo = self.git.prepare_repo()
+        self.assertEqual(repo.head.shorthand, "main")
+
+    def test_blob_oid(self):
+        repo = self.git.prepare_repo()
+        self.assertEqual(
+            self.git.get_blob_oid(repo, dataset_path("pool1")),
+            str(pygit2.hash(b'{"entries": []}'))
+        )
+        self.assertIsNone(self.git.get_blob_oid(repo, dataset_path("missing")))
+
+    def test_non_persistent_reclones(self):
+        self.git.persistent = False
+        self.git.prepare_repo()
+        marker = self.local_path / ".git" / "marker"
+        marker.write_text("gone", encoding="utf-8")
+        self.git.prepare_repo()
+        self.assertFalse(marker.exists())
+
+
+class TestCommitFiles(GitTestCase):
+    def test_commit_without_touching_worktree(self):
+        repo = self.git.prepare_repo()
+        head = repo.head.target
+        pool1_blob = repo.head.peel(pygit2.Tree)[dataset_path("pool1")].id
+        commit = self.git.commit_files(repo, {dataset_path("new pool"): b'{"entries": [1]}'})
+
+        self.assertIsNotNone(commit)
+        # HEAD, index and working tree are untouched.
+        self.assertEqual(repo.head.target, head)
+        self.assertEqual(repo.status(), {})
+        self.assertFalse((self.local_path / dataset_path("new pool")).exists())
+        # The dataset branch holds the new file on top of HEAD.
+        branch = repo.branches.local[DATASET_BRANCH]
+        self.assertEqual(branch.target, commit)
+        tree = repo[commit].tree
+        self.assertEqual(repo[commit].parents[0].id, head)
+        self.assertEqual(repo[tree[dataset_path("new pool")].id].data, b'{"entries": [1]}')
+        # Unchanged files reuse their blobs.
+        self.assertEqual(tree[dataset_path("pool1")].id, pool1_blob)
+        self.assertEqual(repo[tree["README.md"].id].data, b"readme")
+
+    def test_new_directory(self):
+        repo = self.git.prepare_repo()
+        commit = self.git.commit_files(repo, {"a/b/c.json": b"{}"})
+        self.assertEqual(repo[repo[commit].tree["a/b/c.json"].id].data, b"{}")
+
+    def test_removed_files(self):
+        repo = self.git.prepare_repo()
+        commit = self.git.commit_files(repo, {
+            dataset_path("pool1"): None,
+            dataset_path("missing"): None,
+        })
+        tree = repo[commit].tree
+        self.assertNotIn("app", tree)
+        self.assertEqual(repo[tree["README.md"].id].data, b"readme")
+        self.assertIsNone(self.git.commit_files(repo, {dataset_path("missing"): None}))
+
+    def test_unchanged_files(self):
+        repo = self.git.prepare_repo()
+        self.assertIsNone(self.git.commit_files(repo, {dataset_path("pool1"): b'{"entries": []}'}))
+
+    def test_commit_is_pushable(self):
+        repo = self.git.prepare_repo()
+        commit = self.git.commit_files(repo, {dataset_path("pool1"): b"{}"})
+        self.git.push_to_remote(repo)
+        self.assertEqual(self.remote.repo.references[f"refs/heads/{DATASET_BRANCH}"].target, commit)
+
+
+class TestDatasetPath(unittest.TestCase):
+    def test_spaces(self):
+        self.assertEqual(dataset_path("my pool"), "app/datasets/my_pool.json")
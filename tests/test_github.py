@@ -0,0 +1,140 @@
+import unittest
+
+from aiohttp import web
+
+from app.git import DATASET_BRANCH, GitWrapper
+from app.github import GithubClient, GithubError
+
+
+class FakeGithub:
+    """Local stand-in for the parts of the Github REST API the bot uses."""
+    def __init__(self):
+        self.pulls = []
+        self.requests = []
+        # Responses to send before behaving normally, per "METHOD path".
+        self.failures = {}
+        self.app = web.Application()
+        self.app.router.add_post("/repos/{owner}/{repo}/merge-upstream", self.merge_upstream)
+        self.app.router.add_get("/repos/{owner}/{repo}/pulls", self.list_pulls)
+        self.app.router.add_post("/repos/{owner}/{repo}/pulls", self.create_pull)
+        self.app.router.add_patch("/repos/{owner}/{repo}/pulls/{number}", self.update_pull)
+        self.runner = web.AppRunner(self.app)
+        self.url = None
+
+    async def start(self):
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1] # pylint: disable=protected-access
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def _failure(self, request):
+        self.requests.append((request.method, request.path, request.headers.get("Authorization")))
+        queued = self.failures.get(f"{request.method} {request.path}")
+        if queued:
+            return queued.pop(0)
+        return None
+
+    async def merge_upstream(self, request):
+        return self._failure(request) or web.json_response({"message": "Successfully fetched"})
+
+    async def list_pulls(self, request):
+        failure = self._failure(request)
+        if failure:
+            return failure
+        head = request.query.get("head")
+        return web.json_response(
+            [p for p in self.pulls if p["head"] == head and p["state"] == "open"]
+        )
+
+    async def create_pull(self, request):
+        failure = self._failure(request)
+        if failure:
+            return failure
+        data = await request.json()
+        if any(p["head"] == data["head"] and p["state"] == "open" for p in self.pulls):
+            return web.json_response({"message": "A pull request already exists"}, status=422)
+        number = len(self.pulls) + 1
+        pull = dict(data, number=number, state="open", html_url=f"https://github/pull/{number}")
+        self.pulls.append(pull)
+        return web.json_response(pull, status=201)
+
+    async def update_pull(self, request):
+        failure = self._failure(request)
+        if failure:
+            return failure
+        pull = self.pulls[int(request.match_info["number"]) - 1]
+        pull.update(await request.json())
+        return web.json_response(pull)
+
+
+class GithubTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeGithub()
+        await self.server.start()
+        self.client = GithubClient("token", api_url=self.server.url, max_retries=2, backoff_base=0)
+        self.git = GitWrapper(
+            "user", "token", "upstream/repo", "user/repo", "/nonexistent", github=self.client
+        )
+
+    async def asyncTearDown(self):
+        await self.git.close()
+        await self.server.stop()
+
+
+class TestGithubClient(GithubTestCase):
+    async def test_retries_server_errors(self):
+        self.server.failures["POST /repos/user/repo/merge-upstream"] = [
+            web.Response(status=502, text="<html>bad gateway</html>"),
+            web.json_response({"message": "oops"}, status=500),
+        ]
+        self.assertEqual(await self.git.sync_forked_repo_with_upstream(), "Successfully fetched")
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertTrue(all(auth == "Bearer token" for _, _, auth in self.server.requests))
+
+    async def test_honours_secondary_rate_limit(self):
+        self.server.failures["POST /repos/user/repo/merge-upstream"] = [
+            web.json_response(
+                {"message": "You have exceeded a secondary rate limit."},
+                status=403,
+                headers={"Retry-After": "0"}
+            ),
+        ]
+        self.assertEqual(await self.git.sync_forked_repo_with_upstream(), "Successfully fetched")
+        self.assertEqual(len(self.server.requests), 2)
+
+    async def test_gives_up_after_max_retries(self):
+        self.server.failures["POST /repos/user/repo/merge-upstream"] = [
+            web.Response(status=503) for _ in range(3)
+        ]
+        with self.assertRaises(GithubError):
+            await self.client.request("POST", "/repos/user/repo/merge-upstream")
+
+    async def test_client_errors_are_not_retried(self):
+        self.server.failures["POST /repos/user/repo/merge-upstream"] = [
+            web.json_response({"message": "conflict"}, status=409),
+        ]
+        result = await self.git.sync_forked_repo_with_upstream()
+        self.assertIsInstance(result, RuntimeError)
+        self.assertEqual(len(self.server.requests), 1)
+
+
+class TestPullRequests(GithubTestCase):
+    async def test_creates_then_updates_existing_pull_request(self):
+        first = await self.git.make_pull_request()
+        second = await self.git.make_pull_request()
+        self.assertEqual(first, "https://github/pull/1")
+        self.assertEqual(second, first)
+        self.assertEqual(len(self.server.pulls), 1)
+        self.assertEqual(self.server.pulls[0]["head"], f"user:{DATASET_BRANCH}")
+        methods = [method for method, _, _ in self.server.requests]
+        self.assertEqual(methods, ["GET", "POST", "GET", "PATCH"])
+
+    async def test_reuses_one_session(self):
+        await self.git.make_pull_request()
+        session = self.client._session # pylint: disable=protected-access
+        await self.git.make_pull_request()
+        self.assertIs(self.client._session, session) # pylint: disable=protected-access
@@ -0,0 +1,30 @@
+import unittest
+
+from app.id_list import format_id_list, parse_id_list
+
+
+class TestParseIdList(unittest.TestCase):
+    def test_ids_and_ranges(self):
+        self.assertEqual(parse_id_list("12, 15-17 #20"), [12, 15, 16, 17, 20])
+        self.assertEqual(parse_id_list("#3 - #5"), [3, 4, 5])
+
+    def test_duplicates_keep_first_occurrence(self):
+        self.assertEqual(parse_id_list("5, 1-3, 2, 5"), [5, 1, 2, 3])
+
+    def test_invalid_input(self):
+        for text in ("", "abc", "5-3", "1,,x", "-4"):
+            with self.assertRaises(ValueError, msg=text):
+                parse_id_list(text)
+
+    def test_too_many_ids(self):
+        self.assertEqual(len(parse_id_list("1-10", max_ids=10)), 10)
+        with self.assertRaises(ValueError):
+            parse_id_list("1-11", max_ids=10)
+        with self.assertRaises(ValueError):
+            parse_id_list("1-10, 20", max_ids=10)
+
+
+class TestFormatIdList(unittest.TestCase):
+    def test_collapses_ranges(self):
+        self.assertEqual(format_id_list([7, 1, 2, 3, 9, 10]), "#1-#3, #7, #9-#10")
+        self.assertEqual(format_id_list([4]), "#4")
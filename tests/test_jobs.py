@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import unittest
+
+from app.jobs import SingleFlightJob
+from app.metrics import JOB_STAGE_SECONDS
+
+
+class TestSingleFlightJob(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.job = SingleFlightJob("test-job")
+
+    async def asyncTearDown(self):
+        self.job.shutdown()
+
+    async def test_concurrent_callers_share_one_run(self):
+        runs = 0
+        release = asyncio.Event()
+
+        async def work(job):
+            nonlocal runs
+            runs += 1
+            await job.report("first")
+            await release.wait()
+            await job.report("second")
+            return "result"
+
+        seen_a, seen_b = [], []
+
+        async def progress_a(stage):
+            seen_a.append(stage)
+
+        async def progress_b(stage):
+            seen_b.append(stage)
+
+        first = asyncio.create_task(self.job.run(work, progress_a))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.assertTrue(self.job.running)
+        second = asyncio.create_task(self.job.run(work, progress_b))
+        await asyncio.sleep(0)
+        release.set()
+
+        self.assertEqual(await asyncio.gather(first, second), ["result", "result"])
+        self.assertEqual(runs, 1)
+        self.assertEqual(seen_a, ["first", "second"])
+        # The late joiner catches up on the current stage.
+        self.assertEqual(seen_b, ["first", "second"])
+        self.assertFalse(self.job.running)
+
+    async def test_blocking_work_runs_off_loop(self):
+        async def work(job):
+            return await job.run_blocking(lambda: threading.current_thread().name)
+
+        async def progress(_stage):
+            pass
+
+        thread_name = await self.job.run(work, progress)
+        self.assertTrue(thread_name.startswith("test-job"))
+
+    async def test_errors_reach_every_caller_and_next_run_starts_fresh(self):
+        async def failing(_job):
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        async def progress(_stage):
+            raise RuntimeError("progress errors are ignored")
+
+        results = await asyncio.gather(
+            self.job.run(failing, progress),
+            self.job.run(failing, progress),
+            return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+        async def working(job):
+            await job.report("stage")
+            return 1
+
+        self.assertEqual(await self.job.run(working, progress), 1)
+
+    async def test_stage_durations_are_recorded(self):
+        async def work(job):
+            await job.report("sleep")
+            await asyncio.sleep(0.01)
+            await job.report("fail")
+            raise RuntimeError("the last stage is closed anyway")
+
+        async def progress(_stage):
+            pass
+
+        # Metrics are process-wide: a job name of its own keeps other tests out.
+        job = SingleFlightJob("timed-job")
+        try:
+            with self.assertRaises(RuntimeError):
+                await job.run(work, progress)
+        finally:
+            job.shutdown()
+        stages = JOB_STAGE_SECONDS.series()
+        self.assertGreaterEqual(stages[("timed-job", "sleep")].sum, 0.01)
+        self.assertEqual(stages[("timed-job", "fail")].count, 1)
@@ -0,0 +1,84 @@
+import math
+import unittest
+
+import aiohttp
+
+from app.metrics import CONTENT_TYPE, HistogramSeries, MetricsRegistry, MetricsServer
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_render_counter(self):
+        counter = self.registry.counter("rows_total", "Rows.", ("method",))
+        counter.inc(3, method="show_pool")
+        counter.inc(method="show_pool")
+        counter.inc(method='say "hi"\n')
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP rows_total Rows.\n"
+            "# TYPE rows_total counter\n"
+            "rows_total{method=\"say \\\"hi\\\"\\n\"} 1\n"
+            "rows_total{method=\"show_pool\"} 4\n"
+        )
+
+    def test_render_histogram(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency.", ("command",), (0.1, 1))
+        histogram.observe(0.05, command="a")
+        histogram.observe(0.1, command="a")
+        histogram.observe(2.5, command="a")
+        self.assertEqual(
+            self.registry.render(),
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            "latency_seconds_bucket{command=\"a\",le=\"0.1\"} 2\n"
+            "latency_seconds_bucket{command=\"a\",le=\"1\"} 2\n"
+            "latency_seconds_bucket{command=\"a\",le=\"+Inf\"} 3\n"
+            "latency_seconds_sum{command=\"a\"} 2.65\n"
+            "latency_seconds_count{command=\"a\"} 3\n"
+        )
+
+    def test_time_observes_failures(self):
+        histogram = self.registry.histogram("job_seconds", "Jobs.")
+        with self.assertRaises(RuntimeError):
+            with histogram.time():
+                raise RuntimeError("boom")
+        self.assertEqual(histogram.series()[()].count, 1)
+
+    def test_invalid_labels_and_names(self):
+        counter = self.registry.counter("calls_total", "Calls.", ("method",))
+        with self.assertRaises(ValueError):
+            counter.inc(command="a")
+        with self.assertRaises(ValueError):
+            self.registry.histogram("calls_total", "Again.")
+
+
+class TestHistogramSeries(unittest.TestCase):
+    def test_quantile(self):
+        series = HistogramSeries((1.0, 2.0, 4.0))
+        self.assertTrue(math.isnan(series.quantile(0.5)))
+        for value in (0.5, 1.5, 1.5, 3.0):
+            series.observe(value)
+        self.assertEqual(series.quantile(0.25), 1.0)
+        self.assertEqual(series.quantile(0.5), 1.5)
+        self.assertEqual(series.quantile(1.0), 4.0)
+        series.observe(100.0)
+        self.assertEqual(series.quantile(1.0), 4.0)
+        self.assertEqual(series.summary(), "5 calls, avg 21.30s, p50 1.75s, p99 4.00s")
+
+
+class TestMetricsServer(unittest.IsolatedAsyncioTestCase):
+    async def test_serves_metrics(self):
+        registry = MetricsRegistry()
+        registry.counter("up_total", "Up.").inc()
+        server = MetricsServer(registry, port=0)
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{server.port}/metrics") as resp:
+                    self.assertEqual(resp.status, 200)
+                    self.assertEqual(resp.headers["Content-Type"], CONTENT_TYPE)
+                    self.assertIn("up_total 1\n", await resp.text())
+        finally:
+            await server.stop()
@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.migrate import MIGRATIONS_DIR, load_migrations, split_statements
+
+
+class TestSplitStatements(unittest.TestCase):
+    def test_comments_and_blank_lines(self):
+        sql = """
+-- A comment
+CREATE TABLE a (
+  id INT
+);
+
+-- Another comment
+ALTER TABLE a
+  ADD INDEX IF NOT EXISTS idx_a (id);
+"""
+        self.assertEqual(
+            split_statements(sql),
+            [
+                "CREATE TABLE a (\n  id INT\n)",
+                "ALTER TABLE a\n  ADD INDEX IF NOT EXISTS idx_a (id)",
+            ]
+        )
+
+    def test_compound_statement(self):
+        sql = """
+BEGIN NOT ATOMIC
+  IF 1 THEN
+    SIGNAL SQLSTATE '45000';
+  END IF;
+END;
+ALTER TABLE a DROP COLUMN b;
+"""
+        self.assertEqual(
+            split_statements(sql),
+            [
+                "BEGIN NOT ATOMIC\n  IF 1 THEN\n    SIGNAL SQLSTATE '45000';\n  END IF;\nEND",
+                "ALTER TABLE a DROP COLUMN b",
+            ]
+        )
+
+    def test_missing_trailing_semicolon(self):
+        self.assertEqual(split_statements("SELECT 1"), ["SELECT 1"])
+
+
+class TestLoadMigrations(unittest.TestCase):
+    def test_bundled_migrations_are_sequential(self):
+        migrations = load_migrations(MIGRATIONS_DIR)
+        versions = [m.version for m in migrations]
+        self.assertEqual(versions, list(range(1, len(versions) + 1)))
+        for migration in migrations:
+            self.assertTrue(migration.statements())
+
+    def test_ignores_other_files_and_sorts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            (directory / "0002_second.sql").write_text("SELECT 2;", encoding="utf-8")
+            (directory / "0001_first.sql").write_text("SELECT 1;", encoding="utf-8")
+            (directory / "README.md").write_text("notes", encoding="utf-8")
+            migrations = load_migrations(directory)
+        self.assertEqual([(m.version, m.name) for m in migrations], [(1, "first"), (2, "second")])
+
+    def test_duplicate_versions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            (directory / "0001_a.sql").write_text("SELECT 1;", encoding="utf-8")
+            (directory / "0001_b.sql").write_text("SELECT 1;", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                load_migrations(directory)
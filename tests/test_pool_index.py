@@ -0,0 +1,23 @@
+import unittest
+
+from app.pool_index import PoolIndex
+
+
+class TestPoolIndex(unittest.TestCase):
+    def test_prefix_lookup(self):
+        index = PoolIndex(["Chess", "cats", "dogs", "Cards", "cats"])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.complete("c"), ["Cards", "cats", "Chess"])
+        self.assertEqual(index.complete("CA"), ["Cards", "cats"])
+        self.assertEqual(index.complete(""), ["Cards", "cats", "Chess", "dogs"])
+        self.assertEqual(index.complete("x"), [])
+
+    def test_limit(self):
+        index = PoolIndex(f"pool{i:02d}" for i in range(40))
+        self.assertEqual(index.complete("pool", limit=3), ["pool00", "pool01", "pool02"])
+        self.assertEqual(len(index.complete("pool")), 25)
+
+    def test_refresh_replaces_pools(self):
+        index = PoolIndex(["a", "b"])
+        index.refresh(["c"])
+        self.assertEqual(index.complete(""), ["c"])
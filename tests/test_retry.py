@@ -0,0 +1,38 @@
+import unittest
+
+from app.retry import MAX_BACKOFF, RetryPolicy
+
+
+class TestRetryPolicy(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_until_success(self):
+        errors = [ValueError("a"), ValueError("b")]
+
+        async def fn():
+            if errors:
+                raise errors.pop(0)
+            return "ok"
+
+        policy = RetryPolicy(max_retries=2)
+        self.assertEqual(await policy.call(fn, lambda e, attempt: 0, "test"), "ok")
+
+    async def test_gives_up(self):
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            raise ValueError("down")
+
+        with self.assertRaises(ValueError):
+            await RetryPolicy(max_retries=2).call(fn, lambda e, attempt: 0, "test")
+        self.assertEqual(len(calls), 3)
+
+        calls.clear()
+        with self.assertRaises(ValueError):
+            await RetryPolicy(max_retries=2).call(fn, lambda e, attempt: None, "test")
+        self.assertEqual(len(calls), 1)
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(backoff_base=1.0)
+        self.assertGreaterEqual(policy.backoff(1), 2.0)
+        self.assertLessEqual(policy.backoff(1), 3.0)
+        self.assertEqual(policy.backoff(20), MAX_BACKOFF)
@@ -0,0 +1,88 @@
+import random
+import unittest
+from collections import Counter
+from unittest import mock
+
+from app import sampling
+from app.app_types import DatasetEntry
+from app.sampling import AliasTable, PoolSampler, sensitivities_up_to
+
+
+def make_entries():
+    return [
+        DatasetEntry(1, "pool", "a", 1, "S", ()),
+        DatasetEntry(2, "pool", "b", 2, "S", ()),
+        DatasetEntry(3, "pool", "c", 3, "Q", ()),
+        DatasetEntry(4, "pool", "d", 4, "E", ()),
+        DatasetEntry(5, "pool", "never", 0, "S", ()),
+    ]
+
+
+class TestAliasTable(unittest.TestCase):
+    def test_draws_follow_weights(self):
+        table = AliasTable([1, 2, 3, 4])
+        rng = random.Random(1)
+        counts = Counter(table.draw(rng) for _ in range(100000))
+        for index, weight in enumerate([1, 2, 3, 4]):
+            self.assertAlmostEqual(counts[index] / 100000, weight / 10, delta=0.01)
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            AliasTable([])
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+
+
+class TestPoolSampler(unittest.TestCase):
+    def setUp(self):
+        self.sampler = PoolSampler(make_entries())
+
+    def test_sensitivities_up_to(self):
+        self.assertEqual(sensitivities_up_to("S"), ("S",))
+        self.assertEqual(sensitivities_up_to("Q"), ("S", "Q"))
+        self.assertEqual(sensitivities_up_to("E"), ("S", "Q", "E"))
+
+    def test_draw_distinct_prompts(self):
+        self.assertEqual(len(self.sampler), 4)
+        rng = random.Random(2)
+        for _ in range(100):
+            card = self.sampler.draw(3, rng=rng)
+            self.assertEqual(len({entry.uid for entry in card}), 3)
+        # A card cannot hold more prompts than the pool, nor weightless ones.
+        self.assertEqual(sorted(e.uid for e in self.sampler.draw(10, rng=rng)), [1, 2, 3, 4])
+
+    def test_draw_filters_sensitivities(self):
+        card = self.sampler.draw(10, ("S",), random.Random(3))
+        self.assertEqual(sorted(e.uid for e in card), [1, 2])
+        self.assertEqual(self.sampler.draw(10, ("X",)), [])
+        self.assertEqual(PoolSampler([]).draw(10), [])
+
+    def test_draw_falls_back_when_redraws_run_out(self):
+        entries = [DatasetEntry(1, "pool", "heavy", 10**6, "S", ())] + [
+            DatasetEntry(uid, "pool", "light", 1, "S", ()) for uid in range(2, 10)
+        ]
+        card = PoolSampler(entries).draw(5, rng=random.Random(4))
+        self.assertEqual(len({entry.uid for entry in card}), 5)
+        self.assertEqual(card[0].uid, 1)
+
+    def test_first_prompt_follows_weights(self):
+        rng = random.Random(5)
+        counts = Counter(self.sampler.draw(2, rng=rng)[0].uid for _ in range(50000))
+        for uid, weight in [(1, 1), (2, 2), (3, 3), (4, 4)]:
+            self.assertAlmostEqual(counts[uid] / 50000, weight / 10, delta=0.01)
+
+    def test_simulate(self):
+        # With 2 prompts out of S (1) and Q (3) + S (2), inclusion rates are known:
+        # P(a) = 1/6 + 2/6 * 1/4 + 3/6 * 1/3 = 5/12
+        results = [self.sampler.simulate(20000, 2, ("S", "Q"), seed=6)]
+        with mock.patch.object(sampling, "np", None):
+            results.append(self.sampler.simulate(20000, 2, ("S", "Q"), seed=6))
+        for counts in results:
+            self.assertEqual([entry.uid for entry, _count in counts], [1, 2, 3])
+            self.assertEqual(sum(count for _entry, count in counts), 40000)
+            self.assertAlmostEqual(counts[0][1] / 20000, 5 / 12, delta=0.02)
+        self.assertEqual(self.sampler.simulate(10, 2, ("X",)), [])
+
+    def test_simulate_whole_pool(self):
+        counts = self.sampler.simulate(100, 10, seed=7)
+        self.assertEqual([count for _entry, count in counts], [100] * 4)
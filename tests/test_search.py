@@ -0,0 +1,18 @@
+import unittest
+
+from app.search import MAX_TERMS, fulltext_query
+
+
+class TestFulltextQuery(unittest.TestCase):
+    def test_words_become_required_prefixes(self):
+        self.assertEqual(fulltext_query("Hold hands"), "+hold* +hands*")
+
+    def test_operators_and_short_words_are_dropped(self):
+        self.assertEqual(fulltext_query('-kiss +"in the" rain*'), "+kiss* +rain*")
+        self.assertEqual(fulltext_query("a to the"), None)
+        self.assertEqual(fulltext_query("!!"), None)
+
+    def test_terms_are_deduplicated_and_bounded(self):
+        self.assertEqual(fulltext_query("rain Rain rain"), "+rain*")
+        words = " ".join(f"word{i}" for i in range(20))
+        self.assertEqual(len(fulltext_query(words).split()), MAX_TERMS)
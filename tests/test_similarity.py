@@ -0,0 +1,46 @@
+import unittest
+
+from app.similarity import SimilarityIndex, normalize_prompt
+
+
+class TestNormalizePrompt(unittest.TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize_prompt("  Kiss!  "), "kiss")
+        self.assertEqual(normalize_prompt("Hold   HANDS..."), "hold hands")
+        self.assertEqual(normalize_prompt("Ｆｕｌｌ width"), "full width")
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SimilarityIndex()
+        self.index.load([
+            (1, "pool1", "Kiss"),
+            (2, "pool1", "Hold hands in the rain"),
+            (3, "pool1", "Go on a picnic"),
+            (4, "pool2", "Kiss"),
+        ])
+
+    def test_exact_after_normalization(self):
+        matches = self.index.find("pool1", "kiss!")
+        self.assertEqual([(m.uid, m.exact) for m in matches], [(1, True)])
+
+    def test_near_duplicate(self):
+        matches = self.index.find("pool1", "Holding hands in the rain")
+        self.assertEqual([(m.uid, m.exact) for m in matches], [(2, False)])
+        self.assertGreaterEqual(matches[0].similarity, self.index.threshold)
+
+    def test_unrelated_and_other_pools(self):
+        self.assertEqual(self.index.find("pool1", "Bake cookies together"), [])
+        self.assertEqual(self.index.find("pool3", "Kiss"), [])
+
+    def test_incremental_updates(self):
+        self.index.add(2, "pool1", "Bake cookies together")
+        self.assertEqual(self.index.find("pool1", "Hold hands in the rain"), [])
+        self.assertEqual([m.uid for m in self.index.find("pool1", "bake cookies")], [])
+        self.assertEqual([m.uid for m in self.index.find("pool1", "Bake cookies together!")], [2])
+        self.index.remove(1)
+        self.assertEqual(self.index.find("pool1", "Kiss"), [])
+        self.assertEqual(len(self.index), 3)
+
+    def test_exclude(self):
+        self.assertEqual(self.index.find("pool1", "Kiss", exclude=1), [])
@@ -0,0 +1,111 @@
+import types
+import unittest
+
+import discord
+from discord.ext import commands
+
+from tests.stubs import stub_mariadb
+
+stub_mariadb()
+# pylint: disable-next=wrong-import-position,wrong-import-order
+import mariadb
+
+# pylint: disable-next=wrong-import-position
+from app.slash_commands import COGS, CommandContext, make_cogs
+
+COMMAND_NAMES = {
+    "add-prompt", "modify-prompt", "delete-prompt", "approve-prompt", "reject-prompt",
+    "approve-prompts", "reject-prompts", "delete-prompts", "show-pool", "draw-card",
+    "list-pools", "pending-prompts", "rejected-prompts", "search-prompts", "list-flags",
+    "sync-dataset", "bot-stats", "help",
+}
+
+
+class FakeDb:
+    async def get_pools(self):
+        return ["pool"]
+
+    async def run(self, fn, *args):
+        return fn(self, *args)
+
+    def iter_prompt_texts(self):
+        return iter([(1, "pool", "a prompt")])
+
+    def close(self):
+        pass
+
+
+class FailingDb(FakeDb):
+    def iter_prompt_texts(self):
+        yield 1, "pool", "a prompt"
+        raise mariadb.Error("connection lost")
+
+
+class FakeGit:
+    async def close(self):
+        pass
+
+
+class FakeAutocompleteResponse:
+    def __init__(self):
+        self.choices = None
+
+    def is_done(self):
+        return self.choices is not None
+
+    async def autocomplete(self, choices):
+        self.choices = choices
+
+
+class FakeInteraction:
+    def __init__(self):
+        self.response = FakeAutocompleteResponse()
+
+
+class TestSlashCommands(unittest.IsolatedAsyncioTestCase):
+    async def test_cogs_load(self):
+        bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+        context = CommandContext(["admin"], FakeDb(), FakeGit())
+        await context.load()
+        cogs = make_cogs(context)
+        self.assertEqual([type(cog) for cog in cogs], list(COGS))
+        names = [command.name for cog in cogs for command in cog.get_app_commands()]
+        self.assertCountEqual(names, COMMAND_NAMES)
+
+        for cog in cogs:
+            await bot.add_cog(cog)
+        self.assertEqual({command.name for command in bot.tree.get_commands()}, COMMAND_NAMES)
+        self.assertEqual(context.pool_index.complete("po"), ["pool"])
+        await context.similarity_load
+        self.assertEqual(len(context.similarity), 1)
+        self.assertTrue(context.similarity.loaded)
+        await context.close()
+
+    async def test_similarity_load_failure(self):
+        context = CommandContext(["admin"], FailingDb(), FakeGit())
+        await context.load()
+        with self.assertLogs("firestorm_bot", "ERROR"):
+            await context.similarity_load
+        self.assertEqual(len(context.similarity), 1)
+        self.assertFalse(context.similarity.loaded)
+        await context.close()
+
+    async def test_pool_autocomplete_is_bound_to_each_cog(self):
+        context = CommandContext(["admin"], FakeDb(), FakeGit())
+        await context.load()
+        for cog in make_cogs(context):
+            for command in cog.get_app_commands():
+                parameter = command.get_parameter("pool")
+                if parameter is None:
+                    continue
+                interaction = FakeInteraction()
+                # pylint: disable-next=protected-access
+                await command._invoke_autocomplete(
+                    interaction, "pool", types.SimpleNamespace(pool="po")
+                )
+                choices = [choice.value for choice in interaction.response.choices]
+                self.assertEqual(choices, ["pool"], command.name)
+        await context.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+
+from app.app_types import DatasetEntry
+from app.views import (
+    EMBED_DESCRIPTION_LIMIT,
+    PaginatorView,
+    card_embed,
+    keyset_fetcher,
+    offset_fetcher,
+    page_embed,
+)
+
+
+class TestPageEmbed(unittest.TestCase):
+    def test_long_lines_fit_the_description_limit(self):
+        embed = page_embed("title", ["x" * 5000] * 10, 2)
+        self.assertLessEqual(len(embed.description), EMBED_DESCRIPTION_LIMIT)
+        self.assertEqual(len(embed.description.split("\n")), 10)
+        self.assertEqual(embed.footer.text, "Page 3")
+
+    def test_short_lines_are_kept(self):
+        embed = page_embed("title", ["a", "b"], 0)
+        self.assertEqual(embed.description, "a\nb")
+
+
+class TestCardEmbed(unittest.TestCase):
+    def test_card_lists_prompts_in_order(self):
+        card = [
+            DatasetEntry(7, "pool", "b", 2, "E", ()),
+            DatasetEntry(3, "pool", "a", 1, "S", ("x",)),
+        ]
+        embed = card_embed("pool", card)
+        self.assertEqual(embed.title, "Card: pool")
+        self.assertEqual(
+            embed.description,
+            "1. **#7** b (Weight: 2, E)\n2. **#3** a (Weight: 1, S, Flags: x)"
+        )
+        self.assertEqual(embed.footer.text, "2 prompts drawn by weight")
+
+
+class TestKeysetFetcher(unittest.TestCase):
+    def test_pages(self):
+        entries = [DatasetEntry(uid, "pool", f"p{uid}", 1, "S", ()) for uid in range(1, 6)]
+
+        async def fetch(after_uid, limit):
+            return [e for e in entries if e.uid > after_uid][:limit]
+
+        fetch_page = keyset_fetcher(fetch, page_size=2)
+        page, cursor = asyncio.run(fetch_page(0))
+        self.assertEqual(([e.uid for e in page], cursor), ([1, 2], 2))
+        page, cursor = asyncio.run(fetch_page(4))
+        self.assertEqual(([e.uid for e in page], cursor), ([5], None))
+
+
+class TestOffsetFetcher(unittest.TestCase):
+    def test_pages(self):
+        items = list("abcde")
+
+        async def fetch(offset, limit):
+            return items[offset:offset + limit]
+
+        fetch_page = offset_fetcher(fetch, page_size=2)
+        self.assertEqual(asyncio.run(fetch_page(0)), (["a", "b"], 2))
+        self.assertEqual(asyncio.run(fetch_page(4)), (["e"], None))
+
+
+class FakeButtonInteraction:
+    """Records the order of the calls a page flip makes."""
+    def __init__(self, calls):
+        self.calls = calls
+        self.response = self
+
+    async def defer(self):
+        self.calls.append("defer")
+
+    async def edit_original_response(self, **_kwargs):
+        self.calls.append("edit")
+
+
+class TestPaginatorView(unittest.IsolatedAsyncioTestCase):
+    async def test_flip_defers_before_fetching(self):
+        calls = []
+
+        async def fetch_page(cursor):
+            calls.append(f"fetch {cursor}")
+            return [cursor], cursor + 1
+
+        view = PaginatorView(fetch_page, lambda items, page: page_embed("t", [], page), 1)
+        await view.load()
+        calls.clear()
+        await view.next_page.callback(FakeButtonInteraction(calls))
+        await view.previous_page.callback(FakeButtonInteraction(calls))
+        self.assertEqual(calls, ["defer", "fetch 1", "edit", "defer", "fetch 0", "edit"])
+
+    async def test_failed_flip_keeps_the_page(self):
+        async def fetch_page(cursor):
+            if cursor > 0:
+                raise RuntimeError("DB down")
+            return ["a"], 1
+
+        view = PaginatorView(fetch_page, lambda items, page: page_embed("t", [], page), 1)
+        await view.load()
+        with self.assertRaises(RuntimeError):
+            await view.next_page.callback(FakeButtonInteraction([]))
+        self.assertEqual((view.page, view.next_page.disabled), (0, False))